@@ -0,0 +1,38 @@
+"""
+Compare two benchmark result files.
+
+    python -m benchmarks.compare base.json new.json
+"""
+import json
+import sys
+from typing import List, Optional
+
+_METRICS = ("wall_s", "mb_per_s", "files_per_s", "peak_rss_bytes")
+
+
+def _load(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return {r["case"]: r for r in json.load(f)["results"]}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print(__doc__.strip(), file=sys.stderr)
+        return 2
+    base, new = _load(argv[0]), _load(argv[1])
+    print(f"{'case':28s} " + " ".join(f"{m:>22s}" for m in _METRICS))
+    for case in sorted(set(base) & set(new)):
+        cells = []
+        for metric in _METRICS:
+            a, b = base[case].get(metric), new[case].get(metric)
+            if not a or b is None:
+                cells.append(f"{'-':>22s}")
+                continue
+            cells.append(f"{b:>12.4g} ({(b - a) / a * 100:+6.1f}%)")
+        print(f"{case:28s} " + " ".join(cells))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
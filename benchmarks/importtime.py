@@ -0,0 +1,84 @@
+"""
+Start-up budget for the headless entry point.
+
+    python -m benchmarks.importtime [--budget-ms 100] [--runs 5]
+
+Runs ``python -X importtime`` on what ``python -m unitypackage_opener``
+imports before it starts extracting, takes the best of several runs, and
+exits non-zero if the cumulative import time is over budget or if any GUI,
+registry or other heavy module was imported. tests/test_importtime.py runs
+the same checks under pytest.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, Optional
+
+ENTRY_IMPORTS = "import multiprocessing, unitypackage_opener.headless"
+
+# Modules the headless path must never load
+FORBIDDEN = (
+    "tkinter",
+    "customtkinter",
+    "winreg",
+    "unitypackage_opener.app",
+    "unitypackage_opener.registry",
+)
+
+# Only some commands need these; they are imported where they are used
+HEAVY = ("sqlite3", "ctypes", "tarfile")
+
+DEFAULT_BUDGET_MS = 100.0
+
+
+def _repo_root() -> str:
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure() -> tuple:
+    """(total import time in ms, loaded modules) for one fresh interpreter."""
+    code = f"{ENTRY_IMPORTS}; import sys; print('\\n'.join(sys.modules))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=_repo_root(),
+                          check=True, capture_output=True, text=True)
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line.split("|")
+        # Top-level imports are not indented; their cumulative times add up to the total
+        name = fields[2]
+        if len(name) - len(name.lstrip()) == 1:
+            try:
+                total_us += int(fields[1])
+            except ValueError:
+                pass  # header line
+    return total_us / 1000.0, set(proc.stdout.split())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.importtime")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    best = None
+    modules: set = set()
+    for _ in range(max(1, args.runs)):
+        total, modules = measure()
+        best = total if best is None else min(best, total)
+
+    status = 0
+    loaded = [m for m in FORBIDDEN + HEAVY if m in modules]
+    if loaded:
+        print(f"FAIL: headless start-up imported {', '.join(loaded)}")
+        status = 1
+    verdict = "ok" if best <= args.budget_ms else "FAIL"
+    print(f"{verdict}: headless imports took {best:.1f} ms (budget {args.budget_ms:.0f} ms, best of {args.runs})")
+    if best > args.budget_ms:
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
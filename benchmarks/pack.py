@@ -0,0 +1,77 @@
+"""
+Speed of the packer.
+
+    python -m benchmarks.pack [--files 5000] [--big-mb 64] [--jobs 0] [--workdir /tmp/upo-bench]
+
+Builds a source folder (small scripts, an empty file, non-ASCII names, a
+nested folder, some existing .meta files and one file larger than a
+compression block), and compares the time of pack() against tarfile's
+single-threaded gzip for the same folder. That pack() output extracts to
+the same files and GUIDs is tested in tests/test_packer.py.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tarfile
+import time
+import uuid
+from typing import List, Optional
+
+from unitypackage_opener.packer import PackStats, pack
+
+
+def build_source(root: str, files: int, big_mb: int, seed: int = 0) -> None:
+    """Write the source tree."""
+    rnd = random.Random(seed)
+    shutil.rmtree(root, ignore_errors=True)
+    os.makedirs(root)
+    for i in range(files):
+        folder = os.path.join(root, f"d{i % 17}", f"sub{i % 5}")
+        os.makedirs(folder, exist_ok=True)
+        name = f"Script{i}.cs" if i % 50 else f"スクリプト{i}.cs"
+        path = os.path.join(folder, name)
+        with open(path, "wb") as f:
+            f.write(f"// {i}\n".encode() * rnd.randint(1, 200))
+        if i % 3 == 0:
+            guid = uuid.UUID(int=rnd.getrandbits(128)).hex
+            with open(path + ".meta", "w", encoding="utf-8") as f:
+                f.write(f"fileFormatVersion: 2\nguid: {guid}\nMonoImporter:\n  serializedVersion: 2\n")
+    open(os.path.join(root, "empty.txt"), "wb").close()
+    with open(os.path.join(root, "big.bin"), "wb") as f:
+        for _ in range(big_mb):
+            f.write(rnd.randbytes(512 * 1024) * 2)
+    # Ignored like Unity does
+    with open(os.path.join(root, "backup.cs~"), "wb") as f:
+        f.write(b"ignored")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.pack")
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--big-mb", type=int, default=64)
+    parser.add_argument("--jobs", type=int, default=0)
+    parser.add_argument("--workdir", default=os.path.join("/tmp", "upo-bench"))
+    args = parser.parse_args(argv)
+
+    source = os.path.join(args.workdir, "pack-src", "Assets", "Exported")
+    build_source(source, args.files, args.big_mb)
+    package = os.path.join(args.workdir, "pack.unitypackage")
+
+    stats = pack(source, package, jobs=args.jobs, stats=PackStats())
+    print(f"{stats.assets} files, {stats.folders} folders")
+
+    baseline = os.path.join(args.workdir, "pack-baseline.tar.gz")
+    start = time.perf_counter()
+    with tarfile.open(baseline, "w:gz", compresslevel=6) as tar:
+        tar.add(source, arcname="Exported")
+    single = time.perf_counter() - start
+    print(f"pack       {stats.seconds:7.3f}s  {stats.bytes_in / stats.seconds / 1e6:7.1f} MB/s  -> {stats.bytes_out / 1e6:.1f} MB")
+    print(f"tarfile:gz {single:7.3f}s  {stats.bytes_in / single / 1e6:7.1f} MB/s  -> {os.path.getsize(baseline) / 1e6:.1f} MB")
+    os.remove(baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+Extractor benchmarks.
+
+    python -m benchmarks.run [--scale 0.05] [--case tiny_scripts ...] [--out results.json]
+
+Every case runs in a fresh interpreter so peak RSS and syscall counts belong
+to that case alone. Results are written as JSON; compare two runs with
+``python -m benchmarks.compare old.json new.json``.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from . import synth
+
+# case name -> (profile, entry point, jobs)
+CASES = {
+    "tiny_scripts": ("tiny_scripts", "extract_unitypackage", 1),
+    "large_binaries": ("large_binaries", "extract_unitypackage", 1),
+    "deep_tree": ("deep_tree", "extract_unitypackage", 1),
+    "conflict_merge": ("conflict_merge", "extract_multiple", 1),
+    "conflict_merge_parallel": ("conflict_merge", "extract_multiple", os.cpu_count() or 1),
+}
+
+
+def _proc_io() -> Dict[str, int]:
+    """Read/write syscall counters from /proc (Linux only)."""
+    counters: Dict[str, int] = {}
+    try:
+        with open("/proc/self/io", "r", encoding="ascii") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                counters[key.strip()] = int(value)
+    except OSError:
+        pass
+    return counters
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    peak = max(peak, children)
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _run_child(case: str, packages: List[str], dest: str, conflict: str) -> dict:
+    from unitypackage_opener.extractor import extract_multiple, extract_unitypackage
+
+    _, entry, jobs = CASES[case]
+    before = _proc_io()
+    start = time.perf_counter()
+    if entry == "extract_unitypackage":
+        results = extract_unitypackage(packages[0], dest, conflict_policy=conflict)
+        entries = len(results)
+    else:
+        all_results = extract_multiple(packages, dest, mode="merge", conflict_policy=conflict, jobs=jobs)
+        entries = sum(len(r) for r in all_results.values())
+    wall = time.perf_counter() - start
+    after = _proc_io()
+    return {
+        "wall_s": wall,
+        "entries": entries,
+        "peak_rss_bytes": _peak_rss_bytes(),
+        "syscalls": {
+            "read": after.get("syscr", 0) - before.get("syscr", 0),
+            "write": after.get("syscw", 0) - before.get("syscw", 0),
+        } if before else None,
+    }
+
+
+def _strace_counts(cmd: List[str]) -> Optional[Dict[str, int]]:
+    """Per-syscall counts via `strace -c -f`, when strace is installed."""
+    if shutil.which("strace") is None:
+        return None
+    with tempfile.NamedTemporaryFile("r", suffix=".strace", delete=False) as out:
+        summary_path = out.name
+    try:
+        subprocess.run(["strace", "-f", "-c", "-o", summary_path] + cmd, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        counts: Dict[str, int] = {}
+        with open(summary_path, "r", encoding="utf-8") as f:
+            for line in f:
+                fields = line.split()
+                # % time, seconds, usecs/call, calls, [errors], syscall
+                if len(fields) >= 5 and fields[0][0].isdigit() and fields[-1] != "total":
+                    counts[fields[-1]] = int(fields[3])
+        return counts
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return None
+    finally:
+        os.remove(summary_path)
+
+
+def run_case(case: str, workdir: str, scale: float, conflict: str, strace: bool) -> dict:
+    profile = synth.scaled(synth.PROFILES[CASES[case][0]], scale)
+    packages = synth.ensure_packages(os.path.join(workdir, "packages"), profile)
+    files, total = synth.package_stats(packages)
+    dest = os.path.join(workdir, "out", case)
+    shutil.rmtree(dest, ignore_errors=True)
+
+    cmd = [sys.executable, "-m", "benchmarks.run", "--child", case, "--dest", dest, "--conflict", conflict] + packages
+    proc = subprocess.run(cmd, check=True, capture_output=True, text=True, cwd=_repo_root())
+    result = json.loads(proc.stdout)
+    if strace:
+        shutil.rmtree(dest, ignore_errors=True)
+        result["strace"] = _strace_counts(cmd)
+    shutil.rmtree(dest, ignore_errors=True)
+
+    wall = result["wall_s"]
+    result.update({
+        "case": case,
+        "profile": profile.name,
+        "packages": len(packages),
+        "package_bytes": sum(os.path.getsize(p) for p in packages),
+        "assets": files,
+        "asset_bytes": total,
+        "mb_per_s": total / wall / 1e6 if wall else None,
+        "files_per_s": files / wall if wall else None,
+    })
+    return result
+
+
+def _repo_root() -> str:
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=_repo_root(), check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--case", action="append", choices=sorted(CASES), help="case to run (repeatable; default all)")
+    parser.add_argument("--scale", type=float, default=1.0, help="shrink or grow the profiles (default 1.0)")
+    parser.add_argument("--conflict", default="rename", help="conflict policy passed to the extractor")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "upo-bench"),
+                        help="where packages are generated (and cached) and extracted")
+    parser.add_argument("--out", help="write results JSON here (default: stdout)")
+    parser.add_argument("--strace", action="store_true", help="also collect per-syscall counts with strace")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--dest", help=argparse.SUPPRESS)
+    parser.add_argument("packages", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(_run_child(args.child, args.packages, args.dest, args.conflict)))
+        return 0
+
+    report = {
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "scale": args.scale,
+        "conflict": args.conflict,
+        "results": [],
+    }
+    for case in args.case or list(CASES):
+        result = run_case(case, args.workdir, args.scale, args.conflict, args.strace)
+        report["results"].append(result)
+        print(f"{case:28s} {result['wall_s']:8.2f}s {result['mb_per_s']:9.1f} MB/s "
+              f"{result['files_per_s']:10.0f} files/s", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Synthetic .unitypackage generator.
+
+Packages use the layout the extractor expects: one directory per GUID with
+``asset``, ``asset.meta``, ``pathname`` and sometimes ``preview.png``, plus
+folder entries that only carry ``asset.meta`` and ``pathname``.
+"""
+import io
+import os
+import random
+import tarfile
+import uuid
+from dataclasses import dataclass
+from typing import Iterator, List, Tuple
+
+MiB = 1024 * 1024
+GiB = 1024 * MiB
+
+_SCRIPT = (
+    "using UnityEngine;\n\n"
+    "public class {name} : MonoBehaviour\n{{\n"
+    "    [SerializeField] private float speed = {n}f;\n\n"
+    "    void Update()\n    {{\n"
+    "        transform.Rotate(0f, speed * Time.deltaTime, 0f);\n"
+    "    }}\n}}\n"
+)
+
+
+@dataclass
+class Profile:
+    name: str
+    # Number of assets per package
+    files: int
+    # Asset size range in bytes (inclusive)
+    min_size: int
+    max_size: int
+    # Directory nesting below Assets/
+    depth: int = 2
+    # Packages generated for the profile (merge benchmarks use several)
+    packages: int = 1
+    # Fraction of pathnames shared by every package of the profile
+    overlap: float = 0.0
+    # Fraction of assets that also get a preview.png member
+    previews: float = 0.1
+    binary: bool = False
+
+
+PROFILES = {
+    "tiny_scripts": Profile("tiny_scripts", files=100_000, min_size=150, max_size=2_000),
+    "large_binaries": Profile("large_binaries", files=3, min_size=1 * GiB, max_size=2 * GiB, binary=True, previews=0.0),
+    "deep_tree": Profile("deep_tree", files=20_000, min_size=500, max_size=20_000, depth=24),
+    "conflict_merge": Profile("conflict_merge", files=5_000, min_size=500, max_size=50_000, packages=8, overlap=0.7),
+}
+
+
+def scaled(profile: Profile, scale: float) -> Profile:
+    """Shrink (or grow) a profile: counts scale for small-file profiles, sizes for binary ones."""
+    if profile.binary:
+        return Profile(**{**profile.__dict__,
+                          "min_size": max(1, int(profile.min_size * scale)),
+                          "max_size": max(1, int(profile.max_size * scale))})
+    return Profile(**{**profile.__dict__, "files": max(1, int(profile.files * scale))})
+
+
+class _NoiseReader(io.RawIOBase):
+    """Streams `size` bytes of mostly incompressible data without holding them in memory."""
+
+    def __init__(self, size: int, rnd: random.Random):
+        self.remaining = size
+        self.block = rnd.randbytes(MiB)
+        self.counter = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = min(len(b), self.remaining)
+        if n <= 0:
+            return 0
+        # Vary each MiB slightly so gzip cannot collapse repeats
+        self.counter += 1
+        chunk = self.counter.to_bytes(8, "little") + self.block[8:]
+        view = memoryview(b)
+        filled = 0
+        while filled < n:
+            take = min(n - filled, len(chunk))
+            view[filled:filled + take] = chunk[:take]
+            filled += take
+        self.remaining -= n
+        return n
+
+
+def _guid(rnd: random.Random) -> str:
+    return uuid.UUID(int=rnd.getrandbits(128)).hex
+
+
+def _pathnames(profile: Profile, rnd: random.Random, package: int, shared: List[str]) -> Iterator[str]:
+    ext = ".bin" if profile.binary else ".cs"
+    for i in range(profile.files):
+        if i < len(shared):
+            yield shared[i]
+            continue
+        parts = ["Assets", f"P{package}"]
+        for level in range(profile.depth):
+            parts.append(f"d{level}_{rnd.randrange(8)}")
+        parts.append(f"Asset{package}_{i}{ext}")
+        yield "/".join(parts)
+
+
+def _add(tar: tarfile.TarFile, name: str, data: bytes) -> None:
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mode = 0o644
+    tar.addfile(info, io.BytesIO(data))
+
+
+def write_package(path: str, profile: Profile, package: int = 0, seed: int = 0, compresslevel: int = 1) -> Tuple[int, int]:
+    """
+    Write one package of the profile. Returns (asset count, total asset bytes).
+    A low gzip level keeps generation of multi-GB packages bearable; the
+    extractor inflates all levels at the same speed.
+    """
+    rnd = random.Random(f"{profile.name}:{seed}:{package}")
+    shared_rnd = random.Random(f"{profile.name}:{seed}:shared")
+    shared = list(_pathnames(profile, shared_rnd, 0, []))[: int(profile.files * profile.overlap)]
+    total = 0
+    folders = set()
+    tmp_path = path + ".tmp"
+    with tarfile.open(tmp_path, "w:gz", compresslevel=compresslevel, format=tarfile.USTAR_FORMAT) as tar:
+        for i, pathname in enumerate(_pathnames(profile, rnd, package, shared)):
+            folder = pathname.rsplit("/", 1)[0]
+            if folder not in folders:
+                folders.add(folder)
+                guid = _guid(rnd)
+                _add(tar, f"{guid}/asset.meta", f"fileFormatVersion: 2\nguid: {guid}\nfolderAsset: yes\n".encode())
+                _add(tar, f"{guid}/pathname", folder.encode())
+            guid = _guid(rnd)
+            size = rnd.randint(profile.min_size, profile.max_size)
+            total += size
+            dir_info = tarfile.TarInfo(guid)
+            dir_info.type = tarfile.DIRTYPE
+            dir_info.mode = 0o755
+            tar.addfile(dir_info)
+            info = tarfile.TarInfo(f"{guid}/asset")
+            info.size = size
+            info.mode = 0o644
+            if profile.binary:
+                tar.addfile(info, io.BufferedReader(_NoiseReader(size, rnd), MiB))
+            else:
+                body = _SCRIPT.format(name=f"Asset{package}_{i}", n=i).encode()
+                data = (body * (size // len(body) + 1))[:size]
+                tar.addfile(info, io.BytesIO(data))
+            _add(tar, f"{guid}/asset.meta", f"fileFormatVersion: 2\nguid: {guid}\n".encode())
+            _add(tar, f"{guid}/pathname", f"{pathname}\n00".encode())
+            if rnd.random() < profile.previews:
+                _add(tar, f"{guid}/preview.png", b"\x89PNG\r\n\x1a\n" + rnd.randbytes(512))
+    os.replace(tmp_path, path)
+    return profile.files, total
+
+
+def ensure_packages(workdir: str, profile: Profile, seed: int = 0) -> List[str]:
+    """Generate the profile's packages into workdir unless they already exist."""
+    os.makedirs(workdir, exist_ok=True)
+    paths = []
+    for package in range(profile.packages):
+        path = os.path.join(workdir, f"{profile.name}-{profile.files}-{profile.max_size}-s{seed}-{package}.unitypackage")
+        if not os.path.exists(path):
+            write_package(path, profile, package, seed)
+        paths.append(path)
+    return paths
+
+
+def package_stats(paths: List[str]) -> Tuple[int, int]:
+    """(assets, uncompressed asset bytes) across the profile's packages, from the tar headers."""
+    files = 0
+    total = 0
+    for path in paths:
+        with tarfile.open(path, "r|gz") as tar:
+            for member in tar:
+                if member.isfile() and member.name.endswith("/asset"):
+                    files += 1
+                    total += member.size
+    return files, total
@@ -0,0 +1,152 @@
+"""
+Lean tar reader (unitypackage_opener.tarreader) against tarfile.
+
+    python -m benchmarks.tarread [--scale 0.1] [--workdir /tmp/upo-bench] [--runs 3]
+
+First checks that both readers report the same regular-file members (name
+split into guid/kind, size, header offset and a digest of the data) for a
+synthetic package and for small archives that exercise the fallback paths:
+PAX and GNU long names, the GNU header format, v7 directories, empty
+members and members larger than the small-member read. Then times a full
+read of the package (inflate included) with each and prints both rates.
+Exits non-zero on any mismatch.
+"""
+import argparse
+import gzip
+import hashlib
+import io
+import os
+import sys
+import tarfile
+import time
+from typing import List, Optional, Tuple
+
+from unitypackage_opener.tarreader import iter_members, split_member
+
+from . import synth
+
+
+def _with_tarfile(fileobj) -> List[Tuple]:
+    members = []
+    with tarfile.open(fileobj=fileobj, mode="r|", encoding="utf8") as tar:
+        for info in tar:
+            if not info.isfile():
+                continue
+            guid, kind = split_member(info.name)
+            digest = hashlib.sha1(tar.extractfile(info).read()).hexdigest()
+            members.append((guid, kind, info.size, info.offset, digest))
+    return members
+
+
+def _with_reader(fileobj) -> List[Tuple]:
+    return [
+        (guid, kind, size, offset, hashlib.sha1(data.read()).hexdigest())
+        for guid, kind, size, offset, data in iter_members(fileobj)
+    ]
+
+
+def _archive(fmt: int, entries) -> bytes:
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w", format=fmt) as tar:
+        for name, data, type_ in entries:
+            info = tarfile.TarInfo(name)
+            info.type = type_
+            info.size = len(data) if type_ == tarfile.REGTYPE else 0
+            tar.addfile(info, io.BytesIO(data) if type_ == tarfile.REGTYPE else None)
+    return buf.getvalue()
+
+
+def edge_cases() -> List[Tuple[str, bytes]]:
+    guid = "0123456789abcdef0123456789abcdef"
+    long_name = f"{guid}/" + "/".join(["deep"] * 40) + "/asset"
+    common = [
+        (guid, b"", tarfile.DIRTYPE),
+        (f"{guid}/asset", os.urandom(3000), tarfile.REGTYPE),
+        (f"{guid}/asset.meta", b"", tarfile.REGTYPE),
+        (f"{guid}/pathname", "Assets/日本語/テスト.cs".encode("utf-8"), tarfile.REGTYPE),
+        (f"./{guid}/preview.png", os.urandom(200_000), tarfile.REGTYPE),
+    ]
+    cases = [
+        ("ustar", _archive(tarfile.USTAR_FORMAT, common)),
+        ("pax", _archive(tarfile.PAX_FORMAT, common + [(long_name, b"long", tarfile.REGTYPE)])),
+        ("gnu", _archive(tarfile.GNU_FORMAT, common + [(long_name, b"long", tarfile.REGTYPE)])),
+        ("pax-utf8", _archive(tarfile.PAX_FORMAT, common + [(f"{guid}/ä" * 30, b"x", tarfile.REGTYPE)])),
+    ]
+    # v7 directory: a regular ("\0") entry whose name ends in "/"
+    v7 = bytearray(_archive(tarfile.USTAR_FORMAT, common))
+    header = bytearray(v7[:512])
+    header[0:100] = (guid + "/").encode().ljust(100, b"\0")
+    header[156:157] = b"\0"
+    header[148:156] = b" " * 8
+    header[148:156] = f"{sum(header):06o}\0 ".encode()
+    cases.append(("v7-dir", bytes(header) + bytes(v7[512:])))
+    return cases
+
+
+def check(package: str) -> int:
+    failures = 0
+    cases = edge_cases()
+    with gzip.open(package, "rb") as f:
+        cases.append((os.path.basename(package), f.read()))
+    for name, data in cases:
+        expected = _with_tarfile(io.BytesIO(data))
+        got = _with_reader(io.BytesIO(data))
+        if got != expected:
+            failures += 1
+            print(f"FAIL {name}: {len(got)} members, tarfile has {len(expected)}")
+            for a, b in zip(got, expected):
+                if a != b:
+                    print(f"     first difference: {a} != {b}")
+                    break
+        else:
+            print(f"ok   {name}: {len(got)} members")
+    return failures
+
+
+def _time(package: str, read) -> float:
+    start = time.perf_counter()
+    with open(package, "rb") as raw:
+        read(raw)
+    return time.perf_counter() - start
+
+
+def _read_tarfile(raw) -> int:
+    n = 0
+    with tarfile.open(fileobj=raw, mode="r|gz", encoding="utf8") as tar:
+        for info in tar:
+            if info.isfile():
+                split_member(info.name)
+                tar.extractfile(info).read()
+                n += 1
+    return n
+
+
+def _read_lean(raw) -> int:
+    n = 0
+    with gzip.GzipFile(fileobj=raw, mode="rb") as gz:
+        for member in iter_members(gz):
+            member.data.read()
+            n += 1
+    return n
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.tarread")
+    parser.add_argument("--scale", type=float, default=0.1)
+    parser.add_argument("--workdir", default=os.path.join("/tmp", "upo-bench"))
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    profile = synth.scaled(synth.PROFILES["tiny_scripts"], args.scale)
+    package = synth.ensure_packages(os.path.join(args.workdir, "packages"), profile)[0]
+    failures = check(package)
+
+    size = os.path.getsize(package)
+    for label, read in (("tarfile", _read_tarfile), ("tarreader", _read_lean)):
+        best = min(_time(package, read) for _ in range(max(1, args.runs)))
+        print(f"{label:10} {best:7.3f}s  {size / best / 1e6:7.1f} MB/s compressed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
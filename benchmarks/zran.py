@@ -0,0 +1,94 @@
+"""
+Access points into the gzip stream (unitypackage_opener.zran).
+
+    python -m benchmarks.zran [--scale 0.1] [--workdir /tmp/upo-bench] [--runs 3] [--jobs 4]
+
+Indexes a synthetic package with access points, then checks that reading
+from every access point, and from the member offset of a sample of assets,
+gives the same bytes as inflating the whole stream. Then times pulling the
+last asset out by GUID without and with access points, and reading every
+asset front to back against reading them on --jobs threads (nothing is
+written to disk). Exits non-zero on any mismatch.
+"""
+import argparse
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+from unitypackage_opener.extractor import AssetFilter, iter_package_assets
+from unitypackage_opener.index import PackageIndex, scan_package
+from unitypackage_opener.zran import available, open_at
+
+from . import synth
+
+_COMPARE = 64 * 1024
+
+
+def check(package: str, index: PackageIndex) -> int:
+    failures = 0
+    with gzip.open(package, "rb") as f:
+        stream = f.read()
+    assets = index.assets()
+    offsets = [("access point", c.out) for c in index.checkpoints]
+    offsets += [("asset", e.offset) for e in assets[:: max(1, len(assets) // 50)]]
+    with open(package, "rb") as raw:
+        for label, offset in offsets:
+            got = open_at(raw, index, offset).read(_COMPARE)
+            if got != stream[offset:offset + _COMPARE]:
+                failures += 1
+                print(f"FAIL {label} at {offset}")
+    print(f"{'ok  ' if not failures else 'FAIL'} {len(offsets)} offsets, {len(index.checkpoints)} access points")
+    return failures
+
+
+def _time(package: str, index: PackageIndex, runs: int, guids=None, inflate_jobs: int = 1) -> float:
+    # Assets are read and dropped: inflating is what's measured, not the disk
+    asset_filter = AssetFilter(guids=guids) or None
+    best = float("inf")
+    for _ in range(max(1, runs)):
+        spill_dir = tempfile.mkdtemp(prefix="upo-zran-")
+        try:
+            start = time.perf_counter()
+            for _, _, asset in iter_package_assets(package, spill_dir, index, asset_filter, inflate_jobs):
+                for _ in asset.chunks():
+                    pass
+            best = min(best, time.perf_counter() - start)
+        finally:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+    return best
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.zran")
+    parser.add_argument("--scale", type=float, default=0.1)
+    parser.add_argument("--workdir", default=os.path.join("/tmp", "upo-bench"))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    if not available():
+        print("no system zlib: access points can't be recorded here")
+        return 1
+    profile = synth.scaled(synth.PROFILES["deep_tree"], args.scale)
+    package = synth.ensure_packages(os.path.join(args.workdir, "packages"), profile)[0]
+    index = scan_package(package)
+    failures = check(package, index)
+
+    plain = PackageIndex(index.path, index.size, index.mtime_ns, index.entries)
+    last = [index.assets()[-1].guid]
+    for label, seconds in (
+        ("last asset, no access points", _time(package, plain, args.runs, guids=last)),
+        ("last asset, access points", _time(package, index, args.runs, guids=last)),
+        ("all assets, 1 thread", _time(package, index, args.runs)),
+        (f"all assets, {args.jobs} threads", _time(package, index, args.runs, inflate_jobs=args.jobs)),
+    ):
+        print(f"{label:32} {seconds:7.3f}s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""
+Shared test setup. SETTINGS_DIR is fixed when the package is imported, so
+the home directory is pointed at a throwaway one before any test module
+imports it: settings, caches and logs never touch the real one. The
+repository root is put on sys.path for the benchmarks package.
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+_HOME = tempfile.mkdtemp(prefix="upo-test-home-")
+os.environ["HOME"] = _HOME
+os.environ["USERPROFILE"] = _HOME
+
+
+def make_package(folder: str, name: str, files: dict) -> str:
+    """Pack {path below Assets/<name>: bytes} into folder/<name>.unitypackage."""
+    from unitypackage_opener.packer import pack
+
+    source = os.path.join(folder, "src", "Assets", name)
+    for rel, data in files.items():
+        path = os.path.join(source, *rel.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+    path = os.path.join(folder, f"{name}.unitypackage")
+    pack(source, path)
+    return path
+
+
+def read_tree(root: str) -> dict:
+    """{path below root, "/"-separated: bytes} of every file."""
+    found = {}
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(dirpath, name)
+            with open(path, "rb") as f:
+                found[os.path.relpath(path, root).replace(os.sep, "/")] = f.read()
+    return found
@@ -0,0 +1,56 @@
+from unitypackage_opener.diff import diff_packages, upgrade
+from unitypackage_opener.extractor import extract_unitypackage
+
+from conftest import make_package, read_tree
+
+
+def _meta(guid: str) -> bytes:
+    return f"fileFormatVersion: 2\nguid: {guid}\n".encode()
+
+
+def _versions(tmp_path):
+    # Folder .metas keep the folder GUIDs stable between the two versions
+    common = {"Scripts.meta": _meta("1" * 32), "Data.meta": _meta("2" * 32)}
+    old = {
+        **common,
+        "Scripts/Player.cs": b"// player\n",
+        "Scripts/Player.cs.meta": _meta("a" * 32),
+        "Data/table.txt": b"v1\n",
+        "Data/table.txt.meta": _meta("b" * 32),
+        "Data/obsolete.txt": b"old\n",
+        "Data/obsolete.txt.meta": _meta("c" * 32),
+    }
+    new = {
+        **common,
+        # Renamed, same GUID and contents
+        "Scripts/Hero.cs": b"// player\n",
+        "Scripts/Hero.cs.meta": _meta("a" * 32),
+        "Data/table.txt": b"v2\n",
+        "Data/table.txt.meta": _meta("b" * 32),
+        "Data/extra.txt": b"new\n",
+        "Data/extra.txt.meta": _meta("d" * 32),
+    }
+    return make_package(str(tmp_path / "old"), "Kit", old), make_package(str(tmp_path / "new"), "Kit", new)
+
+
+def test_diff_classifies_changes_by_guid(tmp_path):
+    old, new = _versions(tmp_path)
+    diff = diff_packages(old, new)
+    changes = {e.guid: (e.change, e.pathname, e.old_pathname) for e in diff.entries}
+    assert changes == {
+        "a" * 32: ("moved", "Assets/Kit/Scripts/Hero.cs", "Assets/Kit/Scripts/Player.cs"),
+        "b" * 32: ("modified", "Assets/Kit/Data/table.txt", "Assets/Kit/Data/table.txt"),
+        "c" * 32: ("removed", "Assets/Kit/Data/obsolete.txt", "Assets/Kit/Data/obsolete.txt"),
+        "d" * 32: ("added", "Assets/Kit/Data/extra.txt", None),
+    }
+
+
+def test_upgrade_matches_fresh_extraction(tmp_path):
+    old, new = _versions(tmp_path)
+    dest, fresh = str(tmp_path / "dest"), str(tmp_path / "fresh")
+    extract_unitypackage(old, dest)
+    extract_unitypackage(new, fresh)
+    result = upgrade(old, new, dest, remove=True)
+    assert (result.moved, result.removed) == (1, 1)
+    assert sorted(a.guid for a in result.extracted) == ["b" * 32, "d" * 32]
+    assert read_tree(dest) == read_tree(fresh)
@@ -0,0 +1,94 @@
+import os
+
+from unitypackage_opener.extractor import extract_multiple, iter_extract
+from unitypackage_opener.hashcache import DigestCache
+from unitypackage_opener.journal import journal_path
+
+from conftest import make_package, read_tree
+
+
+def _files(name: str, count: int = 20) -> dict:
+    return {f"Data/f{i}.txt": f"{name} {i}\n".encode() * (i + 1) for i in range(count)}
+
+
+def test_identical_policy_skips_unchanged_files(tmp_path):
+    package = make_package(str(tmp_path), "Kit", _files("Kit"))
+    dest = str(tmp_path / "out")
+    list(iter_extract(package, dest))
+    changed = os.path.join(dest, "Assets", "Kit", "Data", "f3.txt")
+    with open(changed, "wb") as f:
+        f.write(b"edited\n")
+    before = read_tree(dest)
+
+    actions = {a.pathname: a.action for a in iter_extract(package, dest, "identical")}
+    assert actions.pop("Assets/Kit/Data/f3.txt") == "overwrite"
+    assert set(actions.values()) == {"identical"}
+    after = read_tree(dest)
+    assert after["Assets/Kit/Data/f3.txt"] == b"Kit 3\n" * 4
+    assert {p: d for p, d in after.items() if not p.endswith("f3.txt")} == {
+        p: d for p, d in before.items() if not p.endswith("f3.txt")
+    }
+
+
+def test_identical_policy_in_parallel(tmp_path):
+    packages = [make_package(str(tmp_path / name), name, _files(name)) for name in ("First", "Second")]
+    out = str(tmp_path / "out")
+    extract_multiple(packages, out, mode="individual", jobs=2)
+    # Both workers share the digest cache
+    stats: dict = {}
+    extract_multiple(packages, out, mode="individual", conflict_policy="identical", jobs=2, stats=stats)
+    assert [stats[p].conflicts for p in packages] == [20, 20]
+    assert len(read_tree(out)) == 40
+
+
+def test_digest_cache_handles_do_not_lock_each_other_out(tmp_path):
+    # Two handles stand in for two worker processes
+    db_path = str(tmp_path / "digests.sqlite")
+    first, second = DigestCache(db_path), DigestCache(db_path)
+    path = tmp_path / "asset.txt"
+    path.write_bytes(b"asset\n")
+    st = os.stat(path)
+    first.put(str(path), "a" * 40)
+    # Would wait for the first handle's write lock (and time out) if put kept a transaction open
+    second.put(str(path), "b" * 40)
+    second.close()
+    first.close()
+    reopened = DigestCache(db_path)
+    assert reopened.get(str(path), st.st_size, st.st_mtime_ns) == "a" * 40
+    reopened.close()
+
+
+
+def test_parallel_merge_matches_sequential(tmp_path):
+    # Same folder in every package, so the merge has conflicts to resolve in package order
+    packages = [
+        make_package(str(tmp_path / f"v{i}"), "Kit", {**_files(f"v{i}", 10 + i), f"only{i}.txt": b"%d\n" % i})
+        for i in range(3)
+    ]
+    sequential = extract_multiple(packages, str(tmp_path / "seq"), jobs=1)
+    parallel = extract_multiple(packages, str(tmp_path / "par"), jobs=2)
+    assert read_tree(str(tmp_path / "par")) == read_tree(str(tmp_path / "seq"))
+
+    def relative(results, root):
+        return {p: [(guid, os.path.relpath(path, root)) for guid, path in found] for p, found in results.items()}
+
+    assert relative(parallel, str(tmp_path / "par")) == relative(sequential, str(tmp_path / "seq"))
+
+
+def test_resume_after_interrupted_extraction(tmp_path):
+    package = make_package(str(tmp_path), "Kit", _files("Kit"))
+    clean = str(tmp_path / "clean")
+    list(iter_extract(package, clean))
+    dest = str(tmp_path / "out")
+
+    # Stopping the generator early stands in for a cancelled or crashed run
+    assets = iter_extract(package, dest, resume=True)
+    for _ in range(5):
+        next(assets)
+    assets.close()
+    assert os.path.exists(journal_path(dest, package))
+
+    actions = [a.action for a in iter_extract(package, dest, resume=True)]
+    assert actions.count("resumed") >= 5
+    assert read_tree(dest) == read_tree(clean)
+    assert not os.path.exists(journal_path(dest, package))
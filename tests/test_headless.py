@@ -0,0 +1,65 @@
+import json
+import os
+import threading
+import time
+
+from unitypackage_opener.headless import LAST_RUN_LOG, _BatchRunner
+from unitypackage_opener.packer import pack
+from unitypackage_opener.runlog import RUN_LOG_PATH
+from unitypackage_opener.service import ExtractionService, submit
+
+
+def _package(folder: str, name: str) -> str:
+    source = os.path.join(folder, "src", "Assets", name)
+    os.makedirs(source)
+    with open(os.path.join(source, f"{name}.cs"), "w", encoding="utf-8") as f:
+        f.write(f"// {name}\n")
+    path = os.path.join(folder, f"{name}.unitypackage")
+    pack(source, path)
+    return path
+
+
+def test_batch_from_two_folders_keeps_one_log(tmp_path):
+    first = _package(str(tmp_path / "a"), "First")
+    second = _package(str(tmp_path / "b"), "Second")
+    runner = _BatchRunner()
+    try:
+        # Output next to each package: two groups in one batch
+        status = runner([{"paths": [first]}, {"paths": [second]}])
+    finally:
+        runner.close()
+    with open(RUN_LOG_PATH, encoding="utf-8") as f:
+        events = [json.loads(line) for line in f]
+    assert [e["event"] for e in events].count("service_batch") == 1
+    assert [e["packages"] for e in events if e["event"] == "service_group"] == [[first], [second]]
+    assert len([e for e in events if e["event"] == "package"]) == 2
+    assert status == 0
+    with open(LAST_RUN_LOG, encoding="utf-8") as f:
+        summary = f.read()
+    assert f" - {first}\n" in summary and f" - {second}\n" in summary
+
+
+def test_failed_batch_reports_failure(tmp_path):
+    broken = tmp_path / "Broken.unitypackage"
+    broken.write_bytes(b"not a gzip stream")
+    runner = _BatchRunner()
+    try:
+        assert runner([{"paths": [str(broken)]}]) == 1
+    finally:
+        runner.close()
+
+
+def test_service_reports_batch_status_to_clients():
+    service = ExtractionService(lambda requests: 2, debounce=0.1, idle_timeout=0.5)
+    statuses = []
+    server = threading.Thread(target=lambda: statuses.append(service.serve({"paths": ["own"]})))
+    server.start()
+    # Handed off requests get the status of their batch, as does the server's own request
+    status = None
+    deadline = time.monotonic() + 5
+    while status is None and time.monotonic() < deadline:
+        status = submit({"paths": ["other"]})
+        time.sleep(0.01)
+    assert status == 2
+    server.join(10)
+    assert statuses == [2]
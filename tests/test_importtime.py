@@ -0,0 +1,19 @@
+import subprocess
+import sys
+
+from benchmarks.importtime import DEFAULT_BUDGET_MS, FORBIDDEN, HEAVY, measure
+
+from conftest import ROOT
+
+
+def test_headless_imports_within_budget():
+    # Best of a few fresh interpreters, as the benchmark does, so one slow start-up doesn't fail the run
+    best = min(measure()[0] for _ in range(3))
+    assert best <= DEFAULT_BUDGET_MS
+
+
+def test_headless_does_not_import_heavy_modules():
+    code = "import sys, unitypackage_opener.headless; print('\\n'.join(sys.modules))"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True, text=True)
+    modules = set(proc.stdout.split())
+    assert [m for m in FORBIDDEN + HEAVY if m in modules] == []
@@ -0,0 +1,62 @@
+import os
+import random
+
+from unitypackage_opener.extractor import extract_unitypackage
+from unitypackage_opener.packer import BLOCK_SIZE, collect_entries, pack
+from unitypackage_opener.project import meta_guid
+
+KEPT_GUID = "0123456789abcdef0123456789abcdef"
+
+
+def _source(root: str) -> dict:
+    """Write a small Assets/Kit tree; returns {pathname: bytes} of what should be packed."""
+    rnd = random.Random(0)
+    files = {
+        "Scripts/Player.cs": b"// player\n" * 50,
+        "Scripts/Enemy.cs": b"// enemy\n",
+        "Textures/テクスチャ.png": rnd.randbytes(1000),
+        "empty.txt": b"",
+        # Spans several compression blocks
+        "big.bin": rnd.randbytes(2 * BLOCK_SIZE + 123),
+    }
+    for rel, data in files.items():
+        path = os.path.join(root, *rel.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+    with open(os.path.join(root, "Scripts", "Player.cs.meta"), "w", encoding="utf-8") as f:
+        f.write(f"fileFormatVersion: 2\nguid: {KEPT_GUID}\nMonoImporter:\n  serializedVersion: 2\n")
+    # Ignored like Unity does
+    with open(os.path.join(root, "Scripts", "Player.cs~"), "wb") as f:
+        f.write(b"backup")
+    return {f"Assets/Kit/{rel}": data for rel, data in files.items()}
+
+
+def _tree(root: str) -> dict:
+    found = {}
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(dirpath, name)
+            with open(path, "rb") as f:
+                found[os.path.relpath(path, root).replace(os.sep, "/")] = f.read()
+    return found
+
+
+def test_pack_then_extract_round_trip(tmp_path):
+    source = str(tmp_path / "src" / "Assets" / "Kit")
+    expected = _source(source)
+    guids = {e.pathname: e.guid for e in collect_entries(source)}
+    assert guids["Assets/Kit/Scripts/Player.cs"] == KEPT_GUID
+    package = str(tmp_path / "Kit.unitypackage")
+    pack(source, package)
+
+    plain = str(tmp_path / "plain")
+    extract_unitypackage(package, plain)
+    assert _tree(plain) == expected
+
+    # Project mode writes the .meta of every asset and folder, so the GUIDs can be checked on disk
+    project = str(tmp_path / "project")
+    extract_unitypackage(package, project, project=True)
+    tree = _tree(project)
+    assert {p: d for p, d in tree.items() if not p.endswith(".meta")} == expected
+    assert {p[: -len(".meta")]: meta_guid(d) for p, d in tree.items() if p.endswith(".meta")} == guids
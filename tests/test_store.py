@@ -0,0 +1,38 @@
+from unitypackage_opener.extractor import extract_multiple
+from unitypackage_opener.store import AssetStore, package_fingerprint
+
+from conftest import make_package, read_tree
+
+
+def test_parallel_runs_share_the_store(tmp_path):
+    packages = [
+        make_package(str(tmp_path / name), name, {f"f{i}.txt": f"{name} {i}\n".encode() * 100 for i in range(20)})
+        for name in ("First", "Second")
+    ]
+    store = AssetStore(root=str(tmp_path / "store"))
+    # Each worker process adds to the same database: neither may hold its write lock for a whole package
+    extract_multiple(packages, str(tmp_path / "out"), mode="individual", jobs=2, store=store)
+    extracted = read_tree(str(tmp_path / "out"))
+    for package in packages:
+        assert store.lookup(package_fingerprint(package)) is not None
+
+    # Served from the store this time: same files
+    extract_multiple(packages, str(tmp_path / "again"), mode="individual", jobs=2, store=store)
+    assert read_tree(str(tmp_path / "again")) == extracted
+
+
+def test_adding_objects_does_not_lock_out_other_processes(tmp_path):
+    # Two handles stand in for two worker processes
+    first = AssetStore(root=str(tmp_path / "store"))
+    second = AssetStore(root=str(tmp_path / "store"))
+    source = tmp_path / "asset.txt"
+    source.write_bytes(b"shared asset\n")
+    first.add("a" * 40, str(source))
+    # Would wait for the first handle's write lock (and time out) if add had written to the database
+    second.add("b" * 40, str(source))
+    second.record_package("second", [("guid2", "Assets/b.txt", "b" * 40)], complete=True)
+    first.record_package("first", [("guid1", "Assets/a.txt", "a" * 40)], complete=True)
+    assert first.lookup("second") == [("guid2", "Assets/b.txt", "b" * 40, len(b"shared asset\n"))]
+    assert second.lookup("first") is not None
+    first.close()
+    second.close()
@@ -1,4 +1,8 @@
-from unitypackage_opener.app import main
+import multiprocessing
+
+from unitypackage_opener.headless import main
 
 if __name__ == "__main__":
+    # Needed for the process pool in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     main()
@@ -1,15 +1,15 @@
 # ...existing code...
 import os
-import sys
+import queue
+import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox
 
 import customtkinter as ctk
 
-from .extractor import extract_multiple
 from .settings import AppSettings, load_settings, save_settings
-from .registry import ensure_registered, APP_NAME, SETTINGS_DIR
-from .progress_indicator import extraction_progress_indicator, try_show_toast_notification
+from .registry import ensure_registered, APP_NAME
+from .progress_indicator import format_progress
 
 
 class App(ctk.CTk):
@@ -60,6 +60,7 @@ class App(ctk.CTk):
         mode_row.grid(row=row, column=1, sticky="we", **gpad)
         self._radio(mode_row, "マージモード", self.mode_var, "merge").grid(row=0, column=0, sticky="w", padx=6)
         self._radio(mode_row, "個別モード", self.mode_var, "individual").grid(row=0, column=1, sticky="w", padx=6)
+        self._radio(mode_row, "プロジェクトモード", self.mode_var, "project").grid(row=0, column=2, sticky="w", padx=6)
         row += 1
 
         # 競合解決（横並び）
@@ -70,6 +71,7 @@ class App(ctk.CTk):
         self._radio(conflict_row, "常に上書き", self.conflict_var, "overwrite").grid(row=0, column=0, sticky="w", padx=6)
         self._radio(conflict_row, "常にスキップ", self.conflict_var, "skip").grid(row=0, column=1, sticky="w", padx=6)
         self._radio(conflict_row, "常に名前を変えて保存", self.conflict_var, "rename").grid(row=0, column=2, sticky="w", padx=6)
+        self._radio(conflict_row, "内容が同じならスキップ", self.conflict_var, "identical").grid(row=1, column=0, columnspan=3, sticky="w", padx=6, pady=(4, 0))
         row += 1
 
         # 出力先モード（横並び）
@@ -123,132 +125,81 @@ class App(ctk.CTk):
         messagebox.showinfo(APP_NAME, "設定を保存しました。")
 
 
-def main():
-    args = sys.argv[1:]
-    # Clear debug log at every launch
-    debug_log_path = os.path.join(SETTINGS_DIR, "debug_headless.log")
-    try:
-        os.makedirs(SETTINGS_DIR, exist_ok=True)
-        with open(debug_log_path, "w", encoding="utf-8") as df:
-            df.write("")
-    except Exception:
-        pass
-    with open(debug_log_path, "a", encoding="utf-8") as df:
-        df.write("[DEBUG] sys.argv: " + repr(sys.argv) + "\n")
-        df.write("[DEBUG] raw args: " + repr(args) + "\n")
-    headless_flag = False
-    file_candidates = []
-    for a in args:
-        if a == "--headless":
-            headless_flag = True
-            continue
-        if a.strip():
-            file_candidates.append(a)
-    # ログ: 受け取ったファイル候補一覧
-    with open(os.path.join(SETTINGS_DIR, "debug_headless.log"), "a", encoding="utf-8") as df:
-        df.write("[DEBUG] file_candidates: " + repr(file_candidates) + "\n")
-    # .unitypackage拡張子で存在するファイルのみ抽出
-    passed = []
-    for arg in file_candidates:
-        exists = os.path.exists(arg)
-        is_unitypackage = arg.lower().endswith('.unitypackage')
-        with open(os.path.join(SETTINGS_DIR, "debug_headless.log"), "a", encoding="utf-8") as df:
-            df.write(f"[DEBUG] arg: {arg} | exists: {exists} | unitypackage: {is_unitypackage}\n")
-        if is_unitypackage and exists:
-            passed.append(arg)
-    with open(os.path.join(SETTINGS_DIR, "debug_headless.log"), "a", encoding="utf-8") as df:
-        df.write("[DEBUG] passed_detected: " + repr(passed) + "\n")
-
-    if headless_flag or passed:
-        app_settings = load_settings()
-
-        os.makedirs(SETTINGS_DIR, exist_ok=True)
-        log_path = os.path.join(SETTINGS_DIR, "last_run.log")
-        debug_path = os.path.join(SETTINGS_DIR, "debug_headless.log")
+class ProgressWindow(ctk.CTk):
+    """Small window with a live progress bar for a headless extraction."""
+
+    POLL_MS = 100
 
+    def __init__(self, work):
+        super().__init__()
+        ctk.set_appearance_mode("dark")
+        ctk.set_default_color_theme("dark-blue")
+        self.title(APP_NAME)
+        self.geometry("420x110")
+        self.resizable(False, False)
+
+        self.package_label = ctk.CTkLabel(self, text="解凍の準備中...", anchor="w")
+        self.package_label.pack(fill="x", padx=12, pady=(12, 2))
+        self.bar = ctk.CTkProgressBar(self)
+        self.bar.set(0)
+        self.bar.pack(fill="x", padx=12, pady=4)
+        self.detail_label = ctk.CTkLabel(self, text="", anchor="w")
+        self.detail_label.pack(fill="x", padx=12, pady=(2, 12))
+
+        # 解凍はワーカースレッドで行い、イベントはキュー経由で受け取る
+        self._events: queue.Queue = queue.Queue()
+        self.result = None
+        self.error: BaseException | None = None
+        self._worker = threading.Thread(target=self._run, args=(work,), daemon=True)
+        self._worker.start()
+        self.after(self.POLL_MS, self._poll)
+
+    def _run(self, work):
         try:
-            with open(debug_path, "a", encoding="utf-8") as df:
-                df.write("===== Invocation =====\n")
-                df.write(f"argv            : {sys.argv}\n")
-                df.write(f"headless_flag   : {headless_flag}\n")
-                df.write(f"raw_args        : {args}\n")
-                df.write(f"passed_detected : {passed}\n")
-                for p in passed:
-                    exists = os.path.exists(p)
-                    size = os.path.getsize(p) if exists else 'NA'
-                    df.write(f"  file_exists?  : {p} -> {exists} size={size}\n")
-                df.write(f"settings.mode   : {getattr(app_settings,'mode',None)}\n")
-                df.write(f"settings.conflict: {getattr(app_settings,'conflict',None)}\n")
-                df.write(f"settings.output_dir_mode: {getattr(app_settings,'output_dir_mode','auto')}\n")
-
-            if getattr(app_settings, "output_dir_mode", "auto") == "auto" and passed:
-                base_dir = os.path.dirname(os.path.abspath(passed[0]))
-                output_dir = base_dir
-            else:
-                output_dir = app_settings.output_dir
-
-            conflict_policy = app_settings.conflict
-
-            with open(debug_path, "a", encoding="utf-8") as df:
-                df.write(f"resolved_output_dir: {output_dir}\n")
-                df.write(f"effective_conflict : {conflict_policy}\n")
-                if not passed:
-                    df.write("NO FILES -> nothing to extract (headless no-op)\n")
-                else:
-                    df.write(f"extracting {len(passed)} unitypackage(s)\n")
-
-            # Show progress indication during extraction
-            if passed:
-                # Show notification for extraction start
-                first_file = os.path.basename(passed[0])
-                try_show_toast_notification(
-                    "Unity Package Extractor", 
-                    f"Extracting {first_file}..."
-                )
-            
-            with extraction_progress_indicator(
-                show_cursor=True,
-                create_temp_file=bool(passed),
-                output_dir=output_dir if passed else None
-            ):
-                all_results = extract_multiple(
-                    unitypackages=passed,
-                    output_dir=output_dir,
-                    mode=app_settings.mode,
-                    conflict_policy=conflict_policy,
-                )
-
-            # Show completion notification
-            if passed and all_results:
-                total_entries = sum(len(entries) for entries in all_results.values())
-                try_show_toast_notification(
-                    "Unity Package Extractor",
-                    f"Extraction complete! {total_entries} files extracted."
-                )
-
-            with open(debug_path, "a", encoding="utf-8") as df:
-                df.write(f"extraction_result_count: {len(all_results)}\n")
-                for up, entries in all_results.items():
-                    df.write(f"  {up} -> {len(entries)} entries\n")
-                df.write("===== End Invocation =====\n")
-
-            with open(log_path, "w", encoding="utf-8") as f:
-                f.write(f"Mode: {app_settings.mode}\n")
-                f.write(f"Conflict: {app_settings.conflict}\n")
-                f.write(f"Output: {output_dir}\n")
-                f.write("Processed files:\n")
-                for p in passed:
-                    f.write(f" - {p}\n")
-            return
-        except Exception as e:
-            with open(debug_path, "a", encoding="utf-8") as df:
-                df.write(f"ERROR: {e}\n")
-            with open(log_path, "w", encoding="utf-8") as f:
-                f.write(f"Error: {e}\n")
-            sys.exit(1)
+            self.result = work(self._events.put)
+        except BaseException as e:
+            self.error = e
 
+    def _poll(self):
+        event = None
+        while True:
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                break
+        if event is not None:
+            self.bar.set(event.fraction)
+            self.package_label.configure(text=os.path.basename(event.package))
+            self.detail_label.configure(text=format_progress(event))
+        if self._worker.is_alive():
+            self.after(self.POLL_MS, self._poll)
+        else:
+            self.destroy()
+
+
+def run_with_progress_window(work):
+    """
+    Run work(progress_callback) on a worker thread while showing a progress
+    window; returns its result or re-raises its exception.
+    """
+    window = ProgressWindow(work)
+    window.mainloop()
+    if window.error is not None:
+        raise window.error
+    return window.result
+
+
+def run_gui():
     app = App([])
     app.mainloop()
 
+
+def main():
+    # 引数の解釈とヘッドレス実行は headless.py に移動（GUI 以外では tkinter を読み込まない）
+    from .headless import main as headless_main
+
+    headless_main()
+
+
 if __name__ == "__main__":
     main()
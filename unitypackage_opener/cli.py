@@ -0,0 +1,630 @@
+"""
+Command line interface for unattended use (build machines, CI).
+
+    unitypackage_opener extract [options] PATH...
+    unitypackage_opener watch [options] FOLDER...
+    unitypackage_opener pack [options] FOLDER...
+    unitypackage_opener verify [options] PATH...
+    unitypackage_opener diff [options] OLD NEW
+    unitypackage_opener library update|guid|path|collisions ...
+    unitypackage_opener convert [options] PATH...
+
+PATH may be a .unitypackage file, a directory (searched recursively) or a
+glob ("**" matches across directories). The saved settings provide the
+defaults; options only apply to this run and are never saved.
+"""
+import json
+import os
+import sys
+import time
+
+from .extractor import ExtractStats, iter_extract_multiple, package_destination
+from .progress_indicator import ConsoleProgress
+from .settings import load_settings
+from .store import store_from_settings
+
+SUBCOMMANDS = ("extract", "watch", "pack", "verify", "diff", "library", "convert")
+
+PACKAGE_EXT = ".unitypackage"
+
+
+def _is_package(path: str) -> bool:
+    return path.lower().endswith(PACKAGE_EXT) and os.path.isfile(path)
+
+
+def _walk_packages(directory: str) -> list[str]:
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(PACKAGE_EXT):
+                found.append(os.path.join(root, name))
+    return found
+
+
+def expand_inputs(inputs: list[str]) -> tuple[list[str], list[str]]:
+    """
+    Resolve files, directories and globs to package paths, keeping the
+    order of the inputs and dropping duplicates. Returns (packages, inputs
+    that matched nothing).
+    """
+    import glob
+
+    packages: list[str] = []
+    seen: set = set()
+    unmatched: list[str] = []
+    for item in inputs:
+        if glob.has_magic(item):
+            matches = sorted(glob.glob(item, recursive=True))
+        else:
+            matches = [item]
+        found = []
+        for match in matches:
+            if os.path.isdir(match):
+                found.extend(_walk_packages(match))
+            elif _is_package(match) or (match == item and os.path.isfile(match)):
+                # A file named explicitly is taken whatever its extension
+                found.append(match)
+        if not found:
+            unmatched.append(item)
+        for path in found:
+            key = os.path.normcase(os.path.abspath(path))
+            if key not in seen:
+                seen.add(key)
+                packages.append(os.path.abspath(path))
+    return packages, unmatched
+
+
+def exit_on_broken_pipe(func, *args) -> int:
+    """
+    Run func(*args) and return its status. If stdout is closed early (the
+    output piped to head, say), exit quietly with status 1 instead of
+    printing a BrokenPipeError traceback.
+    """
+    try:
+        status = func(*args)
+        sys.stdout.flush()
+        return status
+    except BrokenPipeError:
+        # Python flushes stdout again on exit; send that to devnull so it can't fail too
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+
+
+def _build_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="unitypackage_opener")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    extract = sub.add_parser("extract", help="extract packages without the GUI")
+    extract.add_argument("paths", nargs="+", metavar="PATH", help="package file, directory or glob")
+    _add_extract_options(extract)
+
+    watch = sub.add_parser("watch", help="extract packages dropped into folders")
+    watch.add_argument("folders", nargs="+", metavar="FOLDER")
+    watch.add_argument("--poll", action="store_true", help="poll instead of using inotify")
+    watch.add_argument("--interval", type=float, default=5.0, help="seconds between polls (default 5)")
+    watch.add_argument("--stable", type=float, default=2.0, help="seconds a file must stay unchanged (default 2)")
+    _add_extract_options(watch)
+
+    pack = sub.add_parser("pack", help="create packages from folders")
+    pack.add_argument("folders", nargs="+", metavar="FOLDER")
+    pack.add_argument("-o", "--output", help="package file (one folder) or output folder (default: next to FOLDER)")
+    pack.add_argument("--root", help="pathname of FOLDER in the package (default: from its Assets folder)")
+    pack.add_argument("-j", "--jobs", type=int, default=0, help="compression threads (0 = CPU count)")
+    pack.add_argument("--level", type=int, default=6, choices=range(1, 10), metavar="1-9", help="gzip level (default 6)")
+    pack.add_argument("--json", action="store_true", help="print one JSON object per line")
+
+    verify = sub.add_parser("verify", help="check packages for corruption without extracting")
+    verify.add_argument("paths", nargs="+", metavar="PATH", help="package file, directory or glob")
+    verify.add_argument("-j", "--jobs", type=int, help="parallel processes (0 = CPU count)")
+    verify.add_argument("--json", action="store_true", help="print one JSON object per line")
+
+    diff = sub.add_parser("diff", help="compare two versions of a package by GUID")
+    diff.add_argument("old", metavar="OLD")
+    diff.add_argument("new", metavar="NEW")
+    diff.add_argument("--upgrade", metavar="DEST", help="update DEST, extracted from OLD, to NEW (delta only)")
+    diff.add_argument("--delete-removed", action="store_true", help="with --upgrade, delete assets NEW no longer has")
+    diff.add_argument("--conflict", choices=("overwrite", "skip", "rename", "identical"), default="overwrite")
+    diff.add_argument("--json", action="store_true", help="print one JSON object per line")
+
+    library = sub.add_parser("library", help="index packages and look up GUIDs, paths and collisions")
+    actions = library.add_subparsers(dest="action", required=True)
+    update = actions.add_parser("update", help="add new or changed packages to the library")
+    update.add_argument("paths", nargs="+", metavar="PATH", help="package file, directory or glob")
+    update.add_argument("-j", "--jobs", type=int, help="parallel processes (0 = CPU count)")
+    update.add_argument("--prune", action="store_true", help="also forget packages that no longer exist")
+    guid = actions.add_parser("guid", help="packages that contain a GUID")
+    guid.add_argument("guids", nargs="+", metavar="GUID")
+    path = actions.add_parser("path", help="assets whose pathname starts with a prefix")
+    path.add_argument("prefix", metavar="PREFIX")
+    collisions = actions.add_parser("collisions", help="pathnames several packages would write in merge mode")
+    collisions.add_argument("paths", nargs="*", metavar="PATH", help="limit to these packages (default: all)")
+    collisions.add_argument("--guid-clashes", action="store_true", help="only pathnames with differing GUIDs")
+    for action in (update, guid, path, collisions):
+        action.add_argument("--json", action="store_true", help="print one JSON object per line")
+
+    convert = sub.add_parser("convert", help="repack packages as zip/tar archives keyed by pathname")
+    convert.add_argument("paths", nargs="+", metavar="PATH", help="package file, directory or glob")
+    convert.add_argument("-o", "--output", help="archive file or '-' (one package) or output folder (default: next to PATH)")
+    convert.add_argument("--format", choices=("zip", "tar", "tar.gz", "tar.zst"), help="default: from -o, else zip")
+    convert.add_argument("-j", "--jobs", type=int, default=0, help="compression threads for tar.gz/tar.zst (0 = CPU count)")
+    convert.add_argument("--level", type=int, help="compression level (default: 6, zstd 3; 0 stores zip members)")
+    convert.add_argument("--include", action="append", default=[], metavar="GLOB")
+    convert.add_argument("--exclude", action="append", default=[], metavar="GLOB")
+    convert.add_argument("--guid", dest="guids", action="append", default=[], metavar="GUID")
+    convert.add_argument("--json", action="store_true", help="print one JSON object per line")
+    return parser
+
+
+def _add_extract_options(parser) -> None:
+    parser.add_argument("-o", "--output", help="output folder (default: from settings)")
+    parser.add_argument("--mode", choices=("merge", "individual", "project"))
+    parser.add_argument("--conflict", choices=("overwrite", "skip", "rename", "identical"))
+    parser.add_argument("-j", "--jobs", type=int, help="parallel processes, or threads for one package (0 = CPU count)")
+    parser.add_argument("--include", action="append", default=[], metavar="GLOB")
+    parser.add_argument("--exclude", action="append", default=[], metavar="GLOB")
+    parser.add_argument("--guid", dest="guids", action="append", default=[], metavar="GUID")
+    parser.add_argument("--no-resume", action="store_true", help="ignore journals of interrupted runs")
+    parser.add_argument(
+        "--move-existing", action="store_true", help="project mode: move assets already in the project to the package's path"
+    )
+    parser.add_argument("--json", action="store_true", help="print one JSON object per line")
+
+
+class _Reporter:
+    """Prints one line per package, as JSON or as text."""
+
+    def __init__(self, as_json: bool, stream=None):
+        self.as_json = as_json
+        self.stream = stream if stream is not None else sys.stdout
+        self.failed = 0
+        self.packages = 0
+        self.entries = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+
+    def _emit(self, record: dict, text: str) -> None:
+        if self.as_json:
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            self.stream.write(text + "\n")
+        self.stream.flush()
+
+    def unmatched(self, item: str) -> None:
+        self.failed += 1
+        self._emit(
+            {"event": "error", "input": item, "error": "no packages found"},
+            f"FAIL  {item}: no packages found",
+        )
+
+    def package(self, path: str, output: str, stats, error) -> None:
+        self.packages += 1
+        record = {
+            "event": "package",
+            "package": path,
+            "output": output,
+            "ok": error is None,
+            "entries": stats.entries,
+            "bytes_written": stats.bytes_written,
+            "compressed_bytes": stats.compressed_bytes,
+            "conflicts": stats.conflicts,
+            "seconds": round(stats.seconds, 3),
+            "error": None if error is None else f"{type(error).__name__}: {error}",
+        }
+        if error is not None:
+            self.failed += 1
+            text = f"FAIL  {path}: {record['error']}"
+        else:
+            self.entries += stats.entries
+            self.bytes_written += stats.bytes_written
+            text = (
+                f"ok    {path} -> {output} ({stats.entries} files, "
+                f"{stats.bytes_written / 1e6:.1f} MB, {stats.conflicts} conflicts, {stats.seconds:.2f}s)"
+            )
+        self._emit(record, text)
+
+    def packed(self, folder: str, stats, error) -> None:
+        self.packages += 1
+        record = {
+            "event": "pack",
+            "folder": folder,
+            "package": stats.package,
+            "ok": error is None,
+            "assets": stats.assets,
+            "folders": stats.folders,
+            "bytes_in": stats.bytes_in,
+            "bytes_out": stats.bytes_out,
+            "seconds": round(stats.seconds, 3),
+            "error": None if error is None else f"{type(error).__name__}: {error}",
+        }
+        if error is not None:
+            self.failed += 1
+            text = f"FAIL  {folder}: {record['error']}"
+        else:
+            self.entries += stats.assets
+            self.bytes_written += stats.bytes_out
+            text = (
+                f"ok    {folder} -> {stats.package} ({stats.assets} files, "
+                f"{stats.bytes_out / 1e6:.1f} MB, {stats.seconds:.2f}s)"
+            )
+        self._emit(record, text)
+
+    def converted(self, path: str, stats, error) -> None:
+        self.packages += 1
+        record = {
+            "event": "convert",
+            "package": path,
+            "output": stats.output,
+            "format": stats.format,
+            "ok": error is None,
+            "assets": stats.assets,
+            "skipped": stats.skipped,
+            "bytes_in": stats.bytes_in,
+            "bytes_out": stats.bytes_out,
+            "seconds": round(stats.seconds, 3),
+            "error": None if error is None else f"{type(error).__name__}: {error}",
+        }
+        if error is not None:
+            self.failed += 1
+            text = f"FAIL  {path}: {record['error']}"
+        else:
+            self.entries += stats.assets
+            self.bytes_written += stats.bytes_out
+            text = (
+                f"ok    {path} -> {stats.output} ({stats.assets} files, {stats.skipped} skipped, "
+                f"{stats.bytes_out / 1e6:.1f} MB, {stats.seconds:.2f}s)"
+            )
+        self._emit(record, text)
+
+    def verified(self, report) -> None:
+        self.packages += 1
+        self.entries += report.assets
+        self.bytes_read += report.compressed_bytes
+        record = {"event": "verify", **report.as_dict()}
+        if report.ok:
+            text = (
+                f"ok    {report.package} ({report.assets} assets, "
+                f"{report.compressed_bytes / 1e6:.1f} MB, {report.mb_per_s:.1f} MB/s)"
+            )
+        else:
+            self.failed += 1
+            details = [report.error] if report.error else []
+            details += report.problems
+            if report.problem_count > len(report.problems):
+                details.append(f"... {report.problem_count - len(report.problems)} more")
+            text = f"FAIL  {report.package}: " + "; ".join(details)
+        self._emit(record, text)
+
+    def summary(self, seconds: float) -> None:
+        record = {
+            "event": "summary",
+            "packages": self.packages,
+            "failed": self.failed,
+            "entries": self.entries,
+            "bytes_written": self.bytes_written,
+            "seconds": round(seconds, 3),
+        }
+        text = f"{self.packages} packages, {self.failed} failed, {self.entries} files in {seconds:.2f}s"
+        if self.bytes_read:
+            record["bytes_read"] = self.bytes_read
+            record["mb_per_s"] = round(self.bytes_read / seconds / 1e6, 1) if seconds > 0 else 0.0
+            text += f" ({record['mb_per_s']} MB/s)"
+        self._emit(record, text)
+
+
+def _package_output(path: str, args, app_settings) -> str:
+    if args.output:
+        return os.path.abspath(args.output)
+    if getattr(app_settings, "output_dir_mode", "auto") == "auto":
+        return os.path.dirname(path)
+    return app_settings.output_dir
+
+
+def _jobs(args, app_settings) -> int:
+    jobs = args.jobs if args.jobs is not None else app_settings.jobs
+    return jobs if jobs > 0 else (os.cpu_count() or 1)
+
+
+def extract_packages(packages: list[str], args, app_settings, reporter: _Reporter, progress=None, executor=None):
+    """
+    Extract with the settings overridden by args, one iter_extract_multiple
+    run per output folder in input order. Returns {path: error message or None}.
+    """
+    mode = args.mode or app_settings.mode
+    outcome: dict = {}
+    groups: dict[str, list[str]] = {}
+    for path in packages:
+        groups.setdefault(_package_output(path, args, app_settings), []).append(path)
+
+    for output_dir, paths in groups.items():
+
+        def on_package(path, stats, error, output_dir=output_dir):
+            reporter.package(path, package_destination(path, output_dir, mode), stats, error)
+            outcome[path] = None if error is None else f"{type(error).__name__}: {error}"
+
+        try:
+            # Only the per-package summary is reported; asset records are not kept
+            for _ in iter_extract_multiple(
+                paths,
+                output_dir,
+                mode=mode,
+                conflict_policy=args.conflict or app_settings.conflict,
+                jobs=_jobs(args, app_settings),
+                include=args.include or app_settings.include,
+                exclude=args.exclude or app_settings.exclude,
+                guids=args.guids or app_settings.guids,
+                executor=executor,
+                progress=progress,
+                resume=not args.no_resume and app_settings.resume,
+                on_package=on_package,
+                store=store_from_settings(app_settings),
+                move_existing=args.move_existing or app_settings.move_existing,
+            ):
+                pass
+        except Exception as e:
+            # e.g. the output folder cannot be created: every package of the group fails
+            for path in paths:
+                if path not in outcome:
+                    on_package(path, ExtractStats(package=path), e)
+    return outcome
+
+
+def run_extract(args) -> int:
+    app_settings = load_settings()
+    started = time.perf_counter()
+    reporter = _Reporter(args.json)
+    packages, unmatched = expand_inputs(args.paths)
+    for item in unmatched:
+        reporter.unmatched(item)
+
+    progress = ConsoleProgress() if packages and ConsoleProgress.available() else None
+    extract_packages(packages, args, app_settings, reporter, progress)
+
+    reporter.summary(time.perf_counter() - started)
+    return 1 if reporter.failed else 0
+
+
+def run_watch(args) -> int:
+    from .watch import FolderWatcher
+
+    reporter = _Reporter(args.json)
+    missing = [f for f in args.folders if not os.path.isdir(f)]
+    for folder in missing:
+        reporter.unmatched(folder)
+    if missing:
+        return 1
+
+    pool = None
+    jobs = _jobs(args, load_settings())
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool = ProcessPoolExecutor(max_workers=jobs)
+
+    def handler(paths: list[str]):
+        # Settings are re-read per batch so changes apply without a restart
+        return extract_packages(paths, args, load_settings(), reporter, executor=pool)
+
+    def log(message: str) -> None:
+        print(message, file=sys.stderr, flush=True)
+
+    watcher = FolderWatcher(
+        args.folders,
+        handler,
+        batch_size=jobs,
+        stable_seconds=args.stable,
+        poll_interval=args.interval,
+        use_inotify=not args.poll,
+        log=log,
+    )
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True)
+    return 0
+
+
+def _pack_output(folder: str, args, count: int) -> str:
+    name = os.path.basename(os.path.normpath(os.path.abspath(folder))) + PACKAGE_EXT
+    if not args.output:
+        return os.path.join(os.path.dirname(os.path.normpath(os.path.abspath(folder))), name)
+    if count == 1 and args.output.lower().endswith(PACKAGE_EXT):
+        return os.path.abspath(args.output)
+    return os.path.join(os.path.abspath(args.output), name)
+
+
+def run_pack(args) -> int:
+    from .packer import PackStats, pack
+
+    started = time.perf_counter()
+    reporter = _Reporter(args.json)
+    for folder in args.folders:
+        output = _pack_output(folder, args, len(args.folders))
+        stats = PackStats(package=output)
+        error = None
+        try:
+            if not os.path.isdir(folder):
+                raise FileNotFoundError(f"not a folder: {folder}")
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+            pack(folder, output, root=args.root, jobs=args.jobs, level=args.level, stats=stats)
+        except Exception as e:
+            error = e
+        reporter.packed(folder, stats, error)
+    reporter.summary(time.perf_counter() - started)
+    return 1 if reporter.failed else 0
+
+
+def _convert_output(path: str, args, fmt: str, count: int) -> str:
+    from .convert import FORMATS
+
+    name = os.path.splitext(os.path.basename(path))[0] + FORMATS[fmt]
+    if not args.output:
+        return os.path.join(os.path.dirname(path), name)
+    if count == 1 and (args.output == "-" or not os.path.isdir(args.output)):
+        return args.output if args.output == "-" else os.path.abspath(args.output)
+    return os.path.join(os.path.abspath(args.output), name)
+
+
+def run_convert(args) -> int:
+    from .convert import ConvertStats, convert, format_from_path
+
+    started = time.perf_counter()
+    packages, unmatched = expand_inputs(args.paths)
+    fmt = args.format or (format_from_path(args.output) if args.output else None) or "zip"
+    # With the archive on stdout the report goes to stderr
+    reporter = _Reporter(args.json, sys.stderr if args.output == "-" else None)
+    for item in unmatched:
+        reporter.unmatched(item)
+    if args.output == "-" and len(packages) > 1:
+        sys.stderr.write("convert: '-o -' takes a single package\n")
+        return 1
+    for path in packages:
+        output = _convert_output(path, args, fmt, len(packages))
+        stats = ConvertStats(package=path, output=output, format=fmt)
+        error = None
+        try:
+            if output != "-":
+                os.makedirs(os.path.dirname(output), exist_ok=True)
+            convert(
+                path, output, fmt, args.level, args.jobs,
+                include=args.include, exclude=args.exclude, guids=args.guids, stats=stats,
+            )
+        except Exception as e:
+            error = e
+        reporter.converted(path, stats, error)
+    reporter.summary(time.perf_counter() - started)
+    return 1 if reporter.failed else 0
+
+
+def run_verify(args) -> int:
+    from .verify import verify_packages
+
+    started = time.perf_counter()
+    reporter = _Reporter(args.json)
+    packages, unmatched = expand_inputs(args.paths)
+    for item in unmatched:
+        reporter.unmatched(item)
+    verify_packages(packages, _jobs(args, load_settings()), on_report=reporter.verified)
+    reporter.summary(time.perf_counter() - started)
+    return 1 if reporter.failed else 0
+
+
+def run_diff(args) -> int:
+    from .diff import diff_packages, upgrade
+
+    started = time.perf_counter()
+    out = sys.stdout
+    store = store_from_settings(load_settings())
+    try:
+        if args.upgrade:
+            result = upgrade(args.old, args.new, args.upgrade, args.conflict, args.delete_removed, store)
+            changes = result.diff
+        else:
+            result = None
+            changes = diff_packages(args.old, args.new, store)
+    except Exception as e:
+        _Reporter(args.json).unmatched(f"{args.old} -> {args.new}: {type(e).__name__}: {e}")
+        return 1
+    finally:
+        if store is not None:
+            store.close()
+    for entry in changes.entries:
+        if args.json:
+            out.write(json.dumps(dict(vars(entry), event="change"), ensure_ascii=False) + "\n")
+        elif entry.old_pathname and entry.old_pathname != entry.pathname:
+            out.write(f"{entry.change:9} {entry.old_pathname} -> {entry.pathname}\n")
+        else:
+            out.write(f"{entry.change:9} {entry.pathname}\n")
+    record = dict(changes.counts(), event="summary", seconds=round(time.perf_counter() - started, 3))
+    if result is not None:
+        record.update(moved_in_place=result.moved, extracted=len(result.extracted), deleted=result.removed)
+    if args.json:
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    else:
+        out.write(", ".join(f"{k} {v}" for k, v in record.items() if k != "event") + "\n")
+    out.flush()
+    return 0
+
+
+def run_library(args) -> int:
+    from .library import Library
+
+    out = sys.stdout
+
+    def emit(record: dict, text: str) -> None:
+        out.write((json.dumps(record, ensure_ascii=False) if args.json else text) + "\n")
+
+    with Library() as library:
+        if args.action == "update":
+            packages, unmatched = expand_inputs(args.paths)
+            for item in unmatched:
+                emit({"event": "error", "input": item, "error": "no packages found"}, f"FAIL  {item}: no packages found")
+
+            def on_package(path, error):
+                if error is not None:
+                    emit({"event": "package", "package": path, "ok": False, "error": error}, f"FAIL  {path}: {error}")
+
+            stats = library.update(packages, _jobs(args, load_settings()), on_package)
+            removed = library.prune() if args.prune else 0
+            emit(
+                {"event": "summary", "scanned": stats.scanned, "unchanged": stats.unchanged, "failed": stats.failed,
+                 "removed": removed, "seconds": round(stats.seconds, 3)},
+                f"{stats.scanned} scanned, {stats.unchanged} unchanged, {stats.failed} failed, "
+                f"{removed} removed in {stats.seconds:.2f}s",
+            )
+            failed = stats.failed + len(unmatched)
+        elif args.action == "guid":
+            failed = 0
+            for guid in args.guids:
+                rows = library.find_guid(guid)
+                failed += not rows
+                for package, pathname in rows:
+                    emit({"guid": guid, "package": package, "pathname": pathname}, f"{guid}  {pathname}  {package}")
+        elif args.action == "path":
+            rows = library.find_path(args.prefix)
+            failed = not rows
+            for package, guid, pathname in rows:
+                emit({"guid": guid, "package": package, "pathname": pathname}, f"{pathname}  {guid}  {package}")
+        else:
+            scope = expand_inputs(args.paths)[0] if args.paths else None
+            failed = 0
+            for collision in library.collisions(scope):
+                if args.guid_clashes and collision.same_guid:
+                    continue
+                failed = 1
+                emit(
+                    {"pathname": collision.pathname, "same_guid": collision.same_guid,
+                     "packages": [{"package": p, "guid": g} for p, g in collision.packages]},
+                    f"{collision.pathname}" + "".join(f"\n    {g}  {p}" for p, g in collision.packages),
+                )
+    out.flush()
+    return 1 if failed else 0
+
+
+def main(argv: list[str]) -> int:
+    args = _build_parser().parse_args(argv)
+    return exit_on_broken_pipe(_run, args)
+
+
+def _run(args) -> int:
+    if args.command == "extract":
+        return run_extract(args)
+    if args.command == "watch":
+        return run_watch(args)
+    if args.command == "pack":
+        return run_pack(args)
+    if args.command == "verify":
+        return run_verify(args)
+    if args.command == "diff":
+        return run_diff(args)
+    if args.command == "library":
+        return run_library(args)
+    if args.command == "convert":
+        return run_convert(args)
+    return 2
@@ -0,0 +1,193 @@
+"""
+Repack .unitypackage files as ordinary archives keyed by pathname.
+
+The package is streamed once: every GUID entry with an asset becomes one
+archive member named by its pathname, written straight from the inflating
+tar reader into the output (zip, tar, tar.gz or tar.zst). Nothing is
+extracted to disk. Pathnames are taken from the package index if it has
+been cached, so no asset waits for its pathname member; otherwise the
+package is still read only once and an asset that comes before its
+pathname is buffered (spilled next to the output if it is large) until
+the pathname arrives.
+
+tar.gz output is compressed on several threads the way pack does it (see
+packer.write_gzip); tar.zst uses zstandard's own worker threads and needs
+the optional zstandard package. zip members are deflated on the calling
+thread.
+"""
+import os
+import sys
+import tarfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, Tuple
+
+from .extractor import AssetFilter, iter_package_assets
+from .verify import is_unsafe_pathname
+
+FORMATS = {"zip": ".zip", "tar": ".tar", "tar.gz": ".tar.gz", "tar.zst": ".tar.zst"}
+DEFAULT_LEVELS = {"zip": 6, "tar": 0, "tar.gz": 6, "tar.zst": 3}
+
+
+@dataclass
+class ConvertStats:
+    package: str = ""
+    output: str = ""
+    format: str = ""
+    assets: int = 0
+    # Assets left out: pathname would leave the archive root, or repeats an earlier one
+    skipped: int = 0
+    # Asset bytes written, before and after output compression
+    bytes_in: int = 0
+    bytes_out: int = 0
+    seconds: float = 0.0
+
+
+def format_from_path(path: str) -> Optional[str]:
+    lower = path.lower()
+    if lower.endswith(".tgz"):
+        return "tar.gz"
+    for fmt in ("tar.gz", "tar.zst", "tar", "zip"):
+        if lower.endswith(FORMATS[fmt]):
+            return fmt
+    return None
+
+
+def _sized(chunks: Iterator[bytes], size: int, name: str) -> Iterator[bytes]:
+    left = size
+    for chunk in chunks:
+        left -= len(chunk)
+        yield chunk
+    if left:
+        raise OSError(f"{name}: member data ended {left} bytes early")
+
+
+def _iter_entries(
+    unitypackage_path: str, index, asset_filter: Optional[AssetFilter], stats: ConvertStats
+) -> Iterator[Tuple[str, int, Iterator[bytes]]]:
+    """(pathname, size, data chunks) per asset, in archive order; each must be consumed before the next."""
+    seen = set()
+    spill_dir = os.path.dirname(stats.output) or "."
+    for _, pathname, asset in iter_package_assets(unitypackage_path, spill_dir, index, asset_filter):
+        name = pathname.replace("\\", "/")
+        if is_unsafe_pathname(name) or name in seen:
+            stats.skipped += 1
+            asset.discard()
+            continue
+        seen.add(name)
+        stats.assets += 1
+        stats.bytes_in += asset.size
+        yield name, asset.size, _sized(asset.chunks(), asset.size, name)
+
+
+def _tar_header(name: str, size: int, mtime: int) -> bytes:
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mtime = mtime
+    info.mode = 0o644
+    # PAX only adds an extended header for names ustar can't hold
+    return info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
+
+
+def _tar_pieces(entries: Iterable[Tuple[str, int, Iterator[bytes]]], mtime: int) -> Iterator[bytes]:
+    for name, size, chunks in entries:
+        yield _tar_header(name, size, mtime)
+        yield from chunks
+        yield b"\0" * (-size % tarfile.BLOCKSIZE)
+    yield b"\0" * tarfile.RECORDSIZE
+
+
+def _write_zip(entries, out, level: int, mtime: int) -> None:
+    import zipfile
+
+    compression = zipfile.ZIP_DEFLATED if level > 0 else zipfile.ZIP_STORED
+    date_time = time.localtime(mtime)[:6]
+    with zipfile.ZipFile(out, "w", compression, compresslevel=level if level > 0 else None) as zf:
+        for name, size, chunks in entries:
+            info = zipfile.ZipInfo(name, date_time)
+            info.compress_type = compression
+            info.external_attr = 0o644 << 16
+            # Known up front, so zip64 fields are only used when needed
+            info.file_size = size
+            with zf.open(info, "w") as member:
+                for chunk in chunks:
+                    member.write(chunk)
+
+
+def _write_zstd(pieces: Iterator[bytes], out, level: int, jobs: int) -> None:
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("tar.zst output needs the zstandard package (pip install zstandard)") from None
+    cctx = zstandard.ZstdCompressor(level=level, threads=jobs if jobs > 0 else -1)
+    with cctx.stream_writer(out, closefd=False) as writer:
+        for piece in pieces:
+            writer.write(piece)
+
+
+def convert(
+    unitypackage_path: str,
+    output_path: str,
+    fmt: Optional[str] = None,
+    level: Optional[int] = None,
+    jobs: int = 0,
+    index=None,
+    include: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+    guids: Optional[Iterable[str]] = None,
+    stats: Optional[ConvertStats] = None,
+) -> ConvertStats:
+    """
+    Write the assets of a package to output_path ("-" for stdout) as an
+    archive of fmt (default: from the output's extension). level: output
+    compression level (default per format; 0 stores zip members).
+    jobs: compression threads for tar.gz and tar.zst (0 = CPU count).
+    include/exclude/guids: see AssetFilter.
+    """
+    start = time.perf_counter()
+    stats = stats if stats is not None else ConvertStats()
+    fmt = fmt or format_from_path(output_path)
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown output format for {output_path}: {fmt} (expected one of {', '.join(FORMATS)})")
+    level = DEFAULT_LEVELS[fmt] if level is None else level
+    to_stdout = output_path == "-"
+    stats.package = os.path.abspath(unitypackage_path)
+    stats.output = output_path if to_stdout else os.path.abspath(output_path)
+    stats.format = fmt
+    mtime = int(os.stat(unitypackage_path).st_mtime)
+    asset_filter = AssetFilter(include, exclude, guids) or None
+    entries = _iter_entries(unitypackage_path, index, asset_filter, stats)
+
+    def _write(out) -> None:
+        if fmt == "zip":
+            _write_zip(entries, out, level, mtime)
+        elif fmt == "tar.gz":
+            from .packer import write_gzip
+
+            write_gzip(_tar_pieces(entries, mtime), out, level, jobs, mtime)
+        elif fmt == "tar.zst":
+            _write_zstd(_tar_pieces(entries, mtime), out, level, jobs)
+        else:
+            for piece in _tar_pieces(entries, mtime):
+                out.write(piece)
+
+    if to_stdout:
+        _write(sys.stdout.buffer)
+        sys.stdout.buffer.flush()
+    else:
+        tmp_path = f"{stats.output}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as out:
+                _write(out)
+                stats.bytes_out = out.tell()
+            os.replace(tmp_path, stats.output)
+        except BaseException:
+            entries.close()
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+    stats.seconds = time.perf_counter() - start
+    return stats
@@ -0,0 +1,236 @@
+"""
+GUID-level diff between two versions of a package, and delta upgrades.
+
+A package's manifest lists, per GUID that carries an asset, its pathname,
+size and content digest. It is built by streaming the package once (asset
+data is hashed as it is inflated, nothing is staged on disk) and cached
+under MANIFEST_DIR by package fingerprint, so a version that has been seen
+before is never inflated again, wherever it is stored. Complete entries in
+the asset store serve as manifests too.
+
+upgrade() brings a destination extracted from the old package to the new
+one: moved assets (same GUID, new pathname) are renamed in place together
+with their .meta, and only added and modified assets are extracted.
+"""
+import gzip
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .extractor import ExtractedAsset, iter_extract
+from .hashcache import new_hasher
+from .index import load_index
+from .project import move_asset
+from .settings import SETTINGS_DIR
+from .store import AssetStore, package_fingerprint
+from .tarreader import iter_members, read_pathname
+
+MANIFEST_DIR = os.path.join(SETTINGS_DIR, "manifest")
+MANIFEST_VERSION = 1
+_HASH_CHUNK = 1024 * 1024
+
+
+@dataclass
+class ManifestEntry:
+    guid: str
+    pathname: str
+    size: int
+    digest: str
+
+
+@dataclass
+class PackageManifest:
+    path: str
+    fingerprint: str
+    entries: List[ManifestEntry] = field(default_factory=list)
+
+    def by_guid(self) -> Dict[str, ManifestEntry]:
+        return {e.guid: e for e in self.entries}
+
+
+@dataclass
+class DiffEntry:
+    guid: str
+    # added, removed, moved (same content, new pathname) or modified
+    # (new content; pathname and old_pathname differ if it moved as well)
+    change: str
+    pathname: str
+    old_pathname: Optional[str] = None
+    size: int = 0
+
+
+@dataclass
+class PackageDiff:
+    old: str
+    new: str
+    entries: List[DiffEntry] = field(default_factory=list)
+    unchanged: int = 0
+
+    def of(self, change: str) -> List[DiffEntry]:
+        return [e for e in self.entries if e.change == change]
+
+    def counts(self) -> Dict[str, int]:
+        counts = {"added": 0, "removed": 0, "moved": 0, "modified": 0, "unchanged": self.unchanged}
+        for e in self.entries:
+            counts[e.change] += 1
+        return counts
+
+
+def _manifest_path(fingerprint: str) -> str:
+    return os.path.join(MANIFEST_DIR, fingerprint + ".json")
+
+
+def scan_manifest(unitypackage_path: str, fingerprint: Optional[str] = None) -> PackageManifest:
+    unitypackage_path = os.path.abspath(unitypackage_path)
+    if fingerprint is None:
+        fingerprint = package_fingerprint(unitypackage_path)
+    pathnames: Dict[str, str] = {}
+    assets: Dict[str, tuple] = {}
+    order: List[str] = []
+    with open(unitypackage_path, "rb") as raw, gzip.GzipFile(fileobj=raw, mode="rb") as gz:
+        for guid, kind, size, _, data in iter_members(gz):
+            if kind == "pathname":
+                real_path = read_pathname(data)
+                if real_path:
+                    pathnames.setdefault(guid, real_path)
+            elif kind == "asset" and guid not in assets:
+                h = new_hasher()
+                while True:
+                    chunk = data.read(_HASH_CHUNK)
+                    if not chunk:
+                        break
+                    h.update(chunk)
+                assets[guid] = (size, h.hexdigest())
+                order.append(guid)
+    entries = [ManifestEntry(guid, pathnames[guid], *assets[guid]) for guid in order if guid in pathnames]
+    return PackageManifest(unitypackage_path, fingerprint, entries)
+
+
+def save_manifest(manifest: PackageManifest) -> None:
+    os.makedirs(MANIFEST_DIR, exist_ok=True)
+    data = {
+        "version": MANIFEST_VERSION,
+        "fingerprint": manifest.fingerprint,
+        "entries": [[e.guid, e.pathname, e.size, e.digest] for e in manifest.entries],
+    }
+    cache_path = _manifest_path(manifest.fingerprint)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, cache_path)
+
+
+def load_manifest(unitypackage_path: str, fingerprint: Optional[str] = None) -> Optional[PackageManifest]:
+    """Return the cached manifest for this package's content, or None."""
+    unitypackage_path = os.path.abspath(unitypackage_path)
+    try:
+        if fingerprint is None:
+            fingerprint = package_fingerprint(unitypackage_path)
+        with open(_manifest_path(fingerprint), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != MANIFEST_VERSION or data.get("fingerprint") != fingerprint:
+        return None
+    return PackageManifest(unitypackage_path, fingerprint, [ManifestEntry(*row) for row in data["entries"]])
+
+
+def get_manifest(unitypackage_path: str, store: Optional[AssetStore] = None) -> PackageManifest:
+    unitypackage_path = os.path.abspath(unitypackage_path)
+    fingerprint = package_fingerprint(unitypackage_path)
+    manifest = load_manifest(unitypackage_path, fingerprint)
+    if manifest is not None:
+        return manifest
+    rows = store.lookup(fingerprint) if store is not None else None
+    if rows is not None:
+        manifest = PackageManifest(
+            unitypackage_path, fingerprint, [ManifestEntry(g, p, size, d) for g, p, d, size in rows]
+        )
+    else:
+        manifest = scan_manifest(unitypackage_path, fingerprint)
+    try:
+        save_manifest(manifest)
+    except OSError:
+        pass
+    return manifest
+
+
+def diff_manifests(old: PackageManifest, new: PackageManifest) -> PackageDiff:
+    result = PackageDiff(old.path, new.path)
+    before = old.by_guid()
+    for entry in new.entries:
+        prev = before.pop(entry.guid, None)
+        if prev is None:
+            result.entries.append(DiffEntry(entry.guid, "added", entry.pathname, size=entry.size))
+        elif prev.digest != entry.digest:
+            result.entries.append(DiffEntry(entry.guid, "modified", entry.pathname, prev.pathname, entry.size))
+        elif prev.pathname != entry.pathname:
+            result.entries.append(DiffEntry(entry.guid, "moved", entry.pathname, prev.pathname, entry.size))
+        else:
+            result.unchanged += 1
+    for prev in before.values():
+        result.entries.append(DiffEntry(prev.guid, "removed", prev.pathname, prev.pathname, prev.size))
+    return result
+
+
+def diff_packages(old_path: str, new_path: str, store: Optional[AssetStore] = None) -> PackageDiff:
+    return diff_manifests(get_manifest(old_path, store), get_manifest(new_path, store))
+
+
+@dataclass
+class UpgradeResult:
+    diff: PackageDiff
+    moved: int = 0
+    removed: int = 0
+    extracted: List[ExtractedAsset] = field(default_factory=list)
+
+
+def upgrade(
+    old_path: str,
+    new_path: str,
+    dest_root: str,
+    conflict_policy: str = "overwrite",
+    remove: bool = False,
+    store: Optional[AssetStore] = None,
+) -> UpgradeResult:
+    """
+    Turn dest_root, extracted from old_path, into what new_path extracts
+    to: moves are applied in place (an asset whose old file is missing, or
+    whose new path is taken, is extracted instead), then added and modified
+    assets are extracted from new_path with conflict_policy. remove deletes
+    files of assets the new version no longer has.
+    """
+    dest_root = os.path.abspath(dest_root)
+    result = UpgradeResult(diff_packages(old_path, new_path, store))
+    wanted = []
+    for entry in result.diff.entries:
+        if entry.change == "removed":
+            if remove:
+                target = os.path.join(dest_root, entry.pathname)
+                try:
+                    os.remove(target)
+                    result.removed += 1
+                except OSError:
+                    continue
+                try:
+                    os.remove(target + ".meta")
+                except OSError:
+                    pass
+        elif entry.change == "moved":
+            if move_asset(dest_root, entry.old_pathname, entry.pathname):
+                result.moved += 1
+            else:
+                wanted.append(entry.guid)
+        else:
+            if entry.change == "modified" and entry.old_pathname != entry.pathname:
+                # Move first so the .meta (and the GUID Unity knows) follows it
+                move_asset(dest_root, entry.old_pathname, entry.pathname)
+            wanted.append(entry.guid)
+    if wanted:
+        result.extracted = list(
+            iter_extract(
+                new_path, dest_root, conflict_policy, index=load_index(new_path), guids=wanted, store=store
+            )
+        )
+    return result
@@ -1,9 +1,176 @@
 # ...existing code...
+import gzip
 import os
+import re
 import stat
 import shutil
-import tarfile
-from typing import Dict, Iterable, List, Optional, Tuple
+import tempfile
+import threading
+import time
+from contextlib import closing, nullcontext
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .hashcache import DigestCache, bytes_digest, file_digest, new_hasher
+from .journal import Journal, remove_journal
+from .store import AssetStore, package_fingerprint
+from .tarreader import iter_members, read_pathname
+
+FILE_MODE = stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IROTH
+
+# Assets whose pathname has not been seen yet are kept in memory up to this
+# many bytes in total; anything beyond that is spilled to a temp file.
+DEFAULT_BUFFER_LIMIT = 64 * 1024 * 1024
+
+_COPY_CHUNK = 1024 * 1024
+
+# Writer threads used by extract_unitypackage; per-file syscalls (makedirs,
+# open, chmod) dominate on packages with many small assets.
+DEFAULT_WRITERS = min(8, os.cpu_count() or 1)
+# At most this many writes per writer thread, and this many buffered bytes,
+# may be queued at once so memory stays flat on large packages.
+WRITE_QUEUE_FACTOR = 4
+WRITE_QUEUE_BYTES = 64 * 1024 * 1024
+# Assets larger than this are streamed to disk by the reading thread.
+WRITE_INLINE_THRESHOLD = 4 * 1024 * 1024
+
+
+@dataclass
+class ExtractStats:
+    """
+    Counters for one package. conflicts counts assets whose target already
+    existed (whatever the policy did about it); seconds is wall time. phases
+    maps a phase name to seconds spent in it: index (loading/building the
+    package index), project (scanning the destination's .meta files), seek
+    (skipping ahead when resuming, and to access points), read (inflate and
+    tar parsing, including buffering assets that wait for their pathname),
+    conflicts, compare (hashing for the identical policy), hash (digesting
+    assets for the asset store), write and chmod
+    (summed over writer threads), wait (reader blocked on the writers) and
+    commit (placing staged files in parallel runs).
+    """
+
+    package: str = ""
+    entries: int = 0
+    bytes_written: int = 0
+    compressed_bytes: int = 0
+    conflicts: int = 0
+    seconds: float = 0.0
+    phases: Dict[str, float] = field(default_factory=dict)
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+# Minimum seconds between two progress events
+PROGRESS_INTERVAL = 0.1
+
+
+@dataclass
+class ProgressEvent:
+    """
+    Progress of an extract_unitypackage / extract_multiple call as a whole.
+    Compressed bytes come from the position in the package file(s), so they
+    advance even while assets are skipped or filtered out.
+    """
+
+    package: str
+    package_index: int
+    package_count: int
+    compressed_done: int
+    compressed_total: int
+    bytes_written: int
+    entries_done: int
+    mb_per_s: float
+    eta_seconds: Optional[float]
+    finished: bool = False
+
+    @property
+    def fraction(self) -> float:
+        if self.compressed_total <= 0:
+            return 1.0 if self.finished else 0.0
+        return min(1.0, self.compressed_done / self.compressed_total)
+
+
+class _ProgressTracker:
+    """Turns per-asset updates into throttled ProgressEvents for a callback."""
+
+    def __init__(self, callback, packages: List[str]):
+        self.callback = callback
+        self.packages = packages
+        self.sizes = []
+        for path in packages:
+            try:
+                self.sizes.append(os.path.getsize(path))
+            except OSError:
+                self.sizes.append(0)
+        self.total = sum(self.sizes)
+        self.start = time.monotonic()
+        self._last = 0.0
+        self.raw = None
+        self.index = 0
+        self.done_before = 0
+        self.entries_before = 0
+        self.written_before = 0
+        self.entries = 0
+        self.written = 0
+
+    def begin(self, index: int) -> None:
+        self.index = index
+        self.entries = 0
+        self.written = 0
+
+    def _emit(self, compressed_done: int, finished: bool) -> None:
+        elapsed = time.monotonic() - self.start
+        written = self.written_before + self.written
+        eta = None
+        if compressed_done > 0 and self.total:
+            eta = elapsed * (self.total - compressed_done) / compressed_done
+        self.callback(ProgressEvent(
+            package=self.packages[self.index] if self.packages else "",
+            package_index=self.index,
+            package_count=len(self.packages),
+            compressed_done=compressed_done,
+            compressed_total=self.total,
+            bytes_written=written,
+            entries_done=self.entries_before + self.entries,
+            mb_per_s=written / elapsed / 1e6 if elapsed > 0 else 0.0,
+            eta_seconds=0.0 if finished else eta,
+            finished=finished,
+        ))
+
+    def update(self, size: int) -> None:
+        """One more asset handled; cheap unless an event is due."""
+        self.entries += 1
+        self.written += size
+        now = time.monotonic()
+        if now - self._last < PROGRESS_INTERVAL:
+            return
+        self._last = now
+        position = 0
+        if self.raw is not None:
+            try:
+                position = self.raw.tell()
+            except (OSError, ValueError):
+                position = 0
+        self._emit(self.done_before + position, False)
+
+    def end(self, entries: Optional[int] = None, written: Optional[int] = None, last: bool = False) -> None:
+        """Package finished (parallel runs report the worker's totals here)."""
+        if entries is not None:
+            self.entries = entries
+        if written is not None:
+            self.written = written
+        self.done_before += self.sizes[self.index] if self.sizes else 0
+        self._emit(self.done_before, last)
+        self.entries_before += self.entries
+        self.written_before += self.written
+        self.entries = 0
+        self.written = 0
+        self.raw = None
 
 
 def build_mapping(unitypackage_path: str, working_dir: str) -> Dict[str, str]:
@@ -27,102 +194,1615 @@ def build_mapping(unitypackage_path: str, working_dir: str) -> Dict[str, str]:
     return mapping
 
 
-def extract_unitypackage(
+class _StreamAsset:
+    """Asset data read straight from the archive; valid until the next member."""
+
+    def __init__(self, fileobj, size: int):
+        self.fileobj = fileobj
+        self.size = size
+
+    def write_to(self, path: str) -> None:
+        with open(path, "wb") as f:
+            shutil.copyfileobj(self.fileobj, f, _COPY_CHUNK)
+
+    def chunks(self) -> Iterator[bytes]:
+        yield from iter(lambda: self.fileobj.read(_COPY_CHUNK), b"")
+
+    def discard(self) -> None:
+        pass
+
+
+class _MemoryAsset:
+    """Asset that arrived before its pathname and is buffered in memory."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.size = len(data)
+
+    def write_to(self, path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(self.data)
+        self.data = b""
+
+    def chunks(self) -> Iterator[bytes]:
+        data, self.data = self.data, b""
+        yield data
+
+    def discard(self) -> None:
+        self.data = b""
+
+
+class _SpilledAsset:
+    """Asset that arrived before its pathname and was too large to buffer."""
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+
+    def write_to(self, path: str) -> None:
+        try:
+            os.replace(self.path, path)
+        except OSError:
+            shutil.move(self.path, path)
+
+    def chunks(self) -> Iterator[bytes]:
+        try:
+            with open(self.path, "rb") as f:
+                yield from iter(lambda: f.read(_COPY_CHUNK), b"")
+        finally:
+            self.discard()
+
+    def discard(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class _StoredAsset:
+    """Asset served from the asset store instead of the archive."""
+
+    def __init__(self, store: AssetStore, digest: str, size: int):
+        self.store = store
+        self.digest = digest
+        self.size = size
+
+    def write_to(self, path: str) -> None:
+        self.store.materialize(self.digest, path)
+
+    def discard(self) -> None:
+        pass
+
+
+_Asset = Union[_StreamAsset, _MemoryAsset, _SpilledAsset, _StoredAsset]
+
+
+def _spill(fileobj, spill_dir: str, size: int, hasher=None) -> _SpilledAsset:
+    fd, path = tempfile.mkstemp(prefix=".upo-spill-", dir=spill_dir)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if hasher is None:
+                shutil.copyfileobj(fileobj, f, _COPY_CHUNK)
+            else:
+                while True:
+                    chunk = fileobj.read(_COPY_CHUNK)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    f.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return _SpilledAsset(path, size)
+
+
+def _hash_asset(asset: "_Asset", spill_dir: str) -> Tuple[str, "_Asset"]:
+    """
+    Digest an incoming asset. Streamed assets have to be consumed to be
+    hashed, so they come back as a buffered (or spilled) asset.
+    """
+    if isinstance(asset, _StreamAsset):
+        if asset.size <= WRITE_INLINE_THRESHOLD:
+            asset = _MemoryAsset(asset.fileobj.read())
+        else:
+            hasher = new_hasher()
+            spilled = _spill(asset.fileobj, spill_dir, asset.size, hasher)
+            return hasher.hexdigest(), spilled
+    if isinstance(asset, _MemoryAsset):
+        return bytes_digest(asset.data), asset
+    if isinstance(asset, _StoredAsset):
+        return asset.digest, asset
+    return file_digest(asset.path), asset
+
+
+def _glob_to_regex(pattern: str) -> str:
+    pattern = pattern.replace("\\", "/")
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class AssetFilter:
+    """
+    Include/exclude globs over asset pathnames plus an optional GUID
+    allow-list. "*" stays within one path segment, "**" spans any number of
+    them, so "Assets/Characters/Foo/**" selects everything below Foo.
+    An asset is kept when its GUID is allowed, it matches at least one
+    include pattern (if any are given) and no exclude pattern.
+    """
+
+    def __init__(
+        self,
+        include: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+        guids: Optional[Iterable[str]] = None,
+    ):
+        # Match case-insensitively wherever the filesystem does (Windows)
+        flags = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+        self.include = [re.compile(_glob_to_regex(p), flags) for p in include or []]
+        self.exclude = [re.compile(_glob_to_regex(p), flags) for p in exclude or []]
+        self.guids = {g.strip().lower() for g in guids} if guids else None
+
+    def __bool__(self) -> bool:
+        return bool(self.include or self.exclude or self.guids is not None)
+
+    @property
+    def by_path(self) -> bool:
+        return bool(self.include or self.exclude)
+
+    def allows_guid(self, guid: str) -> bool:
+        return self.guids is None or guid.lower() in self.guids
+
+    def allows(self, guid: str, real_path: str) -> bool:
+        if not self.allows_guid(guid):
+            return False
+        real_path = real_path.replace("\\", "/")
+        if self.include and not any(r.fullmatch(real_path) for r in self.include):
+            return False
+        return not any(r.fullmatch(real_path) for r in self.exclude)
+
+
+def _iter_assets(
+    unitypackage_path: str,
+    spill_dir: str,
+    buffer_limit: int = DEFAULT_BUFFER_LIMIT,
+    known_pathnames: Optional[Dict[str, str]] = None,
+    asset_filter: Optional[AssetFilter] = None,
+    stats: Optional[ExtractStats] = None,
+    tracker: Optional[_ProgressTracker] = None,
+    skip_guids: Optional[set] = None,
+    start_offset: int = 0,
+    on_meta: Optional[Callable[[str, str, bytes], None]] = None,
+    index=None,
+    inflate_jobs: int = 1,
+) -> Iterator[Tuple[str, str, _Asset]]:
+    """
+    Read the package once and yield (guid, pathname, asset) as soon as both
+    halves of a GUID entry are known. GUID entries without an asset (folders)
+    or without a pathname are dropped, like build_mapping does.
+
+    known_pathnames (from a package index) lets every asset be streamed
+    straight through without waiting for its pathname member; it also tells
+    us which assets exist, so with a filter reading stops as soon as the
+    last wanted asset has been emitted.
+
+    skip_guids are passed over like filtered-out assets. start_offset is the
+    offset of a member header in the uncompressed tar stream (from an index)
+    to start reading at; everything before it is inflated and thrown away
+    without being parsed, so pathnames before it must be in known_pathnames.
+
+    on_meta(guid, pathname, data) receives the asset.meta member of every
+    GUID entry that isn't passed over, folders included, once its pathname
+    is known (a .meta is held until then, and dropped if the filter rejects
+    the pathname). Reading then only stops early once the .meta of the last
+    wanted asset has been seen as well.
+
+    index: the PackageIndex known_pathnames came from. If it has access
+    points (see zran.py), filtered reads inflate only the stretches of the
+    stream that hold wanted assets, each from the nearest access point
+    before it, and with inflate_jobs > 1 those stretches (the whole package
+    without a filter) are inflated on that many threads. Not with on_meta:
+    an asset's .meta member may come before the asset.
+    """
+    if not asset_filter:
+        asset_filter = None
+    pathnames: Dict[str, str] = dict(known_pathnames or {})
+    remaining = None
+    if known_pathnames is not None and (asset_filter is not None or skip_guids):
+        remaining = {
+            g for g, p in known_pathnames.items()
+            if (asset_filter is None or asset_filter.allows(g, p)) and not (skip_guids and g in skip_guids)
+        }
+        if not remaining:
+            return
+    metas_left = set(remaining) if remaining is not None and on_meta is not None else set()
+    ranges = None
+    if (
+        index is not None and index.checkpoints and known_pathnames is not None and on_meta is None
+        and (remaining is not None or inflate_jobs > 1)
+    ):
+        from .zran import plan_ranges
+
+        wanted = remaining if remaining is not None else set(known_pathnames)
+        ranges = plan_ranges(
+            [(e.offset, e.guid) for e in index.assets() if e.guid in wanted and e.offset is not None],
+            index.checkpoints,
+        )
+    pending: Dict[str, _Asset] = {}
+    # .meta members that came before their pathname
+    pending_metas: Dict[str, bytes] = {}
+    batch: List[Tuple[str, _Asset]] = []
+    buffered = 0
+    raw = open(unitypackage_path, "rb")
+    gz = members = None
+    if tracker is not None:
+        tracker.raw = raw
+    try:
+        if ranges is not None and inflate_jobs > 1 and len(ranges) > 1:
+            members = _iter_ranges_parallel(unitypackage_path, index, ranges, wanted, spill_dir, inflate_jobs)
+            for batch, position in members:
+                # raw isn't read here; its position only reports progress
+                raw.seek(position)
+                batch.reverse()
+                while batch:
+                    guid, asset = batch.pop()
+                    yield guid, pathnames[guid], asset
+            return
+        if ranges is not None:
+            members = _iter_ranges(raw, index, ranges, stats)
+        else:
+            gz = gzip.GzipFile(fileobj=raw, mode="rb")
+            if start_offset:
+                start = time.perf_counter()
+                left = start_offset
+                while left > 0:
+                    chunk = gz.read(min(left, _COPY_CHUNK))
+                    if not chunk:
+                        break
+                    left -= len(chunk)
+                if stats is not None:
+                    stats.add("seek", time.perf_counter() - start)
+            members = iter_members(gz, start_offset)
+        for guid, kind, size, _, data in members:
+            if kind == "pathname":
+                if guid in pathnames:
+                    continue
+                real_path = read_pathname(data)
+                if not real_path:
+                    continue
+                pathnames[guid] = real_path
+                meta = pending_metas.pop(guid, None)
+                if meta is not None and (asset_filter is None or asset_filter.allows(guid, real_path)):
+                    on_meta(guid, real_path, meta)
+                asset = pending.pop(guid, None)
+                if asset is not None:
+                    if isinstance(asset, _MemoryAsset):
+                        buffered -= asset.size
+                    if asset_filter is not None and not asset_filter.allows(guid, real_path):
+                        asset.discard()
+                        continue
+                    yield guid, real_path, asset
+            elif kind == "asset":
+                if asset_filter is not None and not asset_filter.allows_guid(guid):
+                    continue
+                if skip_guids and guid in skip_guids:
+                    continue
+                real_path = pathnames.get(guid)
+                if real_path is not None:
+                    if asset_filter is not None and not asset_filter.allows(guid, real_path):
+                        continue
+                    yield guid, real_path, _StreamAsset(data, size)
+                    if remaining is not None:
+                        remaining.discard(guid)
+                        if not remaining and not metas_left:
+                            break
+                elif guid in pending:
+                    continue
+                elif buffered + size <= buffer_limit:
+                    pending[guid] = _MemoryAsset(data.read())
+                    buffered += size
+                else:
+                    pending[guid] = _spill(data, spill_dir, size)
+            elif kind == "asset.meta" and on_meta is not None:
+                if asset_filter is not None and not asset_filter.allows_guid(guid):
+                    continue
+                if skip_guids and guid in skip_guids:
+                    continue
+                real_path = pathnames.get(guid)
+                if real_path is None:
+                    pending_metas[guid] = data.read()
+                elif asset_filter is None or asset_filter.allows(guid, real_path):
+                    on_meta(guid, real_path, data.read())
+                if remaining is not None:
+                    metas_left.discard(guid)
+                    if not remaining and not metas_left:
+                        break
+    finally:
+        if stats is not None:
+            stats.compressed_bytes = raw.tell()
+        if tracker is not None:
+            tracker.raw = None
+        if members is not None:
+            members.close()
+        if gz is not None:
+            gz.close()
+        raw.close()
+        for asset in pending.values():
+            asset.discard()
+        for _, asset in batch:
+            asset.discard()
+
+
+def _iter_ranges(raw, index, ranges, stats: Optional[ExtractStats]) -> Iterator:
+    """Tar members of each (first offset, last offset, last guid) range, read from its access point."""
+    from .zran import open_at
+
+    for first, last, last_guid in ranges:
+        start = time.perf_counter()
+        reader = open_at(raw, index, first)
+        if stats is not None:
+            stats.add("seek", time.perf_counter() - start)
+        with closing(reader):
+            for member in iter_members(reader, first):
+                if member.offset > last and member.guid != last_guid:
+                    break
+                yield member
+
+
+def _read_range(
+    unitypackage_path: str, index, span, wanted: set, spill_dir: str
+) -> Tuple[List[Tuple[str, _Asset]], int]:
+    """
+    Inflate one range on its own file handle and buffer (or spill) the
+    wanted assets in it. Returns them with the file position reached.
+    """
+    from .zran import open_at
+
+    first, last, last_guid = span
+    assets: List[Tuple[str, _Asset]] = []
+    try:
+        with open(unitypackage_path, "rb") as raw:
+            with closing(open_at(raw, index, first)) as reader:
+                for guid, kind, size, offset, data in iter_members(reader, first):
+                    if offset > last and guid != last_guid:
+                        break
+                    if kind != "asset" or guid not in wanted:
+                        continue
+                    if size <= WRITE_INLINE_THRESHOLD:
+                        assets.append((guid, _MemoryAsset(data.read())))
+                    else:
+                        assets.append((guid, _spill(data, spill_dir, size)))
+            return assets, raw.tell()
+    except BaseException:
+        for _, asset in assets:
+            asset.discard()
+        raise
+
+
+def _iter_ranges_parallel(
+    unitypackage_path: str, index, ranges, wanted: set, spill_dir: str, jobs: int
+) -> Iterator[Tuple[List[Tuple[str, _Asset]], int]]:
+    """
+    _read_range over ranges on jobs threads (zlib releases the GIL while it
+    inflates), yielded in stream order. At most two ranges per thread are
+    read ahead, so memory stays at a few checkpoint spans per thread.
+    """
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+
+    spans = iter(ranges)
+    futures = deque()
+    pool = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="upo-inflate")
+    try:
+        for span in spans:
+            futures.append(pool.submit(_read_range, unitypackage_path, index, span, wanted, spill_dir))
+            if len(futures) >= 2 * jobs:
+                break
+        while futures:
+            result = futures.popleft().result()
+            span = next(spans, None)
+            if span is not None:
+                futures.append(pool.submit(_read_range, unitypackage_path, index, span, wanted, spill_dir))
+            yield result
+    finally:
+        for future in futures:
+            future.cancel()
+        pool.shutdown(wait=True)
+        for future in futures:
+            if not future.cancelled() and future.exception() is None:
+                for _, asset in future.result()[0]:
+                    asset.discard()
+
+
+def _timed(iterator: Iterator, stats: Optional[ExtractStats], phase: str) -> Iterator:
+    """Charge the time spent producing each item to a phase."""
+    if stats is None:
+        yield from iterator
+        return
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            stats.add(phase, time.perf_counter() - start)
+            return
+        stats.add(phase, time.perf_counter() - start)
+        yield item
+
+
+def _plan_pathnames(unitypackage_path: str, index, asset_filter: Optional[AssetFilter]) -> Optional[Dict[str, str]]:
+    """
+    Pathnames known before reading the archive, so that with a path filter
+    unwanted assets are never buffered or spilled to disk. Taken from the
+    package's cached index if none was given; without one nothing is built
+    (that would inflate the package twice) and assets are filtered as their
+    pathnames arrive in the single read.
+    """
+    if index is None and asset_filter is not None and asset_filter.by_path:
+        index = _cached_index(unitypackage_path)
+    if index is None:
+        return None
+    return index.pathnames()
+
+
+def iter_package_assets(
+    unitypackage_path: str,
+    spill_dir: str,
+    index=None,
+    asset_filter: Optional[AssetFilter] = None,
+    inflate_jobs: int = 1,
+) -> Iterator[Tuple[str, str, _Asset]]:
+    """
+    Read a package once and yield (guid, pathname, asset) per asset in
+    stream order, for callers that consume assets themselves instead of
+    placing them. Each asset's data must be read with asset.chunks() (or
+    the asset discarded) before the next one is asked for.
+
+    index: PackageIndex to take pathnames (and access points, see
+    _iter_assets) from; the cached one is used if none is given. Without
+    an index no asset is streamed before its pathname member has been
+    read: it is buffered in memory, or spilled to spill_dir beyond
+    DEFAULT_BUFFER_LIMIT, until then.
+    """
+    if index is None:
+        index = _cached_index(unitypackage_path)
+    return _iter_assets(
+        unitypackage_path, spill_dir, known_pathnames=_plan_pathnames(unitypackage_path, index, asset_filter),
+        asset_filter=asset_filter, index=index, inflate_jobs=inflate_jobs,
+    )
+
+
+def _remove_existing(path: str) -> None:
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    else:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class _DestinationView:
+    """
+    In-memory picture of the destination. Each directory is listed once with
+    os.scandir and then kept up to date as files are placed, so conflict
+    checks and " (n)" probing need no per-file stat calls.
+    """
+
+    def __init__(self):
+        self._listings: Dict[str, set] = {}
+        self._next_suffix: Dict[str, int] = {}
+
+    def _listing(self, directory: str) -> set:
+        key = os.path.normcase(directory)
+        names = self._listings.get(key)
+        if names is None:
+            try:
+                with os.scandir(directory) as it:
+                    names = {os.path.normcase(e.name) for e in it}
+            except (FileNotFoundError, NotADirectoryError):
+                names = set()
+            self._listings[key] = names
+        return names
+
+    def exists(self, path: str) -> bool:
+        directory, name = os.path.split(path)
+        return os.path.normcase(name) in self._listing(directory)
+
+    def add(self, path: str) -> None:
+        directory, name = os.path.split(path)
+        self._listing(directory).add(os.path.normcase(name))
+
+    def add_dir(self, path: str) -> None:
+        """Record a directory and any missing parents as existing."""
+        while True:
+            parent, name = os.path.split(path)
+            if not name:
+                return
+            names = self._listing(parent)
+            key = os.path.normcase(name)
+            if key in names:
+                return
+            names.add(key)
+            path = parent
+
+    def next_free(self, target_path: str) -> str:
+        """Lowest free "base (n).ext", as the old os.path.exists loop found it."""
+        key = os.path.normcase(target_path)
+        base, ext = os.path.splitext(target_path)
+        i = self._next_suffix.get(key, 1)
+        while self.exists(f"{base} ({i}){ext}"):
+            i += 1
+        self._next_suffix[key] = i
+        return f"{base} ({i}){ext}"
+
+
+def _decide(view: _DestinationView, target_path: str, conflict_policy: str) -> Tuple[str, str]:
+    """
+    Return (final_target, action) for one asset. action is "write" when there
+    is no conflict, otherwise "overwrite", "rename", "compare" (identical
+    policy; content decides) or "skip".
+    """
+    if not view.exists(target_path):
+        return target_path, "write"
+    if conflict_policy == "identical":
+        return target_path, "compare"
+    if conflict_policy == "overwrite":
+        return target_path, "overwrite"
+    if conflict_policy == "rename":
+        return view.next_free(target_path), "rename"
+    # "skip" and unknown policies leave the existing file alone
+    return target_path, "skip"
+
+
+class _Placer:
+    """
+    Decides where each asset goes and writes it there.
+
+    Conflict decisions are made on the calling (decompressing) thread so they
+    stay deterministic; the writes themselves, together with directory
+    creation and chmod, run on a bounded pool of writer threads. Paths handed
+    to the pool are remembered so later decisions see them before they exist
+    on disk.
+
+    With a journal, every placed asset is recorded once its write has
+    finished, and files left half-written by the interrupted run it resumes
+    are overwritten instead of being treated as conflicts.
+
+    With a store, every written asset is hashed and added to it, and
+    (guid, pathname, digest) is collected in archive order in stored;
+    store_complete turns False if an asset was not written (skipped).
+    """
+
+    def __init__(
+        self,
+        dest_root: str,
+        conflict_policy: str,
+        writers: int = 0,
+        stats: Optional[ExtractStats] = None,
+        journal: Optional[Journal] = None,
+        store: Optional[AssetStore] = None,
+    ):
+        self.dest_root = dest_root
+        self.conflict_policy = conflict_policy
+        self.stats = stats
+        self.journal = journal
+        self.store = store
+        self.stored: List[Tuple[str, str, str]] = []
+        self.store_complete = True
+        self.conflicts = 0
+        self._stats_lock = threading.Lock()
+        self._digests = DigestCache() if conflict_policy == "identical" else None
+        self._view = _DestinationView()
+        self._reserved: set = set()
+        self._dirs: set = set()
+        self._dirs_lock = threading.Lock()
+        self._pool = None
+        self._slots = None
+        self._inflight_bytes = 0
+        self._inflight_cond = threading.Condition()
+        self._futures: List = []
+        if writers > 0:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._pool = ThreadPoolExecutor(max_workers=writers, thread_name_prefix="upo-writer")
+            self._slots = threading.BoundedSemaphore(writers * WRITE_QUEUE_FACTOR)
+
+    def _ensure_dir(self, path: str) -> None:
+        if path in self._dirs:
+            return
+        os.makedirs(path, exist_ok=True)
+        with self._dirs_lock:
+            self._dirs.add(path)
+
+    def _count(self, phase: str, seconds: float, written: int = 0) -> None:
+        if self.stats is None:
+            return
+        with self._stats_lock:
+            self.stats.add(phase, seconds)
+            self.stats.bytes_written += written
+
+    def _write(
+        self,
+        asset: "_Asset",
+        target_dir: str,
+        final_target: str,
+        replace: bool,
+        digest: Optional[str] = None,
+        record: Optional[Tuple[str, str]] = None,
+    ) -> None:
+        start = time.perf_counter()
+        self._ensure_dir(target_dir)
+        if replace:
+            _remove_existing(final_target)
+        asset.write_to(final_target)
+        written = time.perf_counter()
+        os.chmod(final_target, FILE_MODE)
+        if digest is not None and self._digests is not None:
+            self._digests.put(final_target, digest)
+        if digest is not None and self.store is not None:
+            self.store.add(digest, final_target)
+        if record is not None:
+            self.journal.record(record[0], record[1], asset.size)
+        self._count("write", written - start, asset.size)
+        self._count("chmod", time.perf_counter() - written)
+
+    def _is_identical(self, asset: "_Asset", target_path: str) -> Tuple[bool, "_Asset", Optional[str]]:
+        """Cheap size check first, then compare digests (destination side cached)."""
+        try:
+            st = os.stat(target_path)
+        except OSError:
+            return False, asset, None
+        if not stat.S_ISREG(st.st_mode) or st.st_size != asset.size:
+            return False, asset, None
+        digest, asset = _hash_asset(asset, self.dest_root)
+        return digest == self._digests.digest(target_path), asset, digest
+
+    def _write_async(
+        self,
+        asset: "_Asset",
+        target_dir: str,
+        final_target: str,
+        replace: bool,
+        digest: Optional[str] = None,
+        record: Optional[Tuple[str, str]] = None,
+    ) -> None:
+        size = asset.size if isinstance(asset, _MemoryAsset) else 0
+        start = time.perf_counter()
+        with self._inflight_cond:
+            # Keep buffered data bounded; a single oversized asset may still go through alone.
+            while self._inflight_bytes and self._inflight_bytes + size > WRITE_QUEUE_BYTES:
+                self._inflight_cond.wait()
+            self._inflight_bytes += size
+        self._slots.acquire()
+        self._count("wait", time.perf_counter() - start)
+
+        def _run():
+            try:
+                self._write(asset, target_dir, final_target, replace, digest, record)
+            finally:
+                self._slots.release()
+                with self._inflight_cond:
+                    self._inflight_bytes -= size
+                    self._inflight_cond.notify_all()
+
+        self._futures.append(self._pool.submit(_run))
+        if len(self._futures) >= 1024:
+            self._reap()
+
+    def _reap(self) -> None:
+        still_running = []
+        for fut in self._futures:
+            if fut.done():
+                fut.result()
+            else:
+                still_running.append(fut)
+        self._futures = still_running
+
+    def prepare(self, real_rel_paths: Iterable[str]) -> None:
+        """Create every target directory up front, e.g. from a package index."""
+        for target_dir in sorted({os.path.join(self.dest_root, os.path.dirname(p)) for p in real_rel_paths}):
+            self._ensure_dir(target_dir)
+
+    def place(self, asset: "_Asset", real_rel_path: str, guid: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Returns (final target, action taken): write, overwrite, rename, skip
+        or identical (unchanged file kept under the identical policy).
+        """
+        dest_dir, filename = os.path.split(real_rel_path)
+        target_dir = os.path.join(self.dest_root, dest_dir)
+        target_path = os.path.join(target_dir, filename)
+
+        start = time.perf_counter()
+        if (
+            self.journal is not None
+            and self.journal.resumed
+            and self._view.exists(target_path)
+            and os.path.normcase(target_path) not in self._reserved
+            and self.journal.is_leftover(target_path)
+        ):
+            final_target, action = target_path, "overwrite"
+        else:
+            final_target, action = _decide(self._view, target_path, self.conflict_policy)
+        self._count("conflicts", time.perf_counter() - start)
+        if action != "write":
+            self.conflicts += 1
+        replace = action in ("overwrite", "compare")
+        digest = None
+        record = None
+        if self.journal is not None and guid is not None:
+            record = (guid, _result_path(self.dest_root, real_rel_path, final_target))
+        if action == "skip":
+            asset.discard()
+            self.store_complete = False
+            if record is not None:
+                self.journal.record(record[0], record[1], None)
+            return target_path, "skip"
+        if replace and os.path.normcase(target_path) in self._reserved:
+            # Same path twice in one run: the earlier write must land first.
+            self._drain()
+        if action == "compare":
+            start = time.perf_counter()
+            identical, asset, digest = self._is_identical(asset, target_path)
+            self._count("compare", time.perf_counter() - start)
+            if identical:
+                asset.discard()
+                self.store_complete = False
+                if record is not None:
+                    self.journal.record(record[0], record[1], None)
+                return target_path, "identical"
+            action = "overwrite"
+        if self.store is not None:
+            if digest is None:
+                start = time.perf_counter()
+                digest, asset = _hash_asset(asset, self.dest_root)
+                self._count("hash", time.perf_counter() - start)
+            self.stored.append((guid, real_rel_path, digest))
+
+        self._view.add_dir(target_dir)
+        self._view.add(final_target)
+        self._reserved.add(os.path.normcase(final_target))
+        if self._pool is None:
+            self._write(asset, target_dir, final_target, replace, digest, record)
+        else:
+            if isinstance(asset, _StreamAsset):
+                # The tar stream moves on after this member, so small files are
+                # read here and large ones are written without the pool.
+                if asset.size > WRITE_INLINE_THRESHOLD:
+                    self._write(asset, target_dir, final_target, replace, digest, record)
+                    return final_target, action
+                asset = _MemoryAsset(asset.fileobj.read())
+            self._write_async(asset, target_dir, final_target, replace, digest, record)
+        return final_target, action
+
+    def place_folder_meta(self, data: bytes, real_rel_path: str) -> bool:
+        """
+        Create a package folder and write its .meta, unless the folder already
+        has one (an existing folder keeps its GUID). Returns whether it did.
+        """
+        folder = os.path.join(self.dest_root, real_rel_path)
+        if self._view.exists(folder + ".meta") or os.path.isfile(folder):
+            return False
+        self._ensure_dir(folder)
+        self._view.add_dir(folder)
+        self.place_meta(data, folder)
+        return True
+
+    def place_meta(self, data: bytes, final_target: str) -> None:
+        """Write an asset's .meta next to where the asset was placed, replacing any."""
+        meta_path = final_target + ".meta"
+        target_dir = os.path.dirname(meta_path)
+        if os.path.normcase(meta_path) in self._reserved:
+            self._drain()
+        self._view.add(meta_path)
+        self._reserved.add(os.path.normcase(meta_path))
+        if self._pool is None:
+            self._write(_MemoryAsset(data), target_dir, meta_path, True)
+        else:
+            self._write_async(_MemoryAsset(data), target_dir, meta_path, True)
+
+    def _drain(self) -> None:
+        start = time.perf_counter()
+        futures, self._futures = self._futures, []
+        for fut in futures:
+            fut.result()
+        self._count("wait", time.perf_counter() - start)
+
+    def close(self) -> None:
+        try:
+            if self._pool is not None:
+                try:
+                    self._drain()
+                finally:
+                    self._pool.shutdown(wait=True)
+                    self._pool = None
+        finally:
+            if self._digests is not None:
+                self._digests.close()
+                self._digests = None
+
+
+def _result_path(dest_root: str, real_rel_path: str, final_target: str) -> str:
+    if final_target == os.path.join(dest_root, real_rel_path):
+        return real_rel_path
+    return os.path.relpath(final_target, dest_root)
+
+
+class ExtractedAsset(NamedTuple):
+    """
+    One asset handled by iter_extract. path is where it ended up, relative
+    to the destination (differs from pathname when renamed); action is
+    write, overwrite, rename, skip, identical, resumed (already extracted
+    by the interrupted run being resumed), or in a project extraction
+    present (the GUID is already in the project at path) or moved (that
+    asset was moved to pathname).
+    """
+
+    guid: str
+    pathname: str
+    path: str
+    size: int
+    action: str
+
+
+def iter_extract(
     unitypackage_path: str,
     dest_root: str,
     conflict_policy: str = "rename",
     ask_callback=None,
-) -> List[Tuple[str, str]]:
+    buffer_limit: int = DEFAULT_BUFFER_LIMIT,
+    writers: int = DEFAULT_WRITERS,
+    index=None,
+    include: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+    guids: Optional[Iterable[str]] = None,
+    stats: Optional[ExtractStats] = None,
+    progress=None,
+    resume: bool = False,
+    keep_journal: bool = False,
+    store: Optional[AssetStore] = None,
+    project=False,
+    move_existing: bool = False,
+    inflate_jobs: int = 1,
+) -> Iterator[ExtractedAsset]:
+    """
+    Extract a package, yielding an ExtractedAsset as each asset is placed
+    (its target is decided; with writer threads the data may still be in
+    flight until the generator is exhausted). Closing the generator early
+    stops the extraction and (with resume) keeps its journal, so it can be
+    resumed.
+
+    index: optional PackageIndex (see index.py) for this package. When given,
+    target directories are created before the archive is opened and no asset
+    has to be buffered while waiting for its pathname.
+
+    include/exclude/guids: see AssetFilter. Assets that are filtered out are
+    never written, and with an index reading stops after the last wanted one.
+    A filter uses the cached index if there is one; where it has access
+    points, only the parts of the stream around wanted assets are inflated.
+
+    inflate_jobs: threads inflating the package (in parts starting at its
+    access points) when the index has any; 1 reads it front to back.
+
+    stats: optional ExtractStats filled with counters and phase timings.
+
+    progress: optional callable receiving ProgressEvents, at most every
+    PROGRESS_INTERVAL seconds plus a final one.
+
+    resume: keep a journal of placed assets (see journal.py) and continue
+    an interrupted extraction from it. Assets it recorded whose file is
+    still intact are not extracted again, and with an index reading starts
+    at the first unfinished member. Without resume no journal is written.
+    keep_journal leaves the journal behind after success; extract_multiple
+    removes them once the whole batch is done.
+
+    store: optional AssetStore (see store.py). If this package has been
+    stored completely before, its assets are materialized from the store
+    without opening the archive; otherwise every written asset is added.
+
+    project: extract into a Unity project by GUID. True scans the .meta
+    files below dest_root (see project.py); a ProjectIndex of dest_root can
+    be passed instead and is kept up to date. Assets whose GUID is already
+    in the project are not written again ("present"), or with move_existing
+    are moved to the package's pathname together with their .meta
+    ("moved"). Written assets get the package's asset.meta next to them so
+    the GUID is preserved, and so do the package's folders (those a path
+    filter allows) unless the folder is in the project already. The store
+    is not used (it holds no .meta files).
+    """
     unitypackage_path = os.path.abspath(unitypackage_path)
     dest_root = os.path.abspath(dest_root)
 
     os.makedirs(dest_root, exist_ok=True)
+    if project is True:
+        from .project import ProjectIndex
 
-    working_dir = os.path.join(dest_root, ".working_tmp")
-    if os.path.exists(working_dir):
-        shutil.rmtree(working_dir)
+        start = time.perf_counter()
+        project = ProjectIndex.scan(dest_root)
+        if stats is not None:
+            stats.add("project", time.perf_counter() - start)
+    elif project is False:
+        project = None
+    if project is not None:
+        store = None
 
-    with tarfile.open(unitypackage_path, "r:gz", encoding="utf8") as tar:
-        tar.extractall(working_dir)
+    if isinstance(progress, _ProgressTracker):
+        tracker = progress
+    else:
+        tracker = _ProgressTracker(progress, [unitypackage_path]) if progress is not None else None
+    if stats is not None:
+        stats.package = unitypackage_path
 
-    mapping = build_mapping(unitypackage_path, working_dir)
+    asset_filter = AssetFilter(include, exclude, guids)
+    start = began = time.perf_counter()
+    entries = 0
+    # Only a resumable run keeps a journal (under SETTINGS_DIR, see journal.py)
+    journal = Journal(dest_root, unitypackage_path, resume) if resume else None
+    done = journal.verified() if journal is not None and journal.resumed else {}
+    fingerprint = stored = None
+    if store is not None:
+        fingerprint = package_fingerprint(unitypackage_path)
+        stored = store.lookup(fingerprint)
+    if stored is not None:
+        known_pathnames = {guid: pathname for guid, pathname, _, _ in stored}
+        start_offset = None
+    else:
+        if index is None and (asset_filter or inflate_jobs > 1):
+            index = _cached_index(unitypackage_path)
+        known_pathnames = _plan_pathnames(unitypackage_path, index, asset_filter)
+        start_offset = _resume_offset(index, asset_filter, done) if done else 0
+    placer = _Placer(dest_root, conflict_policy, writers, stats, journal, store if stored is None else None)
+    if known_pathnames is not None:
+        placer.prepare(p for g, p in known_pathnames.items() if asset_filter.allows(g, p) and g not in done)
+    if stats is not None:
+        stats.add("index", time.perf_counter() - start)
+    try:
+        try:
+            for guid, path in done.items():
+                size = journal.completed[guid][1]
+                pathname = known_pathnames.get(guid, path) if known_pathnames is not None else path
+                entries += 1
+                if project is not None:
+                    project.add(guid, path)
+                yield ExtractedAsset(guid, pathname, path, size or 0, "resumed")
+            if stored is not None:
+                # Everything is in the store: nothing to inflate
+                for guid, pathname, digest, size in stored:
+                    if guid in done or not asset_filter.allows(guid, pathname):
+                        continue
+                    final_target, action = placer.place(_StoredAsset(store, digest, size), pathname, guid)
+                    entries += 1
+                    if tracker is not None:
+                        tracker.update(size)
+                    yield ExtractedAsset(guid, pathname, _result_path(dest_root, pathname, final_target), size, action)
+                store.touch([row[2] for row in stored])
+            elif start_offset is not None:
+                # Project mode: (pathname, .meta data) waiting for its asset to
+                # be placed, and where placed assets want theirs ("" = not wanted).
+                # What is still waiting at the end belongs to folders.
+                metas: Dict[str, Tuple[str, bytes]] = {}
+                meta_targets: Dict[str, str] = {}
 
-    results: List[Tuple[str, str]] = []
+                def _on_meta(guid: str, pathname: str, data: bytes) -> None:
+                    target = meta_targets.pop(guid, None)
+                    if target:
+                        placer.place_meta(data, target)
+                    elif target is None:
+                        metas[guid] = (pathname, data)
 
-    for asset_hash, real_rel_path in mapping.items():
-        dest_dir, filename = os.path.split(real_rel_path)
-        target_dir = os.path.join(dest_root, dest_dir)
-        target_path = os.path.join(target_dir, filename)
-        source_path = os.path.join(working_dir, asset_hash, "asset")
-
-        os.makedirs(target_dir, exist_ok=True)
-
-        final_target = target_path
-        if os.path.exists(target_path):
-            decision = conflict_policy
-            if decision == "skip":
-                pass
-            elif decision == "overwrite":
-                if os.path.isdir(target_path):
-                    shutil.rmtree(target_path)
-                else:
-                    try:
-                        os.remove(target_path)
-                    except FileNotFoundError:
-                        pass
-                shutil.move(source_path, target_path)
-                os.chmod(target_path, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IROTH)
-                final_target = target_path
-            elif decision == "rename":
-                base, ext = os.path.splitext(target_path)
-                i = 1
-                new_path = f"{base} ({i}){ext}"
-                while os.path.exists(new_path):
-                    i += 1
-                    new_path = f"{base} ({i}){ext}"
-                shutil.move(source_path, new_path)
-                os.chmod(new_path, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IROTH)
-                final_target = new_path
+                assets = _iter_assets(
+                    unitypackage_path, dest_root, buffer_limit, known_pathnames, asset_filter, stats, tracker,
+                    skip_guids=set(done), start_offset=start_offset,
+                    on_meta=_on_meta if project is not None else None, index=index, inflate_jobs=inflate_jobs,
+                )
+                for asset_hash, real_rel_path, asset in _timed(assets, stats, "read"):
+                    size = asset.size
+                    existing = project.get(asset_hash) if project is not None else None
+                    if existing is not None:
+                        asset.discard()
+                        path, action = existing, "present"
+                        if move_existing and os.path.normcase(existing) != os.path.normcase(real_rel_path):
+                            from .project import move_asset
+
+                            if move_asset(dest_root, existing, real_rel_path):
+                                path, action = real_rel_path, "moved"
+                                project.add(asset_hash, path)
+                        if journal is not None:
+                            journal.record(asset_hash, path, None)
+                        metas.pop(asset_hash, None)
+                        meta_targets[asset_hash] = ""
+                    else:
+                        final_target, action = placer.place(asset, real_rel_path, asset_hash)
+                        path = _result_path(dest_root, real_rel_path, final_target)
+                        if project is not None:
+                            target = final_target if action in ("write", "overwrite", "rename") else ""
+                            if target:
+                                project.add(asset_hash, path)
+                            waiting = metas.pop(asset_hash, None)
+                            if waiting is None:
+                                meta_targets[asset_hash] = target
+                            elif target:
+                                placer.place_meta(waiting[1], target)
+                    entries += 1
+                    if tracker is not None:
+                        tracker.update(size)
+                    yield ExtractedAsset(asset_hash, real_rel_path, path, size, action)
+                for guid, (pathname, data) in metas.items():
+                    # Without its .meta Unity would give the folder a new GUID
+                    if project.get(guid) is None and placer.place_folder_meta(data, pathname):
+                        project.add(guid, pathname)
+        finally:
+            placer.close()
+    except BaseException:
+        if journal is not None:
+            if journal.has_progress():
+                journal.close()
             else:
-                pass
+                journal.remove()
+        raise
+    if journal is not None:
+        if keep_journal:
+            journal.close()
         else:
-            shutil.move(source_path, target_path)
-            os.chmod(target_path, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IROTH)
-            final_target = target_path
+            journal.remove()
+    if store is not None and stored is None:
+        complete = placer.store_complete and not asset_filter and not done
+        store.record_package(fingerprint, placer.stored, complete)
+        store.trim()
+
+    if stats is not None:
+        stats.entries = entries
+        stats.conflicts = placer.conflicts
+        stats.seconds = time.perf_counter() - began
+    if tracker is not None and tracker is not progress:
+        tracker.end(last=True)
+
+
+def extract_unitypackage(
+    unitypackage_path: str,
+    dest_root: str,
+    conflict_policy: str = "rename",
+    ask_callback=None,
+    buffer_limit: int = DEFAULT_BUFFER_LIMIT,
+    writers: int = DEFAULT_WRITERS,
+    index=None,
+    include: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+    guids: Optional[Iterable[str]] = None,
+    stats: Optional[ExtractStats] = None,
+    progress=None,
+    resume: bool = False,
+    keep_journal: bool = False,
+    store: Optional[AssetStore] = None,
+    project=False,
+    move_existing: bool = False,
+    inflate_jobs: int = 1,
+) -> List[Tuple[str, str]]:
+    """
+    iter_extract, collected into (guid, final path relative to dest_root)
+    pairs. Skipped assets are included with their (existing) target path.
+    """
+    return [
+        (record.guid, record.path)
+        for record in iter_extract(
+            unitypackage_path,
+            dest_root,
+            conflict_policy,
+            ask_callback,
+            buffer_limit,
+            writers,
+            index,
+            include,
+            exclude,
+            guids,
+            stats,
+            progress,
+            resume,
+            keep_journal,
+            store,
+            project,
+            move_existing,
+            inflate_jobs,
+        )
+    ]
+
 
-        results.append((asset_hash, real_rel_path if final_target == target_path else os.path.relpath(final_target, dest_root)))
+def _resume_offset(index, asset_filter: AssetFilter, done: Dict[str, str]) -> Optional[int]:
+    """
+    Where in the uncompressed tar stream a resumed run can start: the header
+    of the first wanted asset that is not done yet. None when nothing is
+    left, 0 when that is unknown (no index).
+    """
+    if index is None:
+        return 0
+    offsets = [
+        entry.offset or 0
+        for entry in index.assets()
+        if entry.guid not in done and asset_filter.allows(entry.guid, entry.pathname)
+    ]
+    return min(offsets) if offsets else None
 
-    shutil.rmtree(working_dir, ignore_errors=True)
 
+def plan_extraction(
+    unitypackage_path: str,
+    dest_root: str,
+    conflict_policy: str = "rename",
+    index=None,
+    include: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+    guids: Optional[Iterable[str]] = None,
+) -> List[Tuple[str, str, str, str]]:
+    """
+    Dry run: what extract_unitypackage would do, computed from the package
+    index and one listing per destination directory. Nothing is written.
+    Returns (guid, pathname, action, final_pathname) per asset; see _decide
+    for the actions.
+    """
+    if index is None:
+        from .index import get_index
+
+        index = get_index(unitypackage_path)
+    dest_root = os.path.abspath(dest_root)
+    asset_filter = AssetFilter(include, exclude, guids)
+    view = _DestinationView()
+    plan: List[Tuple[str, str, str, str]] = []
+    for entry in index.assets():
+        if not asset_filter.allows(entry.guid, entry.pathname):
+            continue
+        target_path = os.path.join(dest_root, entry.pathname)
+        final_target, action = _decide(view, target_path, conflict_policy)
+        if action != "skip":
+            view.add_dir(os.path.dirname(target_path))
+            view.add(final_target)
+        plan.append((entry.guid, entry.pathname, action, _result_path(dest_root, entry.pathname, final_target)))
+    return plan
+
+
+def _stage_package(
+    unitypackage_path: str,
+    stage_dir: str,
+    buffer_limit: int = DEFAULT_BUFFER_LIMIT,
+    index=None,
+    include: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+    guids: Optional[Iterable[str]] = None,
+    stats: Optional[ExtractStats] = None,
+) -> List[Tuple[str, str, str]]:
+    """
+    Extract a package into a flat staging directory without resolving any
+    conflicts. Returns (guid, pathname, staged_file) in archive order so the
+    caller can place the files later exactly as a sequential run would.
+    """
+    os.makedirs(stage_dir, exist_ok=True)
+    staged: List[Tuple[str, str, str]] = []
+    asset_filter = AssetFilter(include, exclude, guids)
+    start = began = time.perf_counter()
+    known_pathnames = _plan_pathnames(unitypackage_path, index, asset_filter)
+    if stats is not None:
+        stats.package = os.path.abspath(unitypackage_path)
+        stats.add("index", time.perf_counter() - start)
+    assets = _iter_assets(unitypackage_path, stage_dir, buffer_limit, known_pathnames, asset_filter, stats)
+    for asset_hash, real_rel_path, asset in _timed(assets, stats, "read"):
+        staged_path = os.path.join(stage_dir, str(len(staged)))
+        start = time.perf_counter()
+        asset.write_to(staged_path)
+        if stats is not None:
+            stats.add("write", time.perf_counter() - start)
+            stats.bytes_written += asset.size
+        staged.append((asset_hash, real_rel_path, staged_path))
+    if stats is not None:
+        stats.seconds = time.perf_counter() - began
+    return staged
+
+
+def _extract_worker(
+    upath: str,
+    dest: str,
+    conflict_policy: str,
+    index,
+    filters: Dict[str, object],
+    resume: bool = False,
+    store: Optional[AssetStore] = None,
+):
+    stats = ExtractStats()
+    try:
+        results = list(
+            iter_extract(
+                upath, dest, conflict_policy, index=index, stats=stats, resume=resume, keep_journal=True, store=store, **filters
+            )
+        )
+    finally:
+        if store is not None:
+            store.close()
+    return results, stats
+
+
+def _stage_worker(upath: str, stage_dir: str, index, filters: Dict[str, object]):
+    stats = ExtractStats()
+    staged = _stage_package(upath, stage_dir, index=index, stats=stats, **filters)
+    return staged, stats
+
+
+def _commit_staged(
+    staged: List[Tuple[str, str, str]],
+    dest_root: str,
+    conflict_policy: str,
+    stats: Optional[ExtractStats] = None,
+    journal: Optional[Journal] = None,
+) -> List[ExtractedAsset]:
+    results: List[ExtractedAsset] = []
+    done = journal.verified() if journal is not None and journal.resumed else {}
+    for guid, path in done.items():
+        results.append(ExtractedAsset(guid, path, path, journal.completed[guid][1] or 0, "resumed"))
+    # Staged files are renamed into place; their bytes were counted when staged.
+    placer = _Placer(dest_root, conflict_policy, DEFAULT_WRITERS, None, journal)
+    start = time.perf_counter()
+    try:
+        for asset_hash, real_rel_path, staged_path in staged:
+            if asset_hash in done:
+                continue
+            size = os.path.getsize(staged_path)
+            final_target, action = placer.place(_SpilledAsset(staged_path, size), real_rel_path, asset_hash)
+            results.append(
+                ExtractedAsset(asset_hash, real_rel_path, _result_path(dest_root, real_rel_path, final_target), size, action)
+            )
+    finally:
+        placer.close()
+    if stats is not None:
+        elapsed = time.perf_counter() - start
+        stats.add("commit", elapsed)
+        stats.seconds += elapsed
+        stats.entries = len(results)
+        stats.conflicts = placer.conflicts
     return results
 
 
+def _cached_index(upath: str):
+    from .index import load_index
+
+    return load_index(upath)
+
+
+def package_destination(upath: str, output_dir: str, mode: str) -> str:
+    """Folder a package is extracted to: output_dir, or a subfolder named after it in individual mode."""
+    if mode == "individual":
+        name, _ = os.path.splitext(os.path.basename(upath))
+        return os.path.join(output_dir, name)
+    return output_dir
+
+
+def _extract_parallel(
+    packages: List[Tuple[str, str]],
+    conflict_policy: str,
+    jobs: int,
+    filters: Dict[str, object],
+    stats: Optional[Dict[str, ExtractStats]] = None,
+    executor=None,
+    tracker: Optional[_ProgressTracker] = None,
+    resume: bool = False,
+    on_package=None,
+    store: Optional[AssetStore] = None,
+    succeeded: Optional[set] = None,
+) -> Iterator[Tuple[str, ExtractedAsset]]:
+    """
+    Extract packages in a process pool (executor, if given, is used instead
+    of a new pool and left running). Packages that share a destination
+    (every package in merge mode) can conflict with each other, so only the
+    first of them is written directly; the others are staged next to the
+    destination and placed in input order once all earlier packages of the
+    group are done, which keeps conflict resolution identical to a
+    sequential run. Only directly written packages use the asset store.
+    Records are yielded per package once it is committed.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    groups: Dict[str, List[int]] = {}
+    for i, (_, dest) in enumerate(packages):
+        groups.setdefault(os.path.normcase(dest), []).append(i)
+    direct = {members[0] for members in groups.values()}
+    stage_dirs = {
+        i: os.path.join(dest, f".upo-stage-{os.getpid()}-{i}")
+        for i, (_, dest) in enumerate(packages)
+        if i not in direct
+    }
+
+    # Start the largest packages first; the pool picks up work in submission order.
+    def _size(i: int) -> int:
+        try:
+            return os.path.getsize(packages[i][0])
+        except OSError:
+            return 0
+
+    order = sorted(range(len(packages)), key=_size, reverse=True)
+
+    reported = 0
+    cursors = {key: 0 for key in groups}
+    try:
+        if executor is None:
+            pool_context = ProcessPoolExecutor(max_workers=min(jobs, len(packages)))
+        else:
+            pool_context = nullcontext(executor)
+        with pool_context as pool:
+            futures = {}
+            for i in order:
+                upath, dest = packages[i]
+                index = _cached_index(upath)
+                if i in direct:
+                    fut = pool.submit(_extract_worker, upath, dest, conflict_policy, index, filters, resume, store)
+                else:
+                    fut = pool.submit(_stage_worker, upath, stage_dirs[i], index, filters)
+                futures[fut] = i
+            done_idx: Dict[int, object] = {}
+            pending = set(futures)
+            try:
+                while pending:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        done_idx[futures[fut]] = fut
+                    for key, members in groups.items():
+                        while cursors[key] < len(members) and members[cursors[key]] in done_idx:
+                            i = members[cursors[key]]
+                            cursors[key] += 1
+                            error = None
+                            records = None
+                            try:
+                                outcome, package_stats = done_idx[i].result()
+                                if i in direct:
+                                    records = outcome
+                                else:
+                                    journal = Journal(packages[i][1], packages[i][0], resume) if resume else None
+                                    try:
+                                        records = _commit_staged(outcome, packages[i][1], conflict_policy, package_stats, journal)
+                                    finally:
+                                        if journal is not None:
+                                            journal.close()
+                                    shutil.rmtree(stage_dirs[i], ignore_errors=True)
+                            except Exception as e:
+                                if on_package is None:
+                                    raise
+                                error = e
+                                package_stats = ExtractStats(package=packages[i][0])
+                            reported += 1
+                            if stats is not None:
+                                stats[packages[i][0]] = package_stats
+                            if tracker is not None:
+                                # Workers can't call back; report per finished package
+                                tracker.begin(i)
+                                tracker.end(package_stats.entries, package_stats.bytes_written, last=reported == len(packages))
+                            if records is not None:
+                                if succeeded is not None:
+                                    succeeded.add(packages[i][0])
+                                for record in records:
+                                    yield packages[i][0], record
+                            if on_package is not None:
+                                on_package(packages[i][0], package_stats, error)
+            except BaseException:
+                for fut in pending:
+                    fut.cancel()
+                raise
+    finally:
+        for stage_dir in stage_dirs.values():
+            shutil.rmtree(stage_dir, ignore_errors=True)
+
+
+def iter_extract_multiple(
+    unitypackages: Iterable[str],
+    output_dir: str,
+    mode: str = "merge",
+    conflict_policy: str = "rename",
+    ask_callback=None,
+    jobs: int = 1,
+    include: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+    guids: Optional[Iterable[str]] = None,
+    stats: Optional[Dict[str, ExtractStats]] = None,
+    executor=None,
+    progress=None,
+    resume: bool = False,
+    on_package=None,
+    store: Optional[AssetStore] = None,
+    move_existing: bool = False,
+) -> Iterator[Tuple[str, ExtractedAsset]]:
+    """
+    Extract several packages, yielding (package path, ExtractedAsset) as
+    assets are placed; nothing is accumulated, so very large batches can be
+    counted or logged in constant memory. With jobs > 1 the records of a
+    package arrive together once it has been committed.
+
+    stats: optional dict that receives an ExtractStats per package path.
+    resume: continue packages whose earlier extraction into the same
+    destination was interrupted (see iter_extract).
+    on_package: optional callable, on_package(path, stats, error), called
+    as each package is done (in input order within a destination), after
+    its records. With it a failing package no longer aborts the batch:
+    error is the exception and its journal stays behind for a resumed run.
+    store: optional AssetStore shared by the packages (see iter_extract).
+    mode "project" extracts everything into output_dir like "merge", but by
+    GUID into the Unity project there (see iter_extract's project and
+    move_existing); its .meta files are scanned once for the whole batch,
+    and packages are extracted one after another so each sees the GUIDs of
+    the ones before it.
+    progress: optional callable receiving ProgressEvents for the whole call;
+    with jobs > 1 they arrive as each package finishes. A single package
+    is inflated on jobs threads instead where its cached index has access
+    points (see iter_extract's inflate_jobs).
+    executor: optional concurrent.futures.ProcessPoolExecutor to run jobs>1
+    extractions on, so long-lived callers can keep one pool warm.
+    """
+    packages = _plan_packages(unitypackages, output_dir, mode)
+    yield from _iter_packages(
+        packages, conflict_policy, ask_callback, jobs, include, exclude, guids, stats, executor, progress, resume,
+        on_package, store, set(), mode == "project", move_existing,
+    )
+
+
 def extract_multiple(
     unitypackages: Iterable[str],
     output_dir: str,
     mode: str = "merge",
     conflict_policy: str = "rename",
     ask_callback=None,
-):
+    jobs: int = 1,
+    include: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+    guids: Optional[Iterable[str]] = None,
+    stats: Optional[Dict[str, ExtractStats]] = None,
+    executor=None,
+    progress=None,
+    resume: bool = False,
+    on_package=None,
+    store: Optional[AssetStore] = None,
+    move_existing: bool = False,
+) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    iter_extract_multiple, collected into {package path: [(guid, final path
+    relative to its destination), ...]} in input order. Packages that failed
+    (only possible with on_package) are left out.
+    """
+    packages = _plan_packages(unitypackages, output_dir, mode)
+    succeeded: set = set()
+    collected: Dict[str, List[Tuple[str, str]]] = {}
+    for upath, record in _iter_packages(
+        packages, conflict_policy, ask_callback, jobs, include, exclude, guids, stats, executor, progress, resume,
+        on_package, store, succeeded, mode == "project", move_existing,
+    ):
+        collected.setdefault(upath, []).append((record.guid, record.path))
+    return {upath: collected.get(upath, []) for upath, _ in packages if upath in succeeded}
+
+
+def _plan_packages(unitypackages: Iterable[str], output_dir: str, mode: str) -> List[Tuple[str, str]]:
     output_dir = os.path.abspath(output_dir)
     os.makedirs(output_dir, exist_ok=True)
 
-    all_results = {}
-
+    packages: List[Tuple[str, str]] = []
     for upath in unitypackages:
         upath = os.path.abspath(upath)
-        name, _ = os.path.splitext(os.path.basename(upath))
-        if mode == "individual":
-            dest = os.path.join(output_dir, name)
-        else:
-            dest = output_dir
+        dest = package_destination(upath, output_dir, mode)
         os.makedirs(dest, exist_ok=True)
-        results = extract_unitypackage(
+        packages.append((upath, dest))
+    return packages
+
+
+def _iter_packages(
+    packages: List[Tuple[str, str]],
+    conflict_policy: str,
+    ask_callback,
+    jobs: int,
+    include,
+    exclude,
+    guids,
+    stats: Optional[Dict[str, ExtractStats]],
+    executor,
+    progress,
+    resume: bool,
+    on_package,
+    store: Optional[AssetStore],
+    succeeded: set,
+    project: bool = False,
+    move_existing: bool = False,
+) -> Iterator[Tuple[str, ExtractedAsset]]:
+    filters = {
+        "include": list(include) if include else None,
+        "exclude": list(exclude) if exclude else None,
+        "guids": list(guids) if guids else None,
+    }
+    tracker = _ProgressTracker(progress, [p for p, _ in packages]) if progress is not None else None
+    try:
+        if jobs > 1 and len(packages) > 1 and not project:
+            yield from _extract_parallel(
+                packages, conflict_policy, jobs, filters, stats, executor, tracker, resume, on_package, store, succeeded
+            )
+        else:
+            yield from _extract_sequential(
+                packages, conflict_policy, ask_callback, filters, stats, tracker, resume, on_package, store, succeeded,
+                project, move_existing, jobs,
+            )
+    finally:
+        if store is not None:
+            store.close()
+
+    # Journals are kept until every package is in place: in merge mode a
+    # resumed package must not treat files of a finished one as new conflicts.
+    for upath, dest in packages:
+        if upath in succeeded:
+            remove_journal(dest, upath)
+
+
+def _extract_sequential(
+    packages: List[Tuple[str, str]],
+    conflict_policy: str,
+    ask_callback,
+    filters: Dict[str, object],
+    stats: Optional[Dict[str, ExtractStats]],
+    tracker: Optional[_ProgressTracker],
+    resume: bool,
+    on_package=None,
+    store: Optional[AssetStore] = None,
+    succeeded: Optional[set] = None,
+    project: bool = False,
+    move_existing: bool = False,
+    inflate_jobs: int = 1,
+) -> Iterator[Tuple[str, ExtractedAsset]]:
+    # One ProjectIndex per destination, shared by its packages
+    projects: Dict[str, object] = {}
+    for i, (upath, dest) in enumerate(packages):
+        package_stats = ExtractStats(package=upath) if stats is not None or on_package is not None else None
+        if tracker is not None:
+            tracker.begin(i)
+        error = None
+        if project and os.path.normcase(dest) not in projects:
+            from .project import ProjectIndex
+
+            start = time.perf_counter()
+            projects[os.path.normcase(dest)] = ProjectIndex.scan(dest)
+            if package_stats is not None:
+                package_stats.add("project", time.perf_counter() - start)
+        records = iter_extract(
             unitypackage_path=upath,
             dest_root=dest,
             conflict_policy=conflict_policy,
             ask_callback=ask_callback,
+            index=_cached_index(upath),
+            stats=package_stats,
+            progress=tracker,
+            resume=resume,
+            keep_journal=True,
+            store=store,
+            project=projects.get(os.path.normcase(dest), False),
+            move_existing=move_existing,
+            inflate_jobs=inflate_jobs,
+            **filters,
         )
-        all_results[upath] = results
-
-    return all_results
+        try:
+            with closing(records):
+                for record in records:
+                    yield upath, record
+            if succeeded is not None:
+                succeeded.add(upath)
+        except Exception as e:
+            if on_package is None:
+                raise
+            error = e
+        if tracker is not None:
+            tracker.end(last=i == len(packages) - 1)
+        if stats is not None:
+            stats[upath] = package_stats
+        if on_package is not None:
+            on_package(upath, package_stats, error)
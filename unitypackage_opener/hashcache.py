@@ -0,0 +1,111 @@
+"""
+Persistent cache of destination file digests.
+
+Digests are keyed by absolute path, size and mtime, so a file that has not
+been touched since it was last hashed is never read again. New digests are
+buffered and written in short transactions, so parallel extractions sharing
+the cache never hold its write lock for long.
+"""
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from .settings import SETTINGS_DIR
+
+DIGEST_CACHE_PATH = os.path.join(SETTINGS_DIR, "digests.sqlite")
+
+_HASH_CHUNK = 1024 * 1024
+# Buffered digests are written out at least this often (seconds), or once this many are waiting
+FLUSH_INTERVAL = 0.5
+FLUSH_ROWS = 256
+
+
+def new_hasher():
+    return hashlib.sha1()
+
+
+def bytes_digest(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def file_digest(path: str) -> str:
+    h = new_hasher()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(_HASH_CHUNK)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class DigestCache:
+    def __init__(self, db_path: str = DIGEST_CACHE_PATH):
+        # Imported here so headless start-up doesn't pay for sqlite3 unless needed
+        import sqlite3
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        # Readers in other processes don't wait for a writer
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS digests ("
+            " path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, digest TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        # path key -> (size, mtime_ns, digest) not written yet
+        self._pending: Dict[str, Tuple[int, int, str]] = {}
+        self._last_flush = time.monotonic()
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    def get(self, path: str, size: int, mtime_ns: int) -> Optional[str]:
+        key = self._key(path)
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                return pending[2] if pending[:2] == (size, mtime_ns) else None
+            row = self._conn.execute(
+                "SELECT digest FROM digests WHERE path = ? AND size = ? AND mtime_ns = ?", (key, size, mtime_ns)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _record(self, path: str, st: os.stat_result, digest: str) -> None:
+        with self._lock:
+            self._pending[self._key(path)] = (st.st_size, st.st_mtime_ns, digest)
+            now = time.monotonic()
+            if len(self._pending) >= FLUSH_ROWS or now - self._last_flush >= FLUSH_INTERVAL:
+                self._flush_locked(now)
+
+    def _flush_locked(self, now: float) -> None:
+        if self._pending:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO digests (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                [(key, size, mtime_ns, digest) for key, (size, mtime_ns, digest) in self._pending.items()],
+            )
+            self._conn.commit()
+            self._pending = {}
+        self._last_flush = now
+
+    def put(self, path: str, digest: str) -> None:
+        """Record the digest of a file as it is on disk now."""
+        self._record(path, os.stat(path), digest)
+
+    def digest(self, path: str) -> str:
+        st = os.stat(path)
+        cached = self.get(path, st.st_size, st.st_mtime_ns)
+        if cached is not None:
+            return cached
+        digest = file_digest(path)
+        self._record(path, st, digest)
+        return digest
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked(time.monotonic())
+            self._conn.close()
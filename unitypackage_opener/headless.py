@@ -0,0 +1,372 @@
+"""
+Headless entry point used by the Explorer context menu.
+
+Only the extractor, settings and the minimal progress code are imported
+here; tkinter/customtkinter and the registry module (winreg) are loaded
+lazily when the settings GUI is actually shown.
+"""
+import os
+import sys
+
+from .cli import SUBCOMMANDS, exit_on_broken_pipe
+from .extractor import iter_extract_multiple, package_destination, plan_extraction
+from .index import get_index
+from .progress_indicator import ConsoleProgress, extraction_progress_indicator, try_show_toast_notification
+from .runlog import RunLog, profile_mode, profiled
+from .service import hand_off_or_serve
+from .store import store_from_settings
+from .settings import SETTINGS_DIR, load_settings
+
+LAST_RUN_LOG = os.path.join(SETTINGS_DIR, "last_run.log")
+
+
+def list_packages(paths: list[str]) -> int:
+    status = 0
+    for p in paths:
+        try:
+            index = get_index(p)
+        except Exception as e:
+            print(f"{p}: ERROR: {e}", file=sys.stderr)
+            status = 1
+            continue
+        if len(paths) > 1:
+            print(f"# {index.path}")
+        for entry in index.entries:
+            size = "-" if entry.size is None else str(entry.size)
+            print(f"{entry.guid}\t{size}\t{entry.pathname}")
+    return status
+
+
+def print_plan(paths: list[str], output_dir: str, mode: str, conflict_policy: str, include, exclude, guids) -> int:
+    status = 0
+    for p in paths:
+        dest = package_destination(p, output_dir, mode)
+        try:
+            plan = plan_extraction(p, dest, conflict_policy, include=include, exclude=exclude, guids=guids)
+        except Exception as e:
+            print(f"{p}: ERROR: {e}", file=sys.stderr)
+            status = 1
+            continue
+        conflicts = [row for row in plan if row[2] != "write"]
+        print(f"# {p} -> {dest}: {len(plan)} assets, {len(conflicts)} conflicts")
+        for guid, pathname, action, final_path in conflicts:
+            suffix = f" -> {final_path}" if final_path != pathname else ""
+            print(f"{action}\t{pathname}{suffix}")
+    return status
+
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0] in SUBCOMMANDS:
+        # スクリプト・ビルドマシン向けのサブコマンド（設定は上書きせず、その回だけ適用）
+        from .cli import main as cli_main
+
+        sys.exit(cli_main(args))
+    # 実行ログはメモリに貯めて終了時に一度だけ書き出す（起動ごとに上書き）
+    log = RunLog()
+    log.event("invocation", argv=sys.argv)
+    headless_flag = False
+    list_flag = False
+    dry_run_flag = False
+    profile_flag = False
+    no_service_flag = False
+    file_candidates = []
+    filter_args: dict[str, list[str]] = {"include": [], "exclude": [], "guids": []}
+    filter_flags = {"--include": "include", "--exclude": "exclude", "--guid": "guids"}
+    it = iter(args)
+    for a in it:
+        if a == "--headless":
+            headless_flag = True
+            continue
+        if a == "--list":
+            list_flag = True
+            continue
+        if a == "--dry-run":
+            dry_run_flag = True
+            continue
+        if a == "--profile":
+            profile_flag = True
+            continue
+        if a == "--no-service":
+            no_service_flag = True
+            continue
+        flag, eq, value = a.partition("=")
+        if flag in filter_flags:
+            if not eq:
+                value = next(it, "")
+            if value.strip():
+                filter_args[filter_flags[flag]].append(value.strip())
+            continue
+        if a.strip():
+            file_candidates.append(a)
+    # .unitypackage拡張子で存在するファイルのみ抽出
+    passed = []
+    for arg in file_candidates:
+        exists = os.path.exists(arg)
+        is_unitypackage = arg.lower().endswith('.unitypackage')
+        size = os.path.getsize(arg) if exists else None
+        log.event("candidate", path=arg, exists=exists, unitypackage=is_unitypackage, size=size)
+        if is_unitypackage and exists:
+            passed.append(arg)
+
+    if list_flag:
+        # 中身の一覧だけを表示（解凍はしない）
+        # head などにパイプして途中で閉じられても、トレースバックを出さずに終了
+        sys.exit(exit_on_broken_pipe(list_packages, passed))
+
+    if not (headless_flag or passed):
+        # GUI は設定画面だけなので、必要になったときに初めて tkinter を読み込む
+        from .app import run_gui
+
+        run_gui()
+        return
+
+    app_settings = load_settings()
+    if dry_run_flag:
+        # 解凍せず、競合の予定だけを表示
+        output_dir = resolve_output_dir(app_settings, passed)
+        include, exclude, guids = effective_filters(app_settings, filter_args)
+        sys.exit(
+            exit_on_broken_pipe(
+                print_plan, passed, output_dir, app_settings.mode, app_settings.conflict, include, exclude, guids
+            )
+        )
+
+    if passed and app_settings.single_instance and not no_service_flag:
+        # 複数選択で起動された他のプロセスとまとめて1回の解凍にする
+        request = {
+            "paths": [os.path.abspath(p) for p in passed],
+            "filters": filter_args,
+            "profile": profile_flag,
+            "headless": headless_flag,
+        }
+        runner = _BatchRunner()
+        try:
+            # サービス側で解凍した場合も、そのバッチの終了コードで終わる（--no-service と同じ）
+            status = hand_off_or_serve(request, runner)
+        finally:
+            runner.close()
+        if status is not None:
+            if status:
+                sys.exit(status)
+            return
+        log.event("service_unavailable")
+
+    status = run_extraction(passed, filter_args, log, profile_flag, headless_flag=headless_flag)
+    if status:
+        sys.exit(status)
+
+
+def resolve_output_dir(app_settings, passed: list[str]) -> str:
+    if getattr(app_settings, "output_dir_mode", "auto") == "auto" and passed:
+        return os.path.dirname(os.path.abspath(passed[0]))
+    return app_settings.output_dir
+
+
+def effective_filters(app_settings, filter_args: dict[str, list[str]]):
+    # コマンドラインで指定されたフィルタは設定より優先
+    include = filter_args.get("include") or app_settings.include
+    exclude = filter_args.get("exclude") or app_settings.exclude
+    guids = filter_args.get("guids") or app_settings.guids
+    return include, exclude, guids
+
+
+def show_progress_window(app_settings, headless_flag: bool) -> bool:
+    if app_settings.progress_window is None:
+        # 既定: コンソールがなく --headless でもない起動（エクスプローラー）では、ウィンドウがないと進捗が見えない
+        return not headless_flag and not ConsoleProgress.available()
+    return bool(app_settings.progress_window)
+
+
+def effective_jobs(app_settings) -> int:
+    return app_settings.jobs if app_settings.jobs > 0 else (os.cpu_count() or 1)
+
+
+def run_extraction(
+    passed: list[str],
+    filter_args: dict[str, list[str]],
+    log: RunLog,
+    profile_flag: bool = False,
+    executor=None,
+    headless_flag: bool = True,
+    flush_log: bool = True,
+) -> int:
+    """
+    Extract with the saved settings; returns the process exit status.
+    flush_log=False leaves the logs to the caller, which runs several
+    extractions into one: the run log is not written, and the summary is
+    appended to LAST_RUN_LOG (which the caller truncates) instead of
+    replacing it.
+    """
+    app_settings = load_settings()
+
+    os.makedirs(SETTINGS_DIR, exist_ok=True)
+    summary_mode = "w" if flush_log else "a"
+
+    try:
+        output_dir = resolve_output_dir(app_settings, passed)
+        conflict_policy = app_settings.conflict
+        include, exclude, guids = effective_filters(app_settings, filter_args)
+        jobs = effective_jobs(app_settings)
+        profile = profile_mode(profile_flag)
+        if profile is not None:
+            # プロファイラはこのプロセスのこのスレッドしか見えないので、並列解凍も進捗ウィンドウのスレッドも使わない
+            jobs = 1
+
+        log.event(
+            "settings",
+            headless=headless_flag,
+            mode=app_settings.mode,
+            conflict=conflict_policy,
+            output_dir_mode=getattr(app_settings, "output_dir_mode", "auto"),
+            output_dir=output_dir,
+            include=include,
+            exclude=exclude,
+            guids=guids,
+            jobs=jobs,
+            profile=profile,
+            packages=passed,
+        )
+
+        # Show progress indication during extraction
+        if passed:
+            # Show notification for extraction start
+            first_file = os.path.basename(passed[0])
+            try_show_toast_notification(
+                "Unity Package Extractor", 
+                f"Extracting {first_file}..."
+            )
+
+        package_stats: dict = {}
+        with profiled(profile, log), log.phase("extract_multiple", packages=len(passed)):
+            with extraction_progress_indicator(
+                show_cursor=True,
+                create_temp_file=bool(passed),
+                output_dir=output_dir if passed else None
+            ):
+                def work(progress):
+                    # 件数だけ数え、アセットごとの結果は保持しない
+                    entries = 0
+                    for _ in iter_extract_multiple(
+                        unitypackages=passed,
+                        output_dir=output_dir,
+                        mode=app_settings.mode,
+                        conflict_policy=conflict_policy,
+                        jobs=jobs,
+                        include=include,
+                        exclude=exclude,
+                        guids=guids,
+                        stats=package_stats,
+                        executor=executor,
+                        progress=progress,
+                        resume=app_settings.resume,
+                        store=store_from_settings(app_settings),
+                        move_existing=app_settings.move_existing,
+                    ):
+                        entries += 1
+                    return entries
+
+                window = None
+                if passed and profile is None and show_progress_window(app_settings, headless_flag):
+                    try:
+                        # 進捗バーを出すときだけ GUI を読み込む
+                        from .app import run_with_progress_window as window
+                    except ImportError as e:
+                        log.event("progress_window_unavailable", error=repr(e))
+                if window is not None:
+                    total_entries = window(work)
+                else:
+                    total_entries = work(ConsoleProgress() if passed and ConsoleProgress.available() else None)
+        for stats in package_stats.values():
+            log.event("package", **stats.as_dict())
+
+        # Show completion notification
+        if passed and package_stats:
+            try_show_toast_notification(
+                "Unity Package Extractor",
+                f"Extraction complete! {total_entries} files extracted."
+            )
+
+        log.event("done", packages=len(package_stats), entries=total_entries)
+
+        with open(LAST_RUN_LOG, summary_mode, encoding="utf-8") as f:
+            f.write(f"Mode: {app_settings.mode}\n")
+            f.write(f"Conflict: {app_settings.conflict}\n")
+            f.write(f"Output: {output_dir}\n")
+            f.write("Processed files:\n")
+            for p in passed:
+                f.write(f" - {p}\n")
+        return 0
+    except Exception as e:
+        log.event("error", error=repr(e))
+        with open(LAST_RUN_LOG, summary_mode, encoding="utf-8") as f:
+            f.write(f"Error: {e}\n")
+        return 1
+    finally:
+        if flush_log:
+            log.flush()
+
+
+class _BatchRunner:
+    """Runs service batches, keeping one process pool for the server's lifetime."""
+
+    def __init__(self):
+        self._pool = None
+
+    def _executor(self, jobs: int):
+        if jobs <= 1:
+            return None
+        if self._pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._pool = ProcessPoolExecutor(max_workers=jobs)
+        return self._pool
+
+    def __call__(self, requests: list[dict]) -> int:
+        """Extract a batch of requests; returns its exit status (non-zero if any group failed)."""
+        app_settings = load_settings()
+        auto = getattr(app_settings, "output_dir_mode", "auto") == "auto"
+        # Same output folder and filters -> one extract_multiple call, in arrival order
+        groups: dict = {}
+        seen = set()
+        profile_flag = False
+        # 1つでもエクスプローラーからの依頼があれば、進捗はウィンドウで見せる
+        headless_flag = True
+        for request in requests:
+            profile_flag = profile_flag or bool(request.get("profile"))
+            headless_flag = headless_flag and request.get("headless", True)
+            filters = request.get("filters") or {}
+            filter_key = tuple(tuple(filters.get(k) or ()) for k in ("include", "exclude", "guids"))
+            for path in request.get("paths", []):
+                if path in seen or not os.path.exists(path):
+                    continue
+                seen.add(path)
+                dir_key = os.path.normcase(os.path.dirname(path)) if auto else None
+                groups.setdefault((dir_key, filter_key), (filters, []))[1].append(path)
+        executor = self._executor(effective_jobs(app_settings))
+        # 1バッチ = 1つの実行ログ（グループごとに書き出すと最後のグループ以外が上書きされる）
+        log = RunLog()
+        log.event("service_batch", requests=len(requests), groups=len(groups))
+        status = 0
+        try:
+            # last_run.log も1バッチに1つ（各グループの要約を追記する）
+            os.makedirs(SETTINGS_DIR, exist_ok=True)
+            open(LAST_RUN_LOG, "w", encoding="utf-8").close()
+            for filters, paths in groups.values():
+                log.event("service_group", packages=paths, filters=filters)
+                group_status = run_extraction(
+                    paths, filters, log, profile_flag, executor=executor, headless_flag=headless_flag, flush_log=False
+                )
+                status = max(status, group_status)
+        finally:
+            log.flush()
+        return status
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Content index for .unitypackage files.
+
+Scanning reads the tar headers (and the tiny pathname members) once and
+records, per GUID, the asset pathname, its size and where its member starts.
+Indexes are cached under SETTINGS_DIR and reused as long as the package's
+size and mtime are unchanged.
+
+Where zran can record them, the same pass also collects access points into
+the gzip stream (see zran.py); their 32 KiB windows are kept in a file next
+to the cached index and only read when an access point is used.
+"""
+import gzip
+import hashlib
+import json
+import os
+import zlib
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .settings import SETTINGS_DIR
+from .tarreader import iter_members, read_pathname
+
+INDEX_DIR = os.path.join(SETTINGS_DIR, "index")
+INDEX_VERSION = 2
+
+
+@dataclass
+class IndexEntry:
+    guid: str
+    pathname: str
+    # Size of the asset member, or None for GUID entries without one (folders)
+    size: Optional[int] = None
+    # Offset of the asset member header in the uncompressed tar stream
+    offset: Optional[int] = None
+    # Position in the compressed file at which that member was reached
+    compressed_offset: Optional[int] = None
+
+
+@dataclass
+class PackageIndex:
+    path: str
+    size: int
+    mtime_ns: int
+    entries: List[IndexEntry] = field(default_factory=list)
+    # Access points into the gzip stream (zran.Checkpoint), in offset order
+    checkpoints: list = field(default_factory=list)
+    # Compressed windows of a fresh scan; None once they live next to the cache
+    window_data: Optional[bytes] = None
+
+    def window(self, checkpoint) -> bytes:
+        """The 32 KiB of output before an access point."""
+        if self.window_data is not None:
+            data = self.window_data[checkpoint.window_offset:checkpoint.window_offset + checkpoint.window_length]
+        else:
+            with open(_windows_path(self.path), "rb") as f:
+                f.seek(checkpoint.window_offset)
+                data = f.read(checkpoint.window_length)
+        return zlib.decompress(data)
+
+    def assets(self) -> List[IndexEntry]:
+        """Entries that carry an asset, i.e. what extraction would write."""
+        return [e for e in self.entries if e.size is not None]
+
+    def pathnames(self) -> Dict[str, str]:
+        return {e.guid: e.pathname for e in self.entries if e.size is not None}
+
+
+def _stat_key(path: str):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def _cache_path(path: str) -> str:
+    key = hashlib.sha1(os.path.normcase(os.path.abspath(path)).encode("utf-8")).hexdigest()
+    return os.path.join(INDEX_DIR, key + ".json")
+
+
+def _windows_path(path: str) -> str:
+    return _cache_path(path)[:-len(".json")] + ".windows"
+
+
+def scan_package(unitypackage_path: str) -> PackageIndex:
+    unitypackage_path = os.path.abspath(unitypackage_path)
+    package_size, mtime_ns = _stat_key(unitypackage_path)
+
+    pathnames: Dict[str, str] = {}
+    assets: Dict[str, tuple] = {}
+    order: List[str] = []
+    # Imported here: ctypes isn't needed to load a cached index
+    from . import zran
+
+    inflater = None
+    with open(unitypackage_path, "rb") as raw:
+        if zran.available():
+            inflater = zran.CheckpointInflater(raw)
+            gz, tell = inflater, lambda: inflater.compressed_offset
+        else:
+            gz, tell = gzip.GzipFile(fileobj=raw, mode="rb"), raw.tell
+        with closing(gz):
+            for guid, kind, size, offset, data in iter_members(gz):
+                if guid not in pathnames and guid not in assets:
+                    order.append(guid)
+                if kind == "pathname":
+                    real_path = read_pathname(data)
+                    if real_path:
+                        pathnames.setdefault(guid, real_path)
+                elif kind == "asset":
+                    assets.setdefault(guid, (size, offset, tell()))
+
+    entries = []
+    for guid in order:
+        real_path = pathnames.get(guid)
+        if not real_path:
+            continue
+        asset = assets.get(guid)
+        if asset is None:
+            entries.append(IndexEntry(guid, real_path))
+        else:
+            entries.append(IndexEntry(guid, real_path, *asset))
+    index = PackageIndex(unitypackage_path, package_size, mtime_ns, entries)
+    if inflater is not None and inflater.checkpoints:
+        windows = []
+        position = 0
+        for out, inp, window in inflater.checkpoints:
+            index.checkpoints.append(zran.Checkpoint(out, inp, position, len(window)))
+            windows.append(window)
+            position += len(window)
+        index.window_data = b"".join(windows)
+    return index
+
+
+def save_index(index: PackageIndex) -> None:
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    data = {
+        "version": INDEX_VERSION,
+        "path": index.path,
+        "size": index.size,
+        "mtime_ns": index.mtime_ns,
+        "entries": [[e.guid, e.pathname, e.size, e.offset, e.compressed_offset] for e in index.entries],
+        "checkpoints": [list(c) for c in index.checkpoints],
+    }
+    if index.window_data is not None:
+        # Written first, so a cached index never points at windows that aren't there
+        windows_path = _windows_path(index.path)
+        with open(windows_path + ".tmp", "wb") as f:
+            f.write(index.window_data)
+        os.replace(windows_path + ".tmp", windows_path)
+        data["windows_size"] = len(index.window_data)
+    cache_path = _cache_path(index.path)
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, cache_path)
+
+
+def load_index(unitypackage_path: str) -> Optional[PackageIndex]:
+    """Return the cached index, or None if there is none or it is stale."""
+    unitypackage_path = os.path.abspath(unitypackage_path)
+    try:
+        size, mtime_ns = _stat_key(unitypackage_path)
+        with open(_cache_path(unitypackage_path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != INDEX_VERSION or data.get("size") != size or data.get("mtime_ns") != mtime_ns:
+        return None
+    entries = [IndexEntry(*row) for row in data["entries"]]
+    checkpoints = []
+    if data.get("checkpoints"):
+        from .zran import Checkpoint
+
+        checkpoints = [Checkpoint(*row) for row in data["checkpoints"]]
+        try:
+            if os.path.getsize(_windows_path(unitypackage_path)) != data.get("windows_size"):
+                checkpoints = []
+        except OSError:
+            checkpoints = []
+    return PackageIndex(unitypackage_path, size, mtime_ns, entries, checkpoints)
+
+
+def get_index(unitypackage_path: str) -> PackageIndex:
+    index = load_index(unitypackage_path)
+    if index is None:
+        index = scan_package(unitypackage_path)
+        try:
+            save_index(index)
+        except OSError:
+            pass
+    return index
@@ -0,0 +1,161 @@
+"""
+Checkpoint journal for resumable extraction.
+
+While a package is extracted with resume on, every asset that has been
+placed is appended to a small JSON-lines file under JOURNAL_DIR, keyed by
+destination and package: one header line identifying both, then [guid,
+pathname, size] per asset (pathname relative to the destination, size None
+for assets that were skipped). Nothing is written into the destination,
+where Unity would import it. The journal is removed when extraction
+finishes, so one that is still there belongs to an interrupted run and can
+be resumed.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .settings import SETTINGS_DIR
+
+JOURNAL_DIR = os.path.join(SETTINGS_DIR, "journal")
+JOURNAL_VERSION = 2
+# Buffered records are written out at least this often (seconds)
+FLUSH_INTERVAL = 0.5
+FLUSH_LINES = 256
+
+
+def journal_path(dest_root: str, unitypackage_path: str) -> str:
+    key = "\0".join(os.path.normcase(os.path.abspath(p)) for p in (dest_root, unitypackage_path))
+    return os.path.join(JOURNAL_DIR, hashlib.sha1(key.encode("utf-8", "surrogateescape")).hexdigest() + ".jsonl")
+
+
+def _package_key(dest_root: str, unitypackage_path: str) -> Dict[str, object]:
+    st = os.stat(unitypackage_path)
+    return {
+        "dest": os.path.abspath(dest_root),
+        "package": os.path.abspath(unitypackage_path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+    }
+
+
+class Journal:
+    """
+    Append-only record of the assets of one package placed under dest_root.
+
+    resumed is True when an earlier journal for the same (unchanged) package
+    was found; completed then maps its GUIDs to (pathname, size). started_ns
+    is when the first, interrupted run began.
+    """
+
+    def __init__(self, dest_root: str, unitypackage_path: str, resume: bool = False):
+        self.dest_root = dest_root
+        self.path = journal_path(dest_root, unitypackage_path)
+        self.completed: Dict[str, Tuple[str, Optional[int]]] = {}
+        self.resumed = False
+        self.recorded = 0
+        self.started_ns = time.time_ns()
+        self._lock = threading.Lock()
+        self._buffer: List[str] = []
+        self._last_flush = time.monotonic()
+
+        key = _package_key(dest_root, unitypackage_path)
+        if resume:
+            self._load(key)
+        os.makedirs(JOURNAL_DIR, exist_ok=True)
+        # Rewritten rather than appended to, so a torn last line is dropped
+        self._file = open(self.path, "w", encoding="utf-8")
+        header = dict(key, version=JOURNAL_VERSION, started_ns=self.started_ns)
+        lines = [json.dumps(header, ensure_ascii=False) + "\n"]
+        for guid, (pathname, size) in self.completed.items():
+            lines.append(json.dumps([guid, pathname, size], ensure_ascii=False) + "\n")
+        self._file.write("".join(lines))
+        self._file.flush()
+
+    def _load(self, key: Dict[str, object]) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                if header.get("version") != JOURNAL_VERSION or any(header.get(k) != v for k, v in key.items()):
+                    return
+                for line in f:
+                    try:
+                        guid, pathname, size = json.loads(line)
+                    except ValueError:
+                        # Torn last line from the interrupted run
+                        break
+                    self.completed[guid] = (pathname, size)
+        except (OSError, ValueError, AttributeError):
+            return
+        self.started_ns = header.get("started_ns", self.started_ns)
+        self.resumed = True
+
+    def verified(self) -> Dict[str, str]:
+        """Completed GUIDs whose file is still there with the recorded size."""
+        done: Dict[str, str] = {}
+        for guid, (pathname, size) in self.completed.items():
+            try:
+                st = os.stat(os.path.join(self.dest_root, pathname))
+            except OSError:
+                continue
+            if size is None or st.st_size == size:
+                done[guid] = pathname
+        return done
+
+    def is_leftover(self, path: str) -> bool:
+        """
+        A file the interrupted run was writing when it stopped: present but
+        not journaled, and modified after that run started.
+        """
+        if not self.resumed:
+            return False
+        try:
+            return os.stat(path).st_mtime_ns >= self.started_ns
+        except OSError:
+            return False
+
+    def record(self, guid: str, pathname: str, size: Optional[int]) -> None:
+        line = json.dumps([guid, pathname, size], ensure_ascii=False)
+        with self._lock:
+            self.recorded += 1
+            self._buffer.append(line + "\n")
+            now = time.monotonic()
+            if len(self._buffer) >= FLUSH_LINES or now - self._last_flush >= FLUSH_INTERVAL:
+                self._flush_locked(now)
+
+    def _flush_locked(self, now: float) -> None:
+        if self._buffer:
+            self._file.write("".join(self._buffer))
+            self._file.flush()
+            self._buffer = []
+        self._last_flush = now
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            try:
+                self._flush_locked(time.monotonic())
+            finally:
+                self._file.close()
+                self._file = None
+
+    def has_progress(self) -> bool:
+        """Whether there is anything worth resuming from."""
+        return bool(self.completed) or self.recorded > 0
+
+    def remove(self) -> None:
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def remove_journal(dest_root: str, unitypackage_path: str) -> None:
+    try:
+        os.remove(journal_path(dest_root, unitypackage_path))
+    except OSError:
+        pass
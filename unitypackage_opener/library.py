@@ -0,0 +1,227 @@
+"""
+Library-wide index of which package contains which GUID and pathname.
+
+Every package handed to Library.update is recorded in an SQLite database
+(LIBRARY_DB) with the GUID, pathname and size of each of its assets, taken
+from its package index (see index.py). Packages whose size and mtime are
+unchanged are not looked at again; new or changed ones are scanned on a
+process pool. Lookups by GUID, by pathname prefix and for pathnames that
+several packages would write in merge mode are answered from the database.
+"""
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .settings import SETTINGS_DIR
+
+LIBRARY_DB = os.path.join(SETTINGS_DIR, "library.sqlite")
+# Rows written per transaction while a bulk update is running
+_COMMIT_PACKAGES = 64
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS packages ("
+    " id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+    " assets INTEGER NOT NULL, error TEXT, scanned REAL NOT NULL);"
+    "CREATE TABLE IF NOT EXISTS entries ("
+    " package INTEGER NOT NULL REFERENCES packages(id) ON DELETE CASCADE,"
+    " guid TEXT NOT NULL, pathname TEXT NOT NULL, pathkey TEXT NOT NULL, size INTEGER);"
+    "CREATE INDEX IF NOT EXISTS entries_guid ON entries (guid);"
+    "CREATE INDEX IF NOT EXISTS entries_pathkey ON entries (pathkey, package);"
+    "CREATE INDEX IF NOT EXISTS entries_package ON entries (package);"
+)
+
+
+def _path_key(pathname: str) -> str:
+    # Merge-mode collisions follow the filesystem: case-insensitive on Windows
+    return os.path.normcase(pathname.replace("\\", "/")).replace("\\", "/")
+
+
+def _scan_worker(path: str) -> Tuple[str, Optional[List[Tuple[str, str, Optional[int]]]], Optional[str]]:
+    from .index import get_index
+
+    try:
+        index = get_index(path)
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+    return path, [(e.guid, e.pathname, e.size) for e in index.entries], None
+
+
+@dataclass
+class UpdateStats:
+    scanned: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    removed: int = 0
+    seconds: float = 0.0
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Collision:
+    pathname: str
+    # (package path, guid) for every package that contains the pathname
+    packages: List[Tuple[str, str]]
+
+    @property
+    def same_guid(self) -> bool:
+        """All packages carry the asset under one GUID (a shared file rather than a clash)."""
+        return len({guid for _, guid in self.packages}) == 1
+
+
+class Library:
+    def __init__(self, db_path: str = LIBRARY_DB):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, timeout=30)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _stale(self, paths: List[str]) -> Tuple[List[str], Dict[str, os.stat_result]]:
+        known = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in self._conn.execute("SELECT path, size, mtime_ns FROM packages")
+        }
+        stale: List[str] = []
+        stats: Dict[str, os.stat_result] = {}
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            stats[path] = st
+            if known.get(path) != (st.st_size, st.st_mtime_ns):
+                stale.append(path)
+        return stale, stats
+
+    def _store(self, path: str, st: os.stat_result, entries, error: Optional[str]) -> None:
+        db = self._conn
+        db.execute("DELETE FROM packages WHERE path = ?", (path,))
+        assets = sum(1 for _, _, size in entries or () if size is not None)
+        cur = db.execute(
+            "INSERT INTO packages (path, size, mtime_ns, assets, error, scanned) VALUES (?, ?, ?, ?, ?, ?)",
+            (path, st.st_size, st.st_mtime_ns, assets, error, time.time()),
+        )
+        if entries:
+            package_id = cur.lastrowid
+            db.executemany(
+                "INSERT INTO entries (package, guid, pathname, pathkey, size) VALUES (?, ?, ?, ?, ?)",
+                [(package_id, guid.lower(), pathname, _path_key(pathname), size) for guid, pathname, size in entries],
+            )
+
+    def update(
+        self,
+        unitypackages: Iterable[str],
+        jobs: int = 1,
+        on_package: Optional[Callable[[str, Optional[str]], None]] = None,
+        executor=None,
+    ) -> UpdateStats:
+        """
+        Add new and changed packages (by size and mtime) to the library.
+        on_package(path, error) is called for every package that was scanned.
+        """
+        start = time.perf_counter()
+        paths = list(dict.fromkeys(os.path.abspath(p) for p in unitypackages))
+        stale, stats = self._stale(paths)
+        result = UpdateStats(unchanged=len(stats) - len(stale))
+
+        def _record(path, entries, error):
+            self._store(path, stats[path], entries, error)
+            result.scanned += 1
+            if error is not None:
+                result.failed += 1
+                result.errors[path] = error
+            if on_package is not None:
+                on_package(path, error)
+            if result.scanned % _COMMIT_PACKAGES == 0:
+                self._conn.commit()
+
+        try:
+            if jobs > 1 and len(stale) > 1:
+                from concurrent.futures import ProcessPoolExecutor
+                from contextlib import nullcontext
+
+                # Scan time follows package size: hand out the biggest packages while every worker is still free
+                stale.sort(key=lambda p: stats[p].st_size, reverse=True)
+                if executor is None:
+                    pool_context = ProcessPoolExecutor(max_workers=min(jobs, len(stale)))
+                else:
+                    pool_context = nullcontext(executor)
+                with pool_context as pool:
+                    for path, entries, error in pool.map(_scan_worker, stale, chunksize=4):
+                        _record(path, entries, error)
+            else:
+                for path in stale:
+                    _record(*_scan_worker(path))
+        finally:
+            self._conn.commit()
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def prune(self) -> int:
+        """Forget packages whose file no longer exists; returns how many."""
+        gone = [(path,) for (path,) in self._conn.execute("SELECT path FROM packages") if not os.path.exists(path)]
+        self._conn.executemany("DELETE FROM packages WHERE path = ?", gone)
+        self._conn.commit()
+        return len(gone)
+
+    def packages(self) -> List[Tuple[str, int, Optional[str]]]:
+        """(path, asset count, scan error) of every package in the library."""
+        return self._conn.execute("SELECT path, assets, error FROM packages ORDER BY path").fetchall()
+
+    def find_guid(self, guid: str) -> List[Tuple[str, str]]:
+        """(package path, pathname) of every package containing guid."""
+        return self._conn.execute(
+            "SELECT p.path, e.pathname FROM entries e JOIN packages p ON p.id = e.package"
+            " WHERE e.guid = ? ORDER BY p.path",
+            (guid.strip().lower(),),
+        ).fetchall()
+
+    def find_path(self, prefix: str) -> List[Tuple[str, str, str]]:
+        """(package path, guid, pathname) of every asset whose pathname starts with prefix."""
+        low = _path_key(prefix)
+        # Range scan on the index; U+10FFFF sorts after anything that can follow the prefix
+        return self._conn.execute(
+            "SELECT p.path, e.guid, e.pathname FROM entries e JOIN packages p ON p.id = e.package"
+            " WHERE e.pathkey >= ? AND e.pathkey < ? ORDER BY e.pathkey, p.path",
+            (low, low + "\U0010ffff"),
+        ).fetchall()
+
+    def collisions(self, unitypackages: Optional[Iterable[str]] = None) -> List[Collision]:
+        """
+        Pathnames that more than one package would write, i.e. the conflicts
+        of extracting them together in merge mode. Limited to the given
+        packages if any (they must be in the library), else the whole library.
+        """
+        db = self._conn
+        scope = ""
+        if unitypackages is not None:
+            paths = [os.path.abspath(p) for p in unitypackages]
+            db.execute("CREATE TEMP TABLE IF NOT EXISTS scope (id INTEGER PRIMARY KEY)")
+            db.execute("DELETE FROM scope")
+            db.executemany("INSERT OR IGNORE INTO scope SELECT id FROM packages WHERE path = ?", [(p,) for p in paths])
+            scope = " AND e.package IN (SELECT id FROM scope)"
+        rows = db.execute(
+            "SELECT e.pathkey, e.pathname, p.path, e.guid FROM entries e JOIN packages p ON p.id = e.package"
+            " WHERE e.size IS NOT NULL" + scope + " AND e.pathkey IN ("
+            "  SELECT pathkey FROM entries e WHERE e.size IS NOT NULL" + scope +
+            "  GROUP BY pathkey HAVING COUNT(DISTINCT package) > 1)"
+            " ORDER BY e.pathkey, p.path"
+        ).fetchall()
+        result: List[Collision] = []
+        for key, pathname, path, guid in rows:
+            if not result or _path_key(result[-1].pathname) != key:
+                result.append(Collision(pathname, []))
+            result[-1].packages.append((path, guid))
+        return result
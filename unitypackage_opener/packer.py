@@ -0,0 +1,249 @@
+"""
+Create .unitypackage files from folders (the reverse of extraction).
+
+Every file and folder below the source becomes one GUID entry with
+``asset`` (files only), ``asset.meta`` and ``pathname`` members. GUIDs are
+taken from the existing ``.meta`` files; entries without one get a GUID
+derived from their pathname (so repeated exports stay stable) and a minimal
+meta file.
+
+The tar stream is compressed the way pigz does it: fixed-size blocks are
+deflated on all cores at once, each primed with the last 32 KiB of the
+block before it, and the raw deflate streams are joined into one ordinary
+gzip member.
+"""
+import hashlib
+import os
+import struct
+import tarfile
+import threading
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+from .project import is_ignored, meta_guid
+
+BLOCK_SIZE = 1024 * 1024
+_DICT_SIZE = 32 * 1024
+_READ_CHUNK = 1024 * 1024
+DEFAULT_LEVEL = 6
+
+_META_TEMPLATE = (
+    "fileFormatVersion: 2\n"
+    "guid: {guid}\n"
+    "{folder}"
+    "DefaultImporter:\n"
+    "  externalObjects: {{}}\n"
+    "  userData: \n"
+    "  assetBundleName: \n"
+    "  assetBundleVariant: \n"
+)
+
+
+@dataclass
+class PackStats:
+    package: str = ""
+    assets: int = 0
+    folders: int = 0
+    # Tar stream size before and after compression
+    bytes_in: int = 0
+    bytes_out: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class _Entry:
+    guid: str
+    pathname: str
+    # None for folders
+    path: Optional[str]
+    meta: bytes
+    mtime: int
+
+
+def _read_meta(path: str, pathname: str, folder: bool) -> Tuple[str, bytes]:
+    try:
+        with open(path + ".meta", "rb") as f:
+            meta = f.read()
+    except OSError:
+        meta = None
+    guid = meta_guid(meta) if meta is not None else None
+    if guid is None:
+        guid = hashlib.md5(pathname.encode("utf-8")).hexdigest()
+        meta = _META_TEMPLATE.format(guid=guid, folder="folderAsset: yes\n" if folder else "").encode("utf-8")
+    return guid, meta
+
+
+def _default_root(source_dir: str) -> str:
+    """
+    Pathnames start at "Assets/": below a project's Assets folder they are
+    taken from it, otherwise the source folder is placed directly under it.
+    """
+    parts = source_dir.replace("\\", "/").split("/")
+    for i in range(len(parts) - 1, -1, -1):
+        if parts[i] == "Assets":
+            return "/".join(parts[i:])
+    return "Assets/" + os.path.basename(source_dir)
+
+
+def collect_entries(source_dir: str, root: Optional[str] = None) -> List[_Entry]:
+    """Folder and file entries below source_dir (the folder itself included unless it is Assets), in path order."""
+    source_dir = os.path.abspath(source_dir)
+    root = (root or _default_root(source_dir)).replace("\\", "/").strip("/")
+    entries: List[_Entry] = []
+    if root != "Assets":
+        guid, meta = _read_meta(source_dir, root, True)
+        entries.append(_Entry(guid, root, None, meta, int(os.stat(source_dir).st_mtime)))
+    for dirpath, dirs, files in os.walk(source_dir):
+        dirs[:] = sorted(d for d in dirs if not is_ignored(d))
+        rel = os.path.relpath(dirpath, source_dir).replace("\\", "/")
+        base = root if rel == "." else f"{root}/{rel}"
+        children = [(d, True) for d in dirs]
+        children += [(f, False) for f in files if not is_ignored(f) and not f.endswith(".meta")]
+        for name, folder in sorted(children):
+            path = os.path.join(dirpath, name)
+            pathname = f"{base}/{name}"
+            guid, meta = _read_meta(path, pathname, folder)
+            entries.append(_Entry(guid, pathname, None if folder else path, meta, int(os.stat(path).st_mtime)))
+    return entries
+
+
+def _header(name: str, size: int, mtime: int, type_: bytes = tarfile.REGTYPE) -> bytes:
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mtime = mtime
+    info.type = type_
+    info.mode = 0o755 if type_ == tarfile.DIRTYPE else 0o644
+    return info.tobuf(tarfile.USTAR_FORMAT, "utf-8", "surrogateescape")
+
+
+def _padding(size: int) -> bytes:
+    return b"\0" * (-size % tarfile.BLOCKSIZE)
+
+
+def _iter_tar(entries: List[_Entry]) -> Iterator[bytes]:
+    """The uncompressed tar stream, in pieces of any size."""
+    for entry in entries:
+        yield _header(entry.guid, 0, entry.mtime, tarfile.DIRTYPE)
+        if entry.path is not None:
+            with open(entry.path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                yield _header(f"{entry.guid}/asset", size, entry.mtime)
+                left = size
+                while left > 0:
+                    chunk = f.read(min(left, _READ_CHUNK))
+                    if not chunk:
+                        raise OSError(f"{entry.path} shrank while it was being packed")
+                    left -= len(chunk)
+                    yield chunk
+            yield _padding(size)
+        for kind, data in (("asset.meta", entry.meta), ("pathname", entry.pathname.encode("utf-8"))):
+            yield _header(f"{entry.guid}/{kind}", len(data), entry.mtime)
+            yield data
+            yield _padding(len(data))
+    # End-of-archive marker, padded to a full record like tarfile does
+    yield b"\0" * tarfile.RECORDSIZE
+
+
+def _blocks(pieces: Iterator[bytes], size: int) -> Iterator[bytes]:
+    buf = bytearray()
+    for piece in pieces:
+        buf += piece
+        while len(buf) >= size:
+            yield bytes(buf[:size])
+            del buf[:size]
+    if buf:
+        yield bytes(buf)
+
+
+def _deflate(block: bytes, zdict: bytes, level: int, last: bool) -> bytes:
+    # Raw deflate; a sync flush ends each block on a byte boundary so the
+    # streams can be concatenated, and only the last one is finished.
+    if zdict:
+        comp = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zlib.DEF_MEM_LEVEL, zlib.Z_DEFAULT_STRATEGY, zdict)
+    else:
+        comp = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return comp.compress(block) + comp.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+def _gzip_header(mtime: int) -> bytes:
+    return b"\x1f\x8b\x08\x00" + struct.pack("<I", mtime & 0xFFFFFFFF) + b"\x00\xff"
+
+
+def write_gzip(pieces: Iterator[bytes], out, level: int = DEFAULT_LEVEL, jobs: int = 0, mtime: int = 0) -> Tuple[int, int]:
+    """
+    Compress a byte stream to a single gzip member on several threads
+    (zlib releases the GIL). Returns (bytes in, bytes out).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+    crc = 0
+    total = 0
+    written = 0
+    header = _gzip_header(mtime)
+    out.write(header)
+    written += len(header)
+    in_flight: deque = deque()
+    blocks = _blocks(pieces, BLOCK_SIZE)
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="upo-pack") as pool:
+        previous = b""
+        block = next(blocks, None)
+        while block is not None:
+            following = next(blocks, None)
+            in_flight.append(pool.submit(_deflate, block, previous[-_DICT_SIZE:], level, following is None))
+            crc = zlib.crc32(block, crc)
+            total += len(block)
+            previous = block
+            block = following
+            # Keep memory bounded: a couple of blocks per worker
+            while len(in_flight) >= 2 * jobs or (block is None and in_flight):
+                data = in_flight.popleft().result()
+                out.write(data)
+                written += len(data)
+        if total == 0:
+            data = _deflate(b"", b"", level, True)
+            out.write(data)
+            written += len(data)
+    trailer = struct.pack("<II", crc & 0xFFFFFFFF, total & 0xFFFFFFFF)
+    out.write(trailer)
+    return total, written + len(trailer)
+
+
+def pack(
+    source_dir: str,
+    output_path: str,
+    root: Optional[str] = None,
+    jobs: int = 0,
+    level: int = DEFAULT_LEVEL,
+    stats: Optional[PackStats] = None,
+) -> PackStats:
+    """
+    Write the contents of source_dir as a .unitypackage to output_path.
+
+    root: pathname of source_dir inside the package (default: its path from
+    an enclosing Assets folder, else "Assets/<folder name>").
+    jobs: compression threads (0 = CPU count). level: gzip level.
+    """
+    start = time.perf_counter()
+    stats = stats if stats is not None else PackStats()
+    stats.package = os.path.abspath(output_path)
+    entries = collect_entries(source_dir, root)
+    stats.assets = sum(1 for e in entries if e.path is not None)
+    stats.folders = len(entries) - stats.assets
+
+    tmp_path = f"{output_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as out:
+            stats.bytes_in, stats.bytes_out = write_gzip(_iter_tar(entries), out, level, jobs, int(time.time()))
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    stats.seconds = time.perf_counter() - start
+    return stats
@@ -1,7 +1,6 @@
 """
 Progress indication utilities for extraction process.
 """
-import ctypes
 import os
 import sys
 from contextlib import contextmanager
@@ -21,6 +20,8 @@ class WindowsCursor:
         """Set system cursor"""
         try:
             if sys.platform == "win32":
+                import ctypes
+
                 cursor = ctypes.windll.user32.LoadCursorW(None, cursor_id)
                 ctypes.windll.user32.SetCursor(cursor)
         except Exception:
@@ -119,4 +120,37 @@ def try_show_toast_notification(title: str, message: str) -> bool:
     except ImportError:
         pass
     
-    return False
\ No newline at end of file
+    return False
+
+
+def format_progress(event) -> str:
+    """One-line summary of an extractor ProgressEvent."""
+    line = f"[{event.package_index + 1}/{event.package_count}] {event.fraction * 100:5.1f}%"
+    line += f"  {event.entries_done} files  {event.mb_per_s:.1f} MB/s"
+    if event.eta_seconds is not None and not event.finished:
+        line += f"  ETA {event.eta_seconds:.0f}s"
+    return line
+
+
+class ConsoleProgress:
+    """Progress callback that redraws a single line on stderr."""
+
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stderr
+        self._width = 0
+
+    @staticmethod
+    def available(stream=None) -> bool:
+        # pythonw / exe builds have no console (sys.stderr is None)
+        stream = stream if stream is not None else sys.stderr
+        try:
+            return stream is not None and stream.isatty()
+        except Exception:
+            return False
+
+    def __call__(self, event) -> None:
+        line = format_progress(event)
+        pad = " " * max(0, self._width - len(line))
+        self._width = len(line)
+        self.stream.write("\r" + line + pad + ("\n" if event.finished else ""))
+        self.stream.flush()
@@ -0,0 +1,196 @@
+"""
+GUID index of an existing Unity project, for extracting into it by GUID.
+
+Unity keeps every asset's GUID in the .meta file next to it, so a package
+asset whose GUID is already in the project is the same asset, wherever it
+lives now. ProjectIndex.scan reads the .meta files below a destination once
+(directories are listed on a thread pool) and caches, per directory, its
+mtime, subdirectories and the GUIDs of its .meta files under PROJECT_DIR. A
+later scan stats every directory but only lists and reads the ones whose
+mtime changed; Unity (and this tool) replace .meta files rather than editing
+them in place, which changes the directory's mtime.
+"""
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from .settings import SETTINGS_DIR
+
+PROJECT_DIR = os.path.join(SETTINGS_DIR, "project")
+PROJECT_CACHE_VERSION = 1
+# Generated folders of a project root that never hold asset .meta files
+_SKIPPED_ROOT_DIRS = {"library", "temp", "logs", "obj", "usersettings"}
+_GUID_READ = 4096
+# Unity leaves these out of packages (and out of the asset database)
+_IGNORED_SUFFIXES = ("~", ".tmp")
+_IGNORED_NAMES = {"cvs"}
+
+
+def is_ignored(name: str) -> bool:
+    """Unity's own ignore rules: hidden names, names ending in "~" or .tmp, CVS."""
+    lower = name.lower()
+    return name.startswith(".") or lower.endswith(_IGNORED_SUFFIXES) or lower in _IGNORED_NAMES
+
+
+def meta_guid(meta: bytes) -> Optional[str]:
+    """The guid: line of a .meta file, or None if it has none (or not a valid one)."""
+    for line in meta.decode("utf-8", "replace").splitlines():
+        key, _, value = line.partition(":")
+        if key.strip() == "guid":
+            value = value.strip().lower()
+            if len(value) == 32 and all(c in "0123456789abcdef" for c in value):
+                return value
+            return None
+    return None
+
+
+def _read_guid(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return meta_guid(f.read(_GUID_READ))
+    except OSError:
+        return None
+
+
+def _cache_path(root: str) -> str:
+    key = hashlib.sha1(os.path.normcase(root).encode("utf-8", "surrogateescape")).hexdigest()
+    return os.path.join(PROJECT_DIR, key + ".json")
+
+
+# Cached directory: [mtime_ns, subdirectory names, {asset name: guid}]
+_Dir = Tuple[int, List[str], Dict[str, str]]
+
+
+def _scan_dir(path: str, top: bool, cached: Optional[list]) -> Optional[_Dir]:
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[0], cached[1], cached[2]
+    subdirs: List[str] = []
+    metas: Dict[str, str] = {}
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                name = entry.name
+                if is_ignored(name):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if not (top and name.lower() in _SKIPPED_ROOT_DIRS):
+                        subdirs.append(name)
+                elif name.endswith(".meta") and len(name) > 5:
+                    guid = _read_guid(entry.path)
+                    if guid is not None:
+                        metas[name[:-5]] = guid
+    except OSError:
+        return None
+    return mtime_ns, sorted(subdirs), metas
+
+
+class ProjectIndex:
+    """GUID -> path (relative to root, "/"-separated) of the assets in a project."""
+
+    def __init__(self, root: str, guids: Optional[Dict[str, str]] = None):
+        self.root = os.path.abspath(root)
+        self.guids: Dict[str, str] = dict(guids or {})
+        self.read_dirs = 0
+        self.cached_dirs = 0
+
+    def __len__(self) -> int:
+        return len(self.guids)
+
+    def get(self, guid: str) -> Optional[str]:
+        return self.guids.get(guid)
+
+    def add(self, guid: str, path: str) -> None:
+        self.guids[guid] = path.replace("\\", "/")
+
+    @classmethod
+    def scan(cls, root: str, jobs: int = 0, use_cache: bool = True) -> "ProjectIndex":
+        """
+        Index the .meta files below root. jobs: listing threads (0 = a few
+        per CPU; listing is mostly waiting on the filesystem).
+        """
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+        index = cls(root)
+        cache = _load_cache(index.root) if use_cache else {}
+        dirs: Dict[str, _Dir] = {}
+        jobs = jobs if jobs > 0 else min(32, 4 * (os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="upo-scan") as pool:
+            def submit(rel: str):
+                path = os.path.join(index.root, rel) if rel else index.root
+                return pool.submit(_scan_dir, path, not rel, cache.get(rel))
+
+            futures = {submit(""): ""}
+            pending = set(futures)
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    rel = futures.pop(fut)
+                    result = fut.result()
+                    if result is None:
+                        continue
+                    dirs[rel] = result
+                    if cache.get(rel) is not None and cache[rel][0] == result[0]:
+                        index.cached_dirs += 1
+                    else:
+                        index.read_dirs += 1
+                    for name in result[1]:
+                        child = submit(f"{rel}/{name}" if rel else name)
+                        futures[child] = f"{rel}/{name}" if rel else name
+                        pending.add(child)
+        # Path order, so which copy of a duplicated GUID wins doesn't depend on timing
+        for rel in sorted(dirs):
+            for name, guid in sorted(dirs[rel][2].items()):
+                index.guids.setdefault(guid, f"{rel}/{name}" if rel else name)
+        if use_cache:
+            try:
+                _save_cache(index.root, dirs)
+            except OSError:
+                pass
+        return index
+
+
+def _load_cache(root: str) -> Dict[str, list]:
+    try:
+        with open(_cache_path(root), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != PROJECT_CACHE_VERSION or data.get("root") != root:
+        return {}
+    return data.get("dirs", {})
+
+
+def _save_cache(root: str, dirs: Dict[str, _Dir]) -> None:
+    os.makedirs(PROJECT_DIR, exist_ok=True)
+    cache_path = _cache_path(root)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"version": PROJECT_CACHE_VERSION, "root": root, "dirs": {rel: list(d) for rel, d in dirs.items()}},
+            f,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+    os.replace(tmp_path, cache_path)
+
+
+def move_asset(dest_root: str, old_pathname: str, new_pathname: str) -> bool:
+    """
+    Rename an asset inside dest_root, together with its .meta. False (and
+    nothing moved) if the old file is missing or the new path is taken.
+    """
+    src = os.path.join(dest_root, old_pathname)
+    dst = os.path.join(dest_root, new_pathname)
+    if not os.path.isfile(src) or os.path.lexists(dst):
+        return False
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    os.replace(src, dst)
+    # Unity keeps the GUID in the .meta next to the asset; it moves along
+    if os.path.isfile(src + ".meta") and not os.path.lexists(dst + ".meta"):
+        os.replace(src + ".meta", dst + ".meta")
+    return True
@@ -0,0 +1,141 @@
+"""
+Structured run log and optional profiling for headless runs.
+
+Events are buffered in memory and written once, as JSON lines, when the run
+ends. Set UPO_PROFILE=cprofile (or pass --profile) to save a cProfile dump
+next to last_run.log, or UPO_PROFILE=sample for a low-overhead sampling
+profile of all threads in collapsed-stack format (flamegraph.pl /
+speedscope). Profiled runs extract in-process, one package at a time.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from .settings import SETTINGS_DIR
+
+RUN_LOG_PATH = os.path.join(SETTINGS_DIR, "run_log.jsonl")
+PROFILE_ENV = "UPO_PROFILE"
+CPROFILE_PATH = os.path.join(SETTINGS_DIR, "last_run.prof")
+SAMPLE_PROFILE_PATH = os.path.join(SETTINGS_DIR, "last_run.folded")
+
+SAMPLE_INTERVAL = 0.005
+
+
+class RunLog:
+    def __init__(self, path: str = RUN_LOG_PATH):
+        self.path = path
+        self._start = time.perf_counter()
+        self._records: list = []
+
+    def event(self, kind: str, **fields) -> None:
+        record = {"t": round(time.perf_counter() - self._start, 6), "event": kind}
+        record.update(fields)
+        self._records.append(record)
+
+    @contextmanager
+    def phase(self, name: str, **fields) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.event("phase", name=name, seconds=round(time.perf_counter() - start, 6), **fields)
+
+    def flush(self) -> None:
+        """Write the buffered events, replacing the previous run's log."""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                for record in self._records:
+                    f.write(json.dumps(record, ensure_ascii=False, default=str))
+                    f.write("\n")
+        except OSError:
+            pass
+
+
+class _Sampler:
+    """
+    Samples the stacks of every thread in the process at a fixed interval;
+    each stack is rooted at its thread's name, so writer threads show up
+    next to the main thread instead of as time it spends waiting.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="upo-sampler", daemon=True)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if stack:
+                    stack.append(names.get(ident, str(ident)))
+                    self.counts[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, path: str) -> None:
+        self._stop.set()
+        self._thread.join()
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def profile_mode(flag: bool = False) -> Optional[str]:
+    mode = os.environ.get(PROFILE_ENV, "").strip().lower()
+    if mode in ("sample", "sampling"):
+        return "sample"
+    if mode in ("1", "true", "cprofile") or flag:
+        return "cprofile"
+    return None
+
+
+@contextmanager
+def profiled(mode: Optional[str], log: Optional[RunLog] = None) -> Iterator[None]:
+    """
+    Run the body under the requested profiler and save its output. Neither
+    profiler sees other processes, and cProfile only sees the calling
+    thread, so callers run the work on this thread with jobs=1 while
+    profiling (see run_extraction).
+    """
+    if mode is None:
+        yield
+        return
+    os.makedirs(SETTINGS_DIR, exist_ok=True)
+    if mode == "sample":
+        sampler = _Sampler()
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop(SAMPLE_PROFILE_PATH)
+            if log is not None:
+                log.event("profile", mode=mode, path=SAMPLE_PROFILE_PATH)
+        return
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(CPROFILE_PATH)
+        if log is not None:
+            log.event("profile", mode=mode, path=CPROFILE_PATH)
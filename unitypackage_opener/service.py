@@ -0,0 +1,273 @@
+"""
+Single-instance extraction service.
+
+Explorer starts one process per selected package (MultiSelectModel=Player).
+The first headless invocation takes an exclusive lock and becomes a
+short-lived local server (a named pipe on Windows, a Unix socket elsewhere);
+later invocations hand it their request and wait for the exit status of
+the batch it ran in, so every invocation still exits like a standalone
+one would. Requests that arrive within a debounce window are processed as
+one batch, and the server exits after an idle timeout.
+"""
+import os
+import secrets
+import sys
+import threading
+import time
+from multiprocessing.connection import AuthenticationError, Client, Listener
+from typing import Callable, List, Optional, Tuple
+
+from .settings import SETTINGS_DIR
+
+SERVICE_LOCK_PATH = os.path.join(SETTINGS_DIR, "service.lock")
+SERVICE_KEY_PATH = os.path.join(SETTINGS_DIR, "service.key")
+
+# Wait this long after the last request before starting a batch
+DEBOUNCE_SECONDS = 0.5
+# Exit after this long without requests
+IDLE_TIMEOUT_SECONDS = 10.0
+# How long a late invocation keeps trying to reach a server that is starting or stopping
+CLAIM_TIMEOUT_SECONDS = 3.0
+
+_QUEUED = "queued"
+_WAKE = "wake"
+
+
+def service_address() -> Tuple[str, str]:
+    if sys.platform == "win32":
+        user = os.environ.get("USERNAME", "user")
+        return rf"\\.\pipe\unitypackage_opener-{user}", "AF_PIPE"
+    return os.path.join(SETTINGS_DIR, "service.sock"), "AF_UNIX"
+
+
+def _authkey() -> bytes:
+    """Per-user secret so other local users can't inject requests."""
+    os.makedirs(SETTINGS_DIR, exist_ok=True)
+    try:
+        fd = os.open(SERVICE_KEY_PATH, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Another process may still be writing it
+        for _ in range(50):
+            with open(SERVICE_KEY_PATH, "rb") as f:
+                key = f.read()
+            if len(key) >= 32:
+                return key
+            time.sleep(0.01)
+        raise OSError("service key is unreadable")
+    key = secrets.token_bytes(32)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+class _InstanceLock:
+    """Exclusive, non-blocking lock held by the running server for its lifetime."""
+
+    def __init__(self, path: str = SERVICE_LOCK_PATH):
+        self.path = path
+        self._file = None
+
+    def acquire(self) -> bool:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        f = open(self.path, "a+b")
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._file = f
+        return True
+
+    def release(self) -> None:
+        if self._file is None:
+            return
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+
+
+def submit(request: dict) -> Optional[int]:
+    """
+    Hand a request to a running server and wait for the exit status of its
+    batch. None if there is no server (or it is shutting down).
+    """
+    address, family = service_address()
+    if family == "AF_UNIX" and not os.path.exists(address):
+        return None
+    try:
+        conn = Client(address, family, authkey=_authkey())
+    except (OSError, EOFError, AuthenticationError):
+        return None
+    with conn:
+        try:
+            conn.send(request)
+            if conn.recv() != _QUEUED:
+                return None
+        except (OSError, EOFError):
+            return None
+        try:
+            return int(conn.recv())
+        except (OSError, EOFError, TypeError, ValueError):
+            # Queued, but the server went away before reporting back
+            return 1
+
+
+class ExtractionService:
+    """
+    Accepts requests on a local socket and passes them to handler in
+    batches. A request is acknowledged only if it will be processed, so a
+    client that gets no acknowledgement can safely do the work itself.
+    handler returns the batch's exit status, which is sent to every client
+    of the batch before its connection is closed.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[dict]], int],
+        debounce: float = DEBOUNCE_SECONDS,
+        idle_timeout: float = IDLE_TIMEOUT_SECONDS,
+    ):
+        self.handler = handler
+        self.debounce = debounce
+        self.idle_timeout = idle_timeout
+        self._cond = threading.Condition()
+        # (request, connection to report its status on; None for the server's own)
+        self._queue: List[Tuple[dict, object]] = []
+        self._closing = False
+        self._last_arrival = 0.0
+        self._listener = None
+
+    def _accept_loop(self) -> None:
+        while True:
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                if self._closing:
+                    return
+                continue
+            queued = False
+            try:
+                request = conn.recv()
+                with self._cond:
+                    if self._closing or request == _WAKE:
+                        continue
+                    # Acknowledged before the batch can start, which needs the lock
+                    conn.send(_QUEUED)
+                    self._queue.append((request, conn))
+                    queued = True
+                    self._last_arrival = time.monotonic()
+                    self._cond.notify_all()
+            except (OSError, EOFError):
+                pass
+            finally:
+                if not queued:
+                    conn.close()
+                if self._closing:
+                    return
+
+    def _next_batch(self) -> Optional[List[Tuple[dict, object]]]:
+        with self._cond:
+            idle_since = time.monotonic()
+            while not self._queue:
+                remaining = self.idle_timeout - (time.monotonic() - idle_since)
+                if remaining <= 0:
+                    self._closing = True
+                    return None
+                self._cond.wait(remaining)
+            # Let the rest of a multi-select arrive
+            while True:
+                quiet = time.monotonic() - self._last_arrival
+                if quiet >= self.debounce:
+                    break
+                self._cond.wait(self.debounce - quiet)
+            batch, self._queue = self._queue, []
+            return batch
+
+    def serve(self, initial: Optional[dict] = None) -> int:
+        """
+        Run until idle and return the exit status of the batch initial ran
+        in (0 without one). The caller must hold the instance lock.
+        """
+        address, family = service_address()
+        if family == "AF_UNIX" and os.path.exists(address):
+            # Left behind by a server that died; we hold the lock, so nobody else uses it
+            os.remove(address)
+        authkey = _authkey()
+        self._listener = Listener(address, family, authkey=authkey)
+        if initial is not None:
+            self._queue.append((initial, None))
+            self._last_arrival = time.monotonic()
+        own_status = 0
+        acceptor = threading.Thread(target=self._accept_loop, name="upo-service", daemon=True)
+        acceptor.start()
+        try:
+            while True:
+                batch = self._next_batch()
+                if batch is None:
+                    break
+                status = 1
+                try:
+                    status = self.handler([request for request, _ in batch])
+                finally:
+                    for _, conn in batch:
+                        if conn is None:
+                            own_status = status
+                            continue
+                        try:
+                            conn.send(status)
+                        except OSError:
+                            pass
+                        conn.close()
+        finally:
+            with self._cond:
+                self._closing = True
+            # Wake the acceptor so it notices we are closing
+            try:
+                with Client(address, family, authkey=authkey) as conn:
+                    conn.send(_WAKE)
+            except (OSError, EOFError, AuthenticationError):
+                pass
+            acceptor.join(timeout=2)
+            self._listener.close()
+        return own_status
+
+
+def hand_off_or_serve(request: dict, handler: Callable[[List[dict]], int]) -> Optional[int]:
+    """
+    Give the request to the running server, or become the server and process
+    it (plus whatever arrives meanwhile). Returns the exit status of the
+    batch the request ran in, or None if neither worked in time; the caller
+    should then extract on its own.
+    """
+    deadline = time.monotonic() + CLAIM_TIMEOUT_SECONDS
+    while True:
+        status = submit(request)
+        if status is not None:
+            return status
+        lock = _InstanceLock()
+        if lock.acquire():
+            try:
+                return ExtractionService(handler).serve(request)
+            finally:
+                lock.release()
+        if time.monotonic() > deadline:
+            return None
+        time.sleep(0.05)
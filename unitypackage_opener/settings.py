@@ -1,14 +1,14 @@
 # ...existing code...
 import json
 import os
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from typing import Literal
 
 SETTINGS_DIR = os.path.join(os.path.expanduser("~"), ".unitypackage_opener")
 SETTINGS_PATH = os.path.join(SETTINGS_DIR, "settings.json")
 
-ConflictPolicy = Literal["overwrite", "skip", "rename"]
-Mode = Literal["merge", "individual"]
+ConflictPolicy = Literal["overwrite", "skip", "rename", "identical"]
+Mode = Literal["merge", "individual", "project"]
 OutputDirMode = Literal["auto", "fixed"]
 
 
@@ -19,6 +19,27 @@ class AppSettings:
     output_dir: str = os.path.join(os.path.expanduser("~"), "Desktop")
     output_dir_mode: OutputDirMode = "auto"
     last_exe_path: str | None = None
+    # 部分解凍: パスのglob（"**" で階層をまたぐ）と GUID の許可リスト
+    include: list[str] = field(default_factory=list)
+    exclude: list[str] = field(default_factory=list)
+    guids: list[str] = field(default_factory=list)
+    # 複数パッケージを並列に解凍するプロセス数（0 = CPU数）
+    jobs: int = 0
+    # 複数選択で起動された各プロセスを1つのプロセスにまとめて解凍する
+    single_instance: bool = True
+    # 解凍中に進捗バーのウィンドウを表示する。None（既定）はコンソールのない起動（エクスプローラーの右クリック）のときだけ表示、
+    # false のときはコンソールがあればそこに表示
+    progress_window: bool | None = None
+    # 解凍中にジャーナルを SETTINGS_DIR/journal に（出力先とパッケージごとに）記録し、中断された解凍を続きから再開する。
+    # false のときはジャーナルを書かない
+    resume: bool = True
+    # 解凍したアセットを内容ごとに保存し、同じパッケージの2回目以降は展開せずに複製する
+    store: bool = False
+    store_max_mb: int = 4096
+    # "auto"（reflink/コピー）または "hardlink"
+    store_link: str = "auto"
+    # project モードで、プロジェクト内に同じ GUID のアセットが別のパスにあるときパッケージのパスへ移動する
+    move_existing: bool = False
 
 
 _default = AppSettings()
@@ -0,0 +1,274 @@
+"""
+Content-addressed asset store shared by all runs.
+
+Asset bodies are kept once per sha1 digest under STORE_DIR/objects, and for
+every package (identified by a cheap content fingerprint, so copies of the
+same package in different folders match) the store remembers which digest
+and pathname each GUID had. When a package has been stored completely, a
+later extraction of it does not inflate anything: every asset is
+materialized from the store by reflink (FICLONE), copy_file_range, a
+hardlink (if enabled) or, as a last resort, a plain copy.
+
+The store is capped in size; least recently used objects are evicted.
+"""
+import errno
+import hashlib
+import os
+import shutil
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .settings import SETTINGS_DIR
+
+STORE_DIR = os.path.join(SETTINGS_DIR, "store")
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024 * 1024
+# Bytes read from each end of a package for its fingerprint
+_FINGERPRINT_SPAN = 64 * 1024
+# linux/fs.h: _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
+_COPY_CHUNK = 1024 * 1024
+
+
+def package_fingerprint(unitypackage_path: str) -> str:
+    """
+    Size plus the first and last 64 KiB: the gzip header and the trailer
+    (CRC32 and length of the whole tar stream) make this specific enough
+    without reading multi-GB packages.
+    """
+    h = hashlib.sha1()
+    with open(unitypackage_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        h.update(str(size).encode("ascii"))
+        h.update(f.read(_FINGERPRINT_SPAN))
+        if size > _FINGERPRINT_SPAN:
+            f.seek(max(_FINGERPRINT_SPAN, size - _FINGERPRINT_SPAN))
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def _clone_file(src: str, dst: str) -> None:
+    """Copy src to a new file dst, sharing extents where the filesystem can."""
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            import fcntl
+
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            return
+        except (ImportError, OSError):
+            pass
+        if hasattr(os, "copy_file_range"):
+            size = os.fstat(fsrc.fileno()).st_size
+            copied = 0
+            try:
+                while copied < size:
+                    n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - copied)
+                    if n == 0:
+                        break
+                    copied += n
+                if copied == size:
+                    return
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF):
+                    raise
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+        shutil.copyfileobj(fsrc, fdst, _COPY_CHUNK)
+
+
+class AssetStore:
+    """
+    Handle to the store. It can be pickled (for worker processes); the
+    database connection is opened lazily in each process.
+
+    link: "auto" clones or copies; "hardlink" links files to the store
+    object when possible (fastest, but the extracted file and the store
+    then share one inode, so editing it in place changes the cached copy).
+    """
+
+    def __init__(self, root: str = STORE_DIR, max_bytes: int = DEFAULT_MAX_BYTES, link: str = "auto"):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.link = link
+        self._conn = None
+        self._lock = threading.Lock()
+        # digest -> size of objects added since the last record_package. They
+        # are written with the package's rows, so a run holds the database's
+        # write lock only for that one short transaction.
+        self._added: Dict[str, int] = {}
+
+    def __getstate__(self):
+        return {"root": self.root, "max_bytes": self.max_bytes, "link": self.link}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _db(self):
+        if self._conn is None:
+            # Imported here so headless start-up doesn't pay for sqlite3 unless needed
+            import sqlite3
+
+            os.makedirs(os.path.join(self.root, "objects"), exist_ok=True)
+            os.makedirs(os.path.join(self.root, "tmp"), exist_ok=True)
+            self._conn = sqlite3.connect(os.path.join(self.root, "store.sqlite"), timeout=30, check_same_thread=False)
+            # Readers (lookups in other processes) don't wait for a writer
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.executescript(
+                "CREATE TABLE IF NOT EXISTS objects ("
+                " digest TEXT PRIMARY KEY, size INTEGER NOT NULL, last_used REAL NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS objects_lru ON objects (last_used);"
+                "CREATE TABLE IF NOT EXISTS assets ("
+                " fingerprint TEXT NOT NULL, guid TEXT NOT NULL, digest TEXT NOT NULL,"
+                " pathname TEXT NOT NULL, position INTEGER NOT NULL, PRIMARY KEY (fingerprint, guid));"
+                "CREATE INDEX IF NOT EXISTS assets_digest ON assets (digest);"
+                "CREATE TABLE IF NOT EXISTS packages (fingerprint TEXT PRIMARY KEY, assets INTEGER NOT NULL);"
+            )
+        return self._conn
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest[2:])
+
+    def lookup(self, fingerprint: str) -> Optional[List[Tuple[str, str, str, int]]]:
+        """
+        (guid, pathname, digest, size) for every asset of a completely stored
+        package, in archive order; None if the package is not (fully) stored.
+        """
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT assets FROM packages WHERE fingerprint = ?", (fingerprint,)).fetchone()
+            if row is None:
+                return None
+            rows = db.execute(
+                "SELECT a.guid, a.pathname, a.digest, o.size FROM assets a JOIN objects o ON o.digest = a.digest"
+                " WHERE a.fingerprint = ? ORDER BY a.position",
+                (fingerprint,),
+            ).fetchall()
+        if len(rows) != row[0]:
+            return None
+        for _, _, digest, size in rows:
+            # Objects deleted behind our back make the package a miss
+            try:
+                if os.path.getsize(self.object_path(digest)) != size:
+                    return None
+            except OSError:
+                return None
+        return rows
+
+    def touch(self, digests: List[str]) -> None:
+        now = time.time()
+        with self._lock:
+            self._db().executemany("UPDATE objects SET last_used = ? WHERE digest = ?", [(now, d) for d in digests])
+            self._conn.commit()
+
+    def materialize(self, digest: str, dest: str) -> None:
+        """Create dest (which must not exist) with the content of an object."""
+        src = self.object_path(digest)
+        if self.link == "hardlink":
+            try:
+                os.link(src, dest)
+                return
+            except OSError:
+                pass
+        _clone_file(src, dest)
+
+    def add(self, digest: str, source: str) -> None:
+        """Put the content of file source into the store as object digest."""
+        obj = self.object_path(digest)
+        size = os.path.getsize(source)
+        if not os.path.exists(obj):
+            os.makedirs(os.path.dirname(obj), exist_ok=True)
+            os.makedirs(os.path.join(self.root, "tmp"), exist_ok=True)
+            tmp = os.path.join(self.root, "tmp", f"{digest}.{os.getpid()}.{threading.get_ident()}")
+            try:
+                linked = False
+                if self.link == "hardlink":
+                    try:
+                        os.link(source, tmp)
+                        linked = True
+                    except OSError:
+                        pass
+                if not linked:
+                    _clone_file(source, tmp)
+                os.replace(tmp, obj)
+            except BaseException:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                raise
+        with self._lock:
+            self._added[digest] = size
+
+    def _write_added_locked(self, db) -> None:
+        now = time.time()
+        db.executemany(
+            "INSERT OR REPLACE INTO objects (digest, size, last_used) VALUES (?, ?, ?)",
+            [(digest, size, now) for digest, size in self._added.items()],
+        )
+        self._added = {}
+
+    def record_package(self, fingerprint: str, assets: List[Tuple[str, str, str]], complete: bool) -> None:
+        """
+        Remember (guid, pathname, digest) in archive order for a package,
+        together with the objects added since the last call. complete marks
+        that these are all of its assets.
+        """
+        rows = [(fingerprint, guid, digest, pathname, i) for i, (guid, pathname, digest) in enumerate(assets)]
+        with self._lock:
+            db = self._db()
+            self._write_added_locked(db)
+            db.execute("DELETE FROM assets WHERE fingerprint = ?", (fingerprint,))
+            db.execute("DELETE FROM packages WHERE fingerprint = ?", (fingerprint,))
+            db.executemany(
+                "INSERT OR REPLACE INTO assets (fingerprint, guid, digest, pathname, position) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            if complete:
+                db.execute("INSERT INTO packages (fingerprint, assets) VALUES (?, ?)", (fingerprint, len(rows)))
+            db.commit()
+
+    def trim(self) -> int:
+        """Evict least recently used objects until the store fits max_bytes; returns bytes freed."""
+        with self._lock:
+            db = self._db()
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            freed = 0
+            evicted = []
+            for digest, size in db.execute("SELECT digest, size FROM objects ORDER BY last_used"):
+                if total - freed <= self.max_bytes:
+                    break
+                evicted.append(digest)
+                freed += size
+            for digest in evicted:
+                try:
+                    os.remove(self.object_path(digest))
+                except OSError:
+                    pass
+            db.executemany("DELETE FROM objects WHERE digest = ?", [(d,) for d in evicted])
+            # Packages that lost an object can no longer be served without inflating
+            db.executemany(
+                "DELETE FROM packages WHERE fingerprint IN (SELECT fingerprint FROM assets WHERE digest = ?)",
+                [(d,) for d in evicted],
+            )
+            db.commit()
+            return freed
+
+    def close(self) -> None:
+        with self._lock:
+            if self._added:
+                # Objects of a package that failed: keep them counted for trim
+                self._write_added_locked(self._db())
+            if self._conn is not None:
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
+
+
+def store_from_settings(app_settings) -> Optional[AssetStore]:
+    if not getattr(app_settings, "store", False):
+        return None
+    max_mb = getattr(app_settings, "store_max_mb", DEFAULT_MAX_BYTES // (1024 * 1024))
+    return AssetStore(max_bytes=max_mb * 1024 * 1024, link=getattr(app_settings, "store_link", "auto"))
@@ -0,0 +1,255 @@
+"""
+Lean tar member reader for the layout Unity writes into .unitypackage files.
+
+tarfile builds a TarInfo per member and handles every format variant; for
+packages made of hundreds of thousands of tiny members that bookkeeping
+costs more than inflating them. iter_members parses the ustar headers (and
+PAX path/size records) Unity emits directly from the uncompressed stream and
+yields (guid, kind, size, offset, data) per regular file.
+
+Anything outside that subset (GNU long names, sparse files, base-256 sizes,
+a bad checksum, ...) hands the rest of the stream, starting at the header in
+question, to tarfile, so unusual archives read exactly as before.
+"""
+import io
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple
+
+BLOCK = 512
+_NUL_BLOCK = bytes(BLOCK)
+# Members up to this size are read together with their padding in one call
+_SMALL_MEMBER = 64 * 1024
+_SKIP_CHUNK = 1024 * 1024
+_REGULAR_TYPES = (b"0", b"\0", b"7")
+# Entries without data: hard/symbolic links, devices, directories, FIFOs
+_EMPTY_TYPES = (b"1", b"2", b"3", b"4", b"5", b"6")
+_PAX_IGNORED = {
+    "atime", "ctime", "mtime", "uid", "gid", "uname", "gname", "mode", "linkpath", "comment", "charset",
+}
+
+
+class Member(NamedTuple):
+    guid: str
+    # Path below the GUID directory: "asset", "asset.meta", "pathname", ...
+    kind: str
+    size: int
+    # Offset of the member's first header (PAX header included) in the
+    # uncompressed tar stream; matches TarInfo.offset
+    offset: int
+    # File-like object with the member's data; only valid until the next member
+    data: object
+
+
+def read_pathname(fileobj) -> str:
+    """The asset path held by a pathname member (its first line)."""
+    data = fileobj.read()
+    return data.decode("utf8").split("\n", 1)[0].strip()
+
+
+def split_member(name: str) -> Tuple[str, str]:
+    name = name.replace("\\", "/")
+    while name.startswith("./"):
+        name = name[2:]
+    guid, _, kind = name.partition("/")
+    return guid, kind
+
+
+def _read_error(message: str) -> Exception:
+    # tarfile is only needed for errors and unusual archives; importing it
+    # up front would cost every headless start-up
+    import tarfile
+
+    return tarfile.ReadError(message)
+
+
+def _padded(size: int) -> int:
+    return (size + BLOCK - 1) // BLOCK * BLOCK
+
+
+def _nts(field: bytes) -> str:
+    end = field.find(b"\0")
+    if end != -1:
+        field = field[:end]
+    return field.decode("utf-8", "surrogateescape")
+
+
+def _nti(field: bytes) -> Optional[int]:
+    """Octal header number; None for base-256 or malformed values."""
+    if field[0] & 0x80:
+        return None
+    end = field.find(b"\0")
+    if end != -1:
+        field = field[:end]
+    try:
+        return int(field.strip() or b"0", 8)
+    except ValueError:
+        return None
+
+
+def _parse_header(header: bytes) -> Optional[Tuple[str, int, bytes]]:
+    """(name, size, typeflag) of a plain ustar/v7 header, or None if tarfile should handle it."""
+    size = _nti(header[124:136])
+    checksum = _nti(header[148:156])
+    if size is None or checksum is None or checksum != sum(header) - sum(header[148:156]) + 256:
+        return None
+    typeflag = header[156:157]
+    name = _nts(header[0:100])
+    prefix = _nts(header[345:500])
+    if prefix:
+        name = prefix + "/" + name
+    return name, size, typeflag
+
+
+def _parse_pax(data: bytes) -> Optional[Dict[str, object]]:
+    """path/size overrides from a PAX extended header, or None if it needs tarfile."""
+    overrides: Dict[str, object] = {}
+    pos = 0
+    try:
+        while pos < len(data):
+            space = data.index(b" ", pos)
+            length = int(data[pos:space])
+            if length <= 0:
+                return None
+            record = data[space + 1:pos + length - 1]
+            pos += length
+            key, _, value = record.partition(b"=")
+            key = key.decode("utf-8")
+            if key == "path":
+                overrides["path"] = value.decode("utf-8", "surrogateescape")
+            elif key == "size":
+                overrides["size"] = int(value)
+            elif key not in _PAX_IGNORED and not key.startswith(("SCHILY.", "LIBARCHIVE.")):
+                return None
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return overrides
+
+
+class _MemberData:
+    """Bounded view of the current member's data in the tar stream."""
+
+    __slots__ = ("_fileobj", "size", "left")
+
+    def __init__(self, fileobj, size: int):
+        self._fileobj = fileobj
+        self.size = size
+        self.left = size
+
+    def read(self, n: int = -1) -> bytes:
+        if n is None or n < 0 or n > self.left:
+            n = self.left
+        if n == 0:
+            return b""
+        data = self._fileobj.read(n)
+        if len(data) != n:
+            raise _read_error("unexpected end of data")
+        self.left -= n
+        return data
+
+
+class _Prepended:
+    """fileobj with already consumed bytes put back in front, for tarfile."""
+
+    def __init__(self, head: bytes, fileobj):
+        self._head = head
+        self._fileobj = fileobj
+
+    def read(self, n: int = -1) -> bytes:
+        if not self._head:
+            return self._fileobj.read(n)
+        if n is None or n < 0:
+            data, self._head = self._head + self._fileobj.read(), b""
+            return data
+        data, self._head = self._head[:n], self._head[n:]
+        if len(data) < n:
+            data += self._fileobj.read(n - len(data))
+        return data
+
+
+def _skip(fileobj, count: int) -> None:
+    while count > 0:
+        chunk = fileobj.read(min(count, _SKIP_CHUNK))
+        if not chunk:
+            raise _read_error("unexpected end of data")
+        count -= len(chunk)
+
+
+def _fallback(fileobj, head: bytes, base_offset: int) -> Iterator[Member]:
+    import tarfile
+
+    with tarfile.open(fileobj=_Prepended(head, fileobj), mode="r|", encoding="utf8") as tar:
+        for info in tar:
+            if not info.isfile():
+                continue
+            guid, kind = split_member(info.name)
+            yield Member(guid, kind, info.size, base_offset + info.offset, tar.extractfile(info))
+
+
+def iter_members(fileobj, base_offset: int = 0, strict: bool = False) -> Iterator[Member]:
+    """
+    Regular-file members of the uncompressed tar stream fileobj, which must
+    be positioned at a member header (base_offset in the whole stream).
+    Reading stops at the first end-of-archive block; with strict, a stream
+    that ends without one raises ReadError.
+    """
+    offset = base_offset
+    current: Optional[_MemberData] = None
+    # Bytes of the current member (data left plus padding) not read yet
+    pending = 0
+    while True:
+        if current is not None:
+            pending -= current.size - current.left
+            current = None
+        if pending:
+            _skip(fileobj, pending)
+            pending = 0
+        header_offset = offset
+        header = fileobj.read(BLOCK)
+        if not header or header == _NUL_BLOCK:
+            if header_offset == 0:
+                # Not a tar stream at all: let tarfile raise its usual error
+                yield from _fallback(fileobj, header, 0)
+            elif strict and not header:
+                raise _read_error("missing end-of-archive marker")
+            return
+        if len(header) != BLOCK:
+            raise _read_error("truncated header")
+        parsed = _parse_header(header)
+        head = header
+        if parsed is not None and parsed[2] == b"x":
+            # PAX extended header: applies to the member header that follows
+            raw = fileobj.read(_padded(parsed[1]))
+            if len(raw) != _padded(parsed[1]):
+                raise _read_error("unexpected end of data")
+            head += raw
+            overrides = _parse_pax(raw[:parsed[1]])
+            header = fileobj.read(BLOCK)
+            head += header
+            if len(header) != BLOCK or header == _NUL_BLOCK:
+                parsed = None
+            else:
+                parsed = _parse_header(header)
+            if overrides is None or parsed is None or parsed[2] == b"x":
+                parsed = None
+            else:
+                name, size, typeflag = parsed
+                parsed = overrides.get("path", name), overrides.get("size", size), typeflag
+        if parsed is None or (parsed[2] not in _REGULAR_TYPES and parsed[2] not in _EMPTY_TYPES):
+            yield from _fallback(fileobj, head, header_offset)
+            return
+        name, size, typeflag = parsed
+        offset = header_offset + len(head)
+        if typeflag in _EMPTY_TYPES or (typeflag == b"\0" and name.endswith("/")):
+            # No data follows (an old-style directory counts as one, as in tarfile)
+            continue
+        padded = _padded(size)
+        offset += padded
+        guid, kind = split_member(name)
+        if padded <= _SMALL_MEMBER:
+            block = fileobj.read(padded)
+            if len(block) != padded:
+                raise _read_error("unexpected end of data")
+            yield Member(guid, kind, size, header_offset, io.BytesIO(block[:size] if padded != size else block))
+        else:
+            current = _MemberData(fileobj, size)
+            pending = padded
+            yield Member(guid, kind, size, header_offset, current)
@@ -0,0 +1,158 @@
+"""
+Integrity check for .unitypackage files, without writing anything.
+
+Each package is read once: the gzip stream is inflated to its end so the
+CRC and length in the trailer are checked, the tar headers are parsed with
+the same reader extraction uses, and the GUID entries are checked the way
+build_mapping needs them (every asset has a usable pathname). Packages are
+verified in parallel processes.
+"""
+import gzip
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .tarreader import iter_members, read_pathname
+
+_DRAIN_CHUNK = 1024 * 1024
+# Problems listed per package before the rest are only counted
+MAX_PROBLEMS = 20
+
+
+@dataclass
+class VerifyReport:
+    package: str
+    # Fatal error that stopped reading (truncated, bad CRC, not a tar, ...)
+    error: Optional[str] = None
+    # Structural problems found in a readable package
+    problems: List[str] = field(default_factory=list)
+    problem_count: int = 0
+    assets: int = 0
+    # GUID entries with a pathname but no asset (folders)
+    folders: int = 0
+    compressed_bytes: int = 0
+    uncompressed_bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.problem_count == 0
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.compressed_bytes / self.seconds / 1e6 if self.seconds > 0 else 0.0
+
+    def add_problem(self, problem: str) -> None:
+        self.problem_count += 1
+        if len(self.problems) < MAX_PROBLEMS:
+            self.problems.append(problem)
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data["ok"] = self.ok
+        data["mb_per_s"] = round(self.mb_per_s, 1)
+        data["seconds"] = round(self.seconds, 3)
+        return data
+
+
+def is_unsafe_pathname(pathname: str) -> bool:
+    """Absolute, drive-qualified or containing "..": would land outside the destination."""
+    parts = pathname.replace("\\", "/").split("/")
+    return pathname.startswith(("/", "\\")) or (len(parts[0]) == 2 and parts[0][1] == ":") or ".." in parts
+
+
+def verify_package(unitypackage_path: str) -> VerifyReport:
+    report = VerifyReport(os.path.abspath(unitypackage_path))
+    start = time.perf_counter()
+    # guid -> set of member kinds seen
+    kinds: Dict[str, set] = {}
+    pathnames: Dict[str, str] = {}
+    try:
+        with open(unitypackage_path, "rb") as raw:
+            try:
+                with gzip.GzipFile(fileobj=raw, mode="rb") as gz:
+                    for guid, kind, size, offset, data in iter_members(gz, strict=True):
+                        if not kind:
+                            report.add_problem(f"file outside a GUID folder at offset {offset}: {guid}")
+                            continue
+                        seen = kinds.setdefault(guid, set())
+                        if kind in seen:
+                            report.add_problem(f"{guid}: duplicate {kind}")
+                        seen.add(kind)
+                        if kind == "pathname":
+                            try:
+                                pathnames.setdefault(guid, read_pathname(data))
+                            except UnicodeDecodeError:
+                                pathnames.setdefault(guid, "")
+                                report.add_problem(f"{guid}: pathname is not UTF-8")
+                    # The tar ends before the gzip stream does; inflating the
+                    # rest is what checks the CRC and length in the trailer.
+                    while gz.read(_DRAIN_CHUNK):
+                        pass
+                    report.uncompressed_bytes = gz.tell()
+            finally:
+                report.compressed_bytes = raw.tell()
+    except Exception as e:
+        report.error = f"{type(e).__name__}: {e}"
+
+    for guid, seen in kinds.items():
+        pathname = pathnames.get(guid)
+        if "asset" in seen:
+            report.assets += 1
+            if "pathname" not in seen:
+                # A pathname cut off by the error isn't a problem of its own
+                if report.error is None:
+                    report.add_problem(f"{guid}: asset without pathname")
+            elif not pathname:
+                report.add_problem(f"{guid}: empty pathname")
+        elif "pathname" in seen:
+            report.folders += 1
+        if pathname and is_unsafe_pathname(pathname):
+            report.add_problem(f"{guid}: pathname leaves the destination: {pathname}")
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def verify_packages(
+    unitypackages: Iterable[str],
+    jobs: int = 1,
+    on_report: Optional[Callable[[VerifyReport], None]] = None,
+    executor=None,
+) -> List[VerifyReport]:
+    """
+    Verify packages on up to jobs processes (executor, if given, is used
+    instead of a new pool). on_report is called as each one finishes;
+    the returned list is in input order.
+    """
+    paths = [os.path.abspath(p) for p in unitypackages]
+    reports: Dict[int, VerifyReport] = {}
+    if jobs <= 1 or len(paths) <= 1:
+        for i, path in enumerate(paths):
+            reports[i] = verify_package(path)
+            if on_report is not None:
+                on_report(reports[i])
+        return [reports[i] for i in range(len(paths))]
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from contextlib import nullcontext
+
+    def _size(i: int) -> int:
+        try:
+            return os.path.getsize(paths[i])
+        except OSError:
+            return 0
+
+    pool_context = ProcessPoolExecutor(max_workers=min(jobs, len(paths))) if executor is None else nullcontext(executor)
+    with pool_context as pool:
+        # Largest first, so one big package doesn't finish alone at the end
+        futures = {pool.submit(verify_package, paths[i]): i for i in sorted(range(len(paths)), key=_size, reverse=True)}
+        for fut in as_completed(futures):
+            i = futures[fut]
+            try:
+                reports[i] = fut.result()
+            except Exception as e:
+                reports[i] = VerifyReport(paths[i], error=f"{type(e).__name__}: {e}")
+            if on_report is not None:
+                on_report(reports[i])
+    return [reports[i] for i in range(len(paths))]
@@ -0,0 +1,324 @@
+"""
+Watch-folder mode: extract packages dropped into one or more folders.
+
+New or changed *.unitypackage files are noticed through inotify on Linux
+(falling back to polling elsewhere or when inotify is unavailable), queued
+once their size and mtime have stopped changing, and extracted in batches
+with the saved settings. Every package that has been handled is remembered
+by size, mtime and content fingerprint in WATCH_STATE_PATH, so a restart
+does not extract unchanged packages again. The fingerprint is the asset
+store's (size plus the gzip header and trailer, see store.py), so
+recording a package never reads it again after extraction.
+"""
+import json
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .store import package_fingerprint
+from .settings import SETTINGS_DIR
+
+WATCH_STATE_PATH = os.path.join(SETTINGS_DIR, "watch_state.json")
+
+PACKAGE_EXT = ".unitypackage"
+# A file is queued once its size and mtime have not changed for this long
+STABLE_SECONDS = 2.0
+# Folder rescan interval when polling
+POLL_INTERVAL = 5.0
+# How often files waiting to become stable are looked at again
+CHECK_INTERVAL = 0.5
+# Packages waiting for a worker; the watcher blocks (and inotify buffers) beyond this
+QUEUE_SIZE = 64
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _is_package_name(name: str) -> bool:
+    return name.lower().endswith(PACKAGE_EXT)
+
+
+def _scan(folders: Iterable[str]) -> List[str]:
+    found = []
+    for folder in folders:
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    if _is_package_name(entry.name) and entry.is_file():
+                        found.append(entry.path)
+        except OSError:
+            continue
+    return found
+
+
+class _Inotify:
+    """Minimal inotify binding (ctypes); raises OSError where unsupported."""
+
+    MASK = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+
+    def __init__(self, folders: Iterable[str]):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        import ctypes
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("libc has no inotify")
+        self._libc = libc
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, str] = {}
+        try:
+            for folder in folders:
+                wd = libc.inotify_add_watch(self.fd, os.fsencode(folder), self.MASK)
+                if wd < 0:
+                    raise OSError(ctypes.get_errno(), f"cannot watch {folder}")
+                self._dirs[wd] = folder
+        except OSError:
+            self.close()
+            raise
+
+    def read(self, timeout: float) -> Optional[List[str]]:
+        """Package paths touched within timeout seconds; None on queue overflow."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        paths: List[str] = []
+        overflow = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            pos = 0
+            while pos + _EVENT_HEADER.size <= len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, pos)
+                pos += _EVENT_HEADER.size
+                name = data[pos:pos + length].rstrip(b"\0")
+                pos += length
+                if mask & _IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                folder = self._dirs.get(wd)
+                if folder is None or not name:
+                    continue
+                name = os.fsdecode(name)
+                if _is_package_name(name):
+                    paths.append(os.path.join(folder, name))
+        return None if overflow else paths
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class Fingerprints:
+    """Persisted (size, mtime_ns, fingerprint) of every package already handled."""
+
+    def __init__(self, path: str = WATCH_STATE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f).get("packages", {})
+        except (OSError, ValueError, AttributeError):
+            self._entries = {}
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    def seen(self, path: str, st: os.stat_result) -> bool:
+        """Cheap check: same size and mtime as when it was handled."""
+        with self._lock:
+            entry = self._entries.get(self._key(path))
+        return entry is not None and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns
+
+    def unchanged(self, path: str, st: os.stat_result) -> Optional[str]:
+        """
+        None if the package must be extracted, otherwise its fingerprint. A
+        file that was touched or copied again but has the same content counts
+        as unchanged (and its new mtime is remembered). Entries from before
+        fingerprints (full digests) only match on size and mtime.
+        """
+        with self._lock:
+            entry = self._entries.get(self._key(path))
+        if self.seen(path, st):
+            return entry.get("fingerprint", entry.get("digest"))
+        if entry is None or entry["size"] != st.st_size or "fingerprint" not in entry:
+            return None
+        fingerprint = package_fingerprint(path)
+        if fingerprint != entry["fingerprint"]:
+            return None
+        self.record(path, st, fingerprint, entry.get("error"))
+        return fingerprint
+
+    def record(self, path: str, st: os.stat_result, fingerprint: str, error: Optional[str] = None) -> None:
+        entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "fingerprint": fingerprint, "error": error}
+        with self._lock:
+            self._entries[self._key(path)] = entry
+            self._save_locked()
+
+    def _save_locked(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"packages": self._entries}, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+
+class FolderWatcher:
+    """
+    Watches folders (not recursively) and hands stable, new or changed
+    packages to handler(paths) on a worker thread, at most batch_size at a
+    time. handler returns {path: error message or None}; failed packages
+    are remembered too and only retried once they change.
+    """
+
+    def __init__(
+        self,
+        folders: Iterable[str],
+        handler: Callable[[List[str]], Dict[str, Optional[str]]],
+        batch_size: int = 1,
+        stable_seconds: float = STABLE_SECONDS,
+        poll_interval: float = POLL_INTERVAL,
+        use_inotify: bool = True,
+        fingerprints: Optional[Fingerprints] = None,
+        log: Callable[[str], None] = lambda message: None,
+    ):
+        self.folders = [os.path.abspath(f) for f in folders]
+        self.handler = handler
+        self.batch_size = max(1, batch_size)
+        self.stable_seconds = stable_seconds
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.fingerprints = fingerprints if fingerprints is not None else Fingerprints()
+        self.log = log
+        self.stop_event = threading.Event()
+        self._queue: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+        # path -> (size, mtime_ns, time the pair was first seen)
+        self._candidates: Dict[str, tuple] = {}
+        self._busy: set = set()
+        self._busy_lock = threading.Lock()
+
+    def _consider(self, paths: Iterable[str]) -> None:
+        for path in paths:
+            with self._busy_lock:
+                if path in self._busy:
+                    continue
+            self._candidates.setdefault(path, (-1, -1, 0.0))
+
+    def _check_candidates(self) -> None:
+        now = time.monotonic()
+        for path, (size, mtime_ns, since) in list(self._candidates.items()):
+            try:
+                st = os.stat(path)
+            except OSError:
+                del self._candidates[path]
+                continue
+            if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+                self._candidates[path] = (st.st_size, st.st_mtime_ns, now)
+                continue
+            if now - since < self.stable_seconds:
+                continue
+            del self._candidates[path]
+            if self.fingerprints.seen(path, st):
+                continue
+            with self._busy_lock:
+                self._busy.add(path)
+            while not self.stop_event.is_set():
+                try:
+                    self._queue.put(path, timeout=CHECK_INTERVAL)
+                    break
+                except queue.Full:
+                    continue
+
+    def _work(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                first = self._queue.get(timeout=CHECK_INTERVAL)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._process(batch)
+            finally:
+                with self._busy_lock:
+                    self._busy.difference_update(batch)
+
+    def _process(self, batch: List[str]) -> None:
+        todo = []
+        stats = {}
+        for path in batch:
+            try:
+                st = os.stat(path)
+                fingerprint = self.fingerprints.unchanged(path, st)
+            except OSError:
+                continue
+            if fingerprint is not None:
+                self.log(f"unchanged: {path}")
+                continue
+            todo.append(path)
+            stats[path] = st
+        if not todo:
+            return
+        try:
+            outcome = self.handler(todo)
+        except Exception as e:
+            outcome = {path: f"{type(e).__name__}: {e}" for path in todo}
+        for path in todo:
+            try:
+                fingerprint = package_fingerprint(path)
+            except OSError:
+                continue
+            self.fingerprints.record(path, stats[path], fingerprint, outcome.get(path))
+
+    def run(self) -> None:
+        """Watch until stop_event is set (or KeyboardInterrupt)."""
+        inotify = None
+        if self.use_inotify:
+            try:
+                inotify = _Inotify(self.folders)
+            except OSError as e:
+                self.log(f"inotify unavailable ({e}); polling every {self.poll_interval:g}s")
+        worker = threading.Thread(target=self._work, name="upo-watch-worker", daemon=True)
+        worker.start()
+        try:
+            self._consider(_scan(self.folders))
+            next_poll = time.monotonic() + self.poll_interval
+            while not self.stop_event.is_set():
+                if inotify is not None:
+                    paths = inotify.read(CHECK_INTERVAL)
+                    if paths is None:
+                        # Events were lost; fall back to a full listing once
+                        paths = _scan(self.folders)
+                    self._consider(paths)
+                else:
+                    self.stop_event.wait(CHECK_INTERVAL)
+                    if time.monotonic() >= next_poll:
+                        self._consider(_scan(self.folders))
+                        next_poll = time.monotonic() + self.poll_interval
+                self._check_candidates()
+        finally:
+            self.stop_event.set()
+            if inotify is not None:
+                inotify.close()
+            worker.join()
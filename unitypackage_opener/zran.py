@@ -0,0 +1,294 @@
+"""
+Random access into the gzip stream of a package (zran-style access points).
+
+A .unitypackage is one gzip stream, so reaching an asset near its end
+normally means inflating everything before it. While a package is indexed,
+CheckpointInflater records an access point about every CHECKPOINT_SPAN
+bytes of output: a deflate block boundary that falls on a whole byte, with
+its compressed and uncompressed offsets and the 32 KiB of output before it
+(the window a fresh raw inflater needs as its dictionary). Reading from an
+access point is then plain zlib: seek, prime a raw decompressor with the
+window and go; ranges that start at different access points are
+independent and can be inflated on several threads at once.
+
+Finding block boundaries needs zlib's Z_BLOCK flush mode, which Python's
+zlib module doesn't expose, so indexing calls the system zlib through
+ctypes. Where it can't be loaded, and for gzip files made of several
+members, packages get no access points and are read from the start.
+"""
+import ctypes
+import ctypes.util
+import gzip
+import zlib
+from bisect import bisect_right
+from typing import List, NamedTuple, Optional, Tuple
+
+CHECKPOINT_SPAN = 4 * 1024 * 1024
+WINDOW_SIZE = 32 * 1024
+_IN_CHUNK = 256 * 1024
+_OUT_CHUNK = 256 * 1024
+_SKIP_CHUNK = 1024 * 1024
+
+_Z_OK = 0
+_Z_STREAM_END = 1
+_Z_BUF_ERROR = -5
+_Z_NO_FLUSH = 0
+_Z_BLOCK = 5
+
+
+class Checkpoint(NamedTuple):
+    # Offset in the uncompressed tar stream
+    out: int
+    # Offset in the package file of the first byte after the block boundary
+    inp: int
+    # Where the zlib-compressed window is kept (see PackageIndex.window)
+    window_offset: int
+    window_length: int
+
+
+class _ZStream(ctypes.Structure):
+    _fields_ = [
+        ("next_in", ctypes.c_void_p),
+        ("avail_in", ctypes.c_uint),
+        ("total_in", ctypes.c_ulong),
+        ("next_out", ctypes.c_void_p),
+        ("avail_out", ctypes.c_uint),
+        ("total_out", ctypes.c_ulong),
+        ("msg", ctypes.c_char_p),
+        ("state", ctypes.c_void_p),
+        ("zalloc", ctypes.c_void_p),
+        ("zfree", ctypes.c_void_p),
+        ("opaque", ctypes.c_void_p),
+        ("data_type", ctypes.c_int),
+        ("adler", ctypes.c_ulong),
+        ("reserved", ctypes.c_ulong),
+    ]
+
+
+_libz = None
+_libz_loaded = False
+
+
+def _load_libz():
+    global _libz, _libz_loaded
+    if _libz_loaded:
+        return _libz
+    _libz_loaded = True
+    for name in ("z", "zlib1", "zlib"):
+        path = ctypes.util.find_library(name)
+        if not path:
+            continue
+        try:
+            lib = ctypes.CDLL(path)
+            lib.zlibVersion.restype = ctypes.c_char_p
+            lib.inflateInit2_.argtypes = [ctypes.POINTER(_ZStream), ctypes.c_int, ctypes.c_char_p, ctypes.c_int]
+            for func in (lib.inflate,):
+                func.argtypes = [ctypes.POINTER(_ZStream), ctypes.c_int]
+            for func in (lib.inflateEnd, lib.inflateReset):
+                func.argtypes = [ctypes.POINTER(_ZStream)]
+        except (OSError, AttributeError):
+            continue
+        _libz = lib
+        break
+    return _libz
+
+
+def available() -> bool:
+    """Whether access points can be recorded here (a loadable system zlib)."""
+    return _load_libz() is not None
+
+
+class CheckpointInflater:
+    """
+    Readable view of the uncompressed gzip stream in raw (a file positioned
+    at its start) that records access points as it goes. checkpoints holds
+    (uncompressed offset, compressed offset, zlib-compressed window) and is
+    emptied if the file turns out to have more than one gzip member.
+    """
+
+    def __init__(self, raw, span: int = CHECKPOINT_SPAN):
+        lib = _load_libz()
+        if lib is None:
+            raise RuntimeError("no system zlib to record access points with")
+        self._lib = lib
+        self._raw = raw
+        self._span = span
+        self._strm = _ZStream()
+        # 15 + 32: gzip (or zlib) header detected automatically, trailer checked
+        ret = lib.inflateInit2_(ctypes.byref(self._strm), 15 + 32, lib.zlibVersion(), ctypes.sizeof(_ZStream))
+        if ret != _Z_OK:
+            raise zlib.error(f"Error {ret} while preparing to decompress data")
+        self._in = ctypes.create_string_buffer(_IN_CHUNK)
+        self._in_view = memoryview(self._in).cast("B")
+        self._out = ctypes.create_string_buffer(_OUT_CHUNK)
+        self._fed = 0
+        self._tail = b""
+        self._next = span
+        self._track = True
+        self._eof = False
+        self._buf = b""
+        self._pos = 0
+        self.uncompressed = 0
+        self.checkpoints: List[Tuple[int, int, bytes]] = []
+
+    @property
+    def compressed_offset(self) -> int:
+        """Bytes of the file consumed by the inflater so far."""
+        return self._fed - self._strm.avail_in
+
+    def _feed(self) -> bool:
+        n = self._raw.readinto(self._in_view)
+        if not n:
+            return False
+        self._strm.next_in = ctypes.addressof(self._in)
+        self._strm.avail_in = n
+        self._fed += n
+        return True
+
+    def _member_end(self) -> None:
+        # Zero padding after a member is allowed (as in gzip.GzipFile); anything
+        # else is another member, whose data the access points can't reach.
+        s = self._strm
+        while True:
+            if s.avail_in == 0 and not self._feed():
+                self._eof = True
+                return
+            rest = ctypes.string_at(s.next_in, s.avail_in)
+            stripped = rest.lstrip(b"\0")
+            if stripped:
+                s.next_in += len(rest) - len(stripped)
+                s.avail_in = len(stripped)
+                break
+            s.avail_in = 0
+        self._track = False
+        self.checkpoints = []
+        self._lib.inflateReset(ctypes.byref(s))
+
+    def _fill(self) -> bool:
+        s = self._strm
+        while not self._eof:
+            if s.avail_in == 0 and not self._feed():
+                raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+            s.next_out = ctypes.addressof(self._out)
+            s.avail_out = _OUT_CHUNK
+            # Past the next access point: stop at every block end until one is byte-aligned
+            block = self._track and self.uncompressed >= self._next
+            ret = self._lib.inflate(ctypes.byref(s), _Z_BLOCK if block else _Z_NO_FLUSH)
+            if ret not in (_Z_OK, _Z_STREAM_END, _Z_BUF_ERROR):
+                message = s.msg.decode("ascii", "replace") if s.msg else ""
+                raise zlib.error(f"Error {ret} while decompressing data: {message}")
+            produced = _OUT_CHUNK - s.avail_out
+            data = ctypes.string_at(self._out, produced) if produced else b""
+            if data:
+                self.uncompressed += produced
+                self._tail = data[-WINDOW_SIZE:] if produced >= WINDOW_SIZE else (self._tail + data)[-WINDOW_SIZE:]
+            # 128: stopped right after a block; 64: in the last block; low bits: unused bits in the last byte
+            if block and s.data_type & 128 and not s.data_type & 64 and not s.data_type & 7:
+                self.checkpoints.append((self.uncompressed, self.compressed_offset, zlib.compress(self._tail, 1)))
+                self._next = self.uncompressed + self._span
+            if ret == _Z_STREAM_END:
+                self._member_end()
+            if data:
+                self._buf, self._pos = data, 0
+                return True
+        return False
+
+    def read(self, n: int = -1) -> bytes:
+        parts = []
+        while n:
+            if self._pos >= len(self._buf) and not self._fill():
+                break
+            if n < 0:
+                chunk = self._buf[self._pos:]
+            else:
+                chunk = self._buf[self._pos:self._pos + n]
+                n -= len(chunk)
+            self._pos += len(chunk)
+            parts.append(chunk)
+        return b"".join(parts)
+
+    def close(self) -> None:
+        if self._strm is not None:
+            self._lib.inflateEnd(ctypes.byref(self._strm))
+            self._strm = None
+
+
+class _RawReader:
+    """Uncompressed stream from an access point on: raw inflate primed with its window."""
+
+    def __init__(self, raw, compressed_offset: int, window: bytes):
+        raw.seek(compressed_offset)
+        self._raw = raw
+        self._inflater = zlib.decompressobj(-zlib.MAX_WBITS, zdict=window) if window else zlib.decompressobj(-zlib.MAX_WBITS)
+        self._buf = b""
+        self._pos = 0
+
+    def _fill(self) -> bool:
+        d = self._inflater
+        while not d.eof:
+            data = d.unconsumed_tail or self._raw.read(_IN_CHUNK)
+            if not data:
+                raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+            out = d.decompress(data, _OUT_CHUNK)
+            if out:
+                self._buf, self._pos = out, 0
+                return True
+        return False
+
+    def read(self, n: int = -1) -> bytes:
+        parts = []
+        while n:
+            if self._pos >= len(self._buf) and not self._fill():
+                break
+            if n < 0:
+                chunk = self._buf[self._pos:]
+            else:
+                chunk = self._buf[self._pos:self._pos + n]
+                n -= len(chunk)
+            self._pos += len(chunk)
+            parts.append(chunk)
+        return b"".join(parts)
+
+    def close(self) -> None:
+        pass
+
+
+def open_at(raw, index, offset: int):
+    """
+    Readable uncompressed stream of the package open in raw, positioned at
+    offset: inflating starts at the last access point of index (a
+    PackageIndex) before offset, or at the start of the file without one.
+    """
+    i = bisect_right(index.checkpoints, offset, key=lambda c: c.out) - 1
+    if i < 0:
+        raw.seek(0)
+        reader, position = gzip.GzipFile(fileobj=raw, mode="rb"), 0
+    else:
+        point = index.checkpoints[i]
+        reader, position = _RawReader(raw, point.inp, index.window(point)), point.out
+    left = offset - position
+    while left > 0:
+        chunk = reader.read(min(left, _SKIP_CHUNK))
+        if not chunk:
+            raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+        left -= len(chunk)
+    return reader
+
+
+def plan_ranges(members: List[Tuple[int, str]], checkpoints: List[Checkpoint]) -> List[Tuple[int, int, str]]:
+    """
+    Group wanted members, given as (tar offset, guid), into runs that are
+    each read from one access point. A run ends where the next member lies
+    past another access point, as starting over there inflates less than
+    reading on. Returns (first offset, last offset, last guid) per run.
+    """
+    ranges: List[Tuple[int, int, str]] = []
+    current: Optional[int] = None
+    for offset, guid in sorted(members):
+        point = bisect_right(checkpoints, offset, key=lambda c: c.out)
+        if ranges and point == current:
+            ranges[-1] = (ranges[-1][0], offset, guid)
+        else:
+            ranges.append((offset, offset, guid))
+            current = point
+    return ranges